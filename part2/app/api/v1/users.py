@@ -56,9 +56,14 @@ class UserResource(Resource):
     @api.expect(user_model)
     @api.response(200, 'User updated successfully')
     @api.response(404, 'User not found')
+    @api.response(400, 'Email already registered')
     def put(self, user_id):
         """Update user by ID"""
-        user = facade.update_user(user_id, api.payload)
+        try:
+            user = facade.update_user(user_id, api.payload)
+        except ValueError as e:
+            # The repository's unique email index rejects the change before it is applied
+            return {'error': str(e)}, 400
         if not user:
             return {'error': 'User not found'}, 404
         return {
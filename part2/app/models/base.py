@@ -11,7 +11,15 @@ class BaseModel:
         self.updated_at = datetime.now()
     
     def update(self, data):
-        for key, value in data.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
+        # Repositories that index this object vet the change and then re-file it
+        listeners = getattr(self, '_update_listeners', ())
+        for listener in listeners:
+            listener.before_update(self, data)
+        try:
+            for key, value in data.items():
+                if hasattr(self, key):
+                    setattr(self, key, value)
+        finally:
+            for listener in listeners:
+                listener.after_update(self)
         self.save()
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
 
 class Repository(ABC):
     @abstractmethod
@@ -26,12 +28,118 @@ class Repository(ABC):
         pass
 
 
+class HashIndex:
+    """Equality index of one attribute: value -> objects holding that value"""
+
+    def __init__(self, attr_name, unique=False):
+        self.attr_name = attr_name
+        self.unique = unique
+        self._buckets = {}
+        # Value each object was filed under, so it can be removed after a change
+        self._keys = {}
+
+    def check(self, obj_id, value):
+        if self.unique:
+            bucket = self._buckets.get(value)
+            if bucket and obj_id not in bucket:
+                raise ValueError(f"{self.attr_name} '{value}' already exists")
+
+    def insert(self, obj, value):
+        self._buckets.setdefault(value, {})[obj.id] = obj
+        self._keys[obj.id] = value
+
+    def remove(self, obj_id):
+        if obj_id not in self._keys:
+            return
+        value = self._keys.pop(obj_id)
+        bucket = self._buckets[value]
+        del bucket[obj_id]
+        if not bucket:
+            del self._buckets[value]
+
+    def key_of(self, obj_id):
+        return self._keys.get(obj_id)
+
+    def lookup(self, value):
+        return list(self._buckets.get(value, {}).values())
+
+
+class SortedIndex:
+    """Ordered index of one attribute: (value, id) pairs kept sorted for range scans.
+
+    None values are tracked but left out of the ordering.
+    """
+    _value = itemgetter(0)
+
+    def __init__(self, attr_name):
+        self.attr_name = attr_name
+        self._entries = []
+        self._objects = {}
+        self._keys = {}
+
+    def check(self, obj_id, value):
+        pass
+
+    def insert(self, obj, value):
+        self._objects[obj.id] = obj
+        self._keys[obj.id] = value
+        if value is not None:
+            insort(self._entries, (value, obj.id))
+
+    def remove(self, obj_id):
+        if obj_id not in self._keys:
+            return
+        value = self._keys.pop(obj_id)
+        del self._objects[obj_id]
+        if value is not None:
+            del self._entries[bisect_left(self._entries, (value, obj_id))]
+
+    def key_of(self, obj_id):
+        return self._keys.get(obj_id)
+
+    def lookup(self, value):
+        if value is None:
+            return [self._objects[obj_id] for obj_id, key in self._keys.items() if key is None]
+        return self.range(value, value)
+
+    def range(self, low=None, high=None):
+        """Objects with low <= value <= high in ascending order; None leaves a side open"""
+        start = 0 if low is None else bisect_left(self._entries, low, key=self._value)
+        end = len(self._entries) if high is None else bisect_right(self._entries, high, key=self._value)
+        return [self._objects[obj_id] for _, obj_id in self._entries[start:end]]
+
+    def top(self, k, largest=True):
+        if k <= 0:
+            return []
+        entries = self._entries[-k:][::-1] if largest else self._entries[:k]
+        return [self._objects[obj_id] for _, obj_id in entries]
+
+
 class InMemoryRepository(Repository):
-    def __init__(self):
+    def __init__(self, indexes=None):
+        """`indexes` maps attribute names to an index type: 'unique', 'multi' or 'ordered'"""
         self._storage = {}
+        self._indexes = {}
+        for attr_name, index_type in (indexes or {}).items():
+            if index_type == 'ordered':
+                self._indexes[attr_name] = SortedIndex(attr_name)
+            elif index_type in ('unique', 'multi'):
+                self._indexes[attr_name] = HashIndex(attr_name, unique=index_type == 'unique')
+            else:
+                raise ValueError(f"Unknown index type '{index_type}'")
 
     def add(self, obj):
+        values = {name: getattr(obj, name, None) for name in self._indexes}
+        self._check(obj.id, values)
+        if obj.id in self._storage:
+            self._unindex(obj.id)
         self._storage[obj.id] = obj
+        self._index(obj, values)
+        if self._indexes:
+            # BaseModel.update() calls before_update/after_update around its changes
+            listeners = obj.__dict__.setdefault('_update_listeners', [])
+            if self not in listeners:
+                listeners.append(self)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -46,7 +154,72 @@ class InMemoryRepository(Repository):
 
     def delete(self, obj_id):
         if obj_id in self._storage:
-            del self._storage[obj_id]
+            obj = self._storage.pop(obj_id)
+            self._unindex(obj_id)
+            listeners = obj.__dict__.get('_update_listeners', [])
+            if self in listeners:
+                listeners.remove(self)
 
     def get_by_attribute(self, attr_name, attr_value):
+        index = self._indexes.get(attr_name)
+        if index is not None:
+            matches = index.lookup(attr_value)
+            return matches[0] if matches else None
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        index = self._indexes.get(attr_name)
+        if index is not None:
+            return index.lookup(attr_value)
+        return [obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value]
+
+    def get_range_by_attribute(self, attr_name, low=None, high=None):
+        """Objects with low <= attr <= high, ascending; None leaves a side open"""
+        index = self._indexes.get(attr_name)
+        if isinstance(index, SortedIndex):
+            return index.range(low, high)
+        matches = [
+            obj for obj in self._storage.values()
+            if getattr(obj, attr_name) is not None
+            and (low is None or getattr(obj, attr_name) >= low)
+            and (high is None or getattr(obj, attr_name) <= high)
+        ]
+        return sorted(matches, key=lambda obj: (getattr(obj, attr_name), obj.id))
+
+    def get_top_by_attribute(self, attr_name, k, largest=True):
+        """The k objects with the largest (or smallest) values of attr"""
+        index = self._indexes.get(attr_name)
+        if isinstance(index, SortedIndex):
+            return index.top(k, largest)
+        if k <= 0:
+            return []
+        matches = self.get_range_by_attribute(attr_name)
+        return matches[-k:][::-1] if largest else matches[:k]
+
+    def _check(self, obj_id, values):
+        for name, value in values.items():
+            self._indexes[name].check(obj_id, value)
+
+    def _index(self, obj, values):
+        for name, value in values.items():
+            self._indexes[name].insert(obj, value)
+
+    def _unindex(self, obj_id, names=None):
+        for name in self._indexes if names is None else names:
+            self._indexes[name].remove(obj_id)
+
+    def before_update(self, obj, data):
+        """Reject changes that would break a unique index, before any field is set"""
+        if self._storage.get(obj.id) is obj:
+            self._check(obj.id, {name: data[name] for name in self._indexes
+                                 if name in data and hasattr(obj, name)})
+
+    def after_update(self, obj):
+        """Re-file `obj` under whatever values its indexed fields now hold"""
+        if self._storage.get(obj.id) is not obj:
+            return
+        for name, index in self._indexes.items():
+            value = getattr(obj, name, None)
+            if index.key_of(obj.id) != value:
+                index.remove(obj.id)
+                index.insert(obj, value)
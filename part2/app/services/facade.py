@@ -7,9 +7,9 @@ from app.models.review import Review
 
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
+        self.user_repo = InMemoryRepository(indexes={'email': 'unique'})
+        self.place_repo = InMemoryRepository(indexes={'price': 'ordered'})
+        self.review_repo = InMemoryRepository(indexes={'created_at': 'ordered'})
         self.amenity_repo = InMemoryRepository()
 
 
@@ -0,0 +1,49 @@
+"""Email lookup latency of InMemoryRepository with and without a hash index.
+
+Run from part2/:
+
+    python -m benchmarks.repository_index --sizes 1000,10000,100000,1000000
+"""
+import argparse
+import random
+import time
+
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository
+
+
+def lookup_us(repo, emails, rounds):
+    """Median microseconds per get_by_attribute('email', ...) call"""
+    samples = []
+    for email in emails[:rounds]:
+        start = time.perf_counter()
+        repo.get_by_attribute('email', email)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000')
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--scan-rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'users':>9} {'indexed us':>11} {'scan us':>11}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        users = [User("Bench", "User", f"user{i}@example.com") for i in range(size)]
+        indexed = InMemoryRepository(indexes={'email': 'unique'})
+        scanned = InMemoryRepository()
+        for user in users:
+            indexed.add(user)
+            scanned.add(user)
+
+        rng = random.Random(size)
+        emails = [rng.choice(users).email for _ in range(args.rounds)]
+        print(f"{size:>9} {lookup_us(indexed, emails, args.rounds):11.2f} "
+              f"{lookup_us(scanned, emails, args.scan_rounds):11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+import unittest
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository
+
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+    def setUp(self):
+        self.repo = InMemoryRepository(indexes={'email': 'unique', 'last_name': 'multi'})
+        self.alice = User("Alice", "Smith", "alice@example.com")
+        self.bob = User("Bob", "Smith", "bob@example.com")
+        self.repo.add(self.alice)
+        self.repo.add(self.bob)
+
+    def test_unique_lookup(self):
+        self.assertIs(self.repo.get_by_attribute('email', 'bob@example.com'), self.bob)
+        self.assertIsNone(self.repo.get_by_attribute('email', 'nobody@example.com'))
+
+    def test_multi_lookup(self):
+        smiths = self.repo.get_all_by_attribute('last_name', 'Smith')
+        self.assertEqual(smiths, [self.alice, self.bob])
+
+    def test_unindexed_attribute_falls_back_to_scan(self):
+        self.assertIs(self.repo.get_by_attribute('first_name', 'Alice'), self.alice)
+
+    def test_duplicate_unique_value_rejected(self):
+        with self.assertRaises(ValueError):
+            self.repo.add(User("Eve", "Jones", "alice@example.com"))
+        self.assertEqual(len(self.repo.get_all()), 2)
+
+    def test_model_update_moves_index_entries(self):
+        self.alice.update({'email': 'alice@new.example.com', 'last_name': 'Jones'})
+        self.assertIsNone(self.repo.get_by_attribute('email', 'alice@example.com'))
+        self.assertIs(self.repo.get_by_attribute('email', 'alice@new.example.com'), self.alice)
+        self.assertEqual(self.repo.get_all_by_attribute('last_name', 'Smith'), [self.bob])
+
+    def test_update_to_taken_value_rejected_without_changes(self):
+        with self.assertRaises(ValueError):
+            self.repo.update(self.alice.id, {'email': 'bob@example.com', 'last_name': 'Jones'})
+        self.assertEqual(self.alice.email, 'alice@example.com')
+        self.assertIs(self.repo.get_by_attribute('email', 'bob@example.com'), self.bob)
+
+    def test_delete_removes_index_entries(self):
+        self.repo.delete(self.bob.id)
+        self.assertIsNone(self.repo.get_by_attribute('email', 'bob@example.com'))
+        self.bob.update({'email': 'alice@example.com'})  # no longer tracked by the repository
+        self.assertIs(self.repo.get_by_attribute('email', 'alice@example.com'), self.alice)
+
+
+class TestInMemoryRepositoryOrderedIndexes(unittest.TestCase):
+    def setUp(self):
+        self.indexed = InMemoryRepository(indexes={'price': 'ordered'})
+        self.scanned = InMemoryRepository()
+        self.owner = User("Alice", "Smith", "alice@example.com")
+        self.places = [Place(f"Place {i}", "", price, 0.0, 0.0, self.owner)
+                       for i, price in enumerate([40.0, 10.0, 30.0, 10.0, 20.0])]
+        for place in self.places:
+            self.indexed.add(place)
+            self.scanned.add(place)
+
+    def prices(self, places):
+        return [place.price for place in places]
+
+    def test_range_query(self):
+        for repo in (self.indexed, self.scanned):
+            self.assertEqual(self.prices(repo.get_range_by_attribute('price', 10.0, 30.0)),
+                             [10.0, 10.0, 20.0, 30.0])
+            self.assertEqual(self.prices(repo.get_range_by_attribute('price', low=25.0)), [30.0, 40.0])
+
+    def test_top_k(self):
+        for repo in (self.indexed, self.scanned):
+            self.assertEqual(self.prices(repo.get_top_by_attribute('price', 2)), [40.0, 30.0])
+            self.assertEqual(self.prices(repo.get_top_by_attribute('price', 3, largest=False)),
+                             [10.0, 10.0, 20.0])
+
+    def test_equality_lookup_on_ordered_index(self):
+        cheapest = self.indexed.get_all_by_attribute('price', 10.0)
+        self.assertEqual({p.id for p in cheapest}, {self.places[1].id, self.places[3].id})
+
+    def test_model_update_reorders(self):
+        self.places[0].update({'price': 5.0})
+        self.assertIs(self.indexed.get_top_by_attribute('price', 1, largest=False)[0], self.places[0])
+        self.assertEqual(self.prices(self.indexed.get_range_by_attribute('price', 35.0)), [])
+
+    def test_failed_update_keeps_index_consistent(self):
+        with self.assertRaises(ValueError):
+            self.places[0].update({'price': -1.0})
+        self.assertEqual(self.prices(self.indexed.get_top_by_attribute('price', 1)), [40.0])
+
+    def test_delete_removes_entry(self):
+        self.indexed.delete(self.places[0].id)
+        self.assertEqual(self.prices(self.indexed.get_top_by_attribute('price', 1)), [30.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -25,3 +25,22 @@ class TestUserEndpoints(unittest.TestCase):
     def test_get_nonexistent_user(self):
         response = self.client.get('/api/v1/users/invalid-id')
         self.assertEqual(response.status_code, 404)
+
+    def test_update_user_to_taken_email(self):
+        ids = []
+        for name in ("Carol", "Dave"):
+            response = self.client.post('/api/v1/users/', json={
+                "first_name": name,
+                "last_name": "Taken",
+                "email": f"{name.lower()}.taken@example.com"
+            })
+            ids.append(response.get_json()['id'])
+        response = self.client.put(f'/api/v1/users/{ids[1]}', json={
+            "first_name": "Dave",
+            "last_name": "Taken",
+            "email": "carol.taken@example.com"
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.get_json())
+        response = self.client.get(f'/api/v1/users/{ids[1]}')
+        self.assertEqual(response.get_json()['email'], "dave.taken@example.com")
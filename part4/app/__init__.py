@@ -1,11 +1,13 @@
 from flask import Flask
 from flask_restx import Api
-from app.extensions import db, bcrypt, jwt
+from app.extensions import (compression, db, entity_cache, hasher, jwt, metrics, sql_timing, sqlite_pragmas,
+                            static_assets)
 from app.api.v1.users import api as users_ns
 from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.auth import api as auth_ns
+from app.utils.representations import representations
 
 from config import DevelopmentConfig
 from flask_jwt_extended import JWTManager
@@ -14,15 +16,26 @@ from flask_cors import CORS
 
 
 def create_app(config_class=DevelopmentConfig):
-    app = Flask(__name__)
+    # The frontend lives in part4/static and is served by static_assets
+    app = Flask(__name__, static_folder=None)
     app.config.from_object(config_class)
 
     CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
     db.init_app(app)
-    bcrypt.init_app(app)
+    # Before anything opens a connection
+    sqlite_pragmas.init_app(app)
+    hasher.init_app(app)
     jwt.init_app(app)
+    sql_timing.init_app(app)
+    metrics.init_app(app)
+    entity_cache.init_app(app)
+    compression.init_app(app)
+    static_assets.init_app(app)
 
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API')
+    # Fast JSON, plus MessagePack for clients that ask for it in Accept
+    for mediatype, output in representations.items():
+        api.representation(mediatype)(output)
 
     # Register the users namespace
     api.add_namespace(users_ns, path='/api/v1/users')
@@ -31,10 +44,21 @@ def create_app(config_class=DevelopmentConfig):
     api.add_namespace(reviews_ns, path='/api/v1')
     api.add_namespace(auth_ns, path='/api/v1/auth')
 
+    from app.commands import hbnb_cli
+    app.cli.add_command(hbnb_cli)
+
     # Create admin only inside app context
     with app.app_context():
         db.create_all()
+        # create_all() skips tables that already exist, so indexes declared
+        # after a table was first created are added here
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
         from app.services import facade
+        facade.sync_place_indexes()
+        facade.coordinates.invalidate()
+        facade.amenity_catalog.invalidate()
         existing_admin = facade.get_user_by_email("admin@example.com")
         if not existing_admin:
             facade.create_user({
@@ -1,7 +1,10 @@
+from flask import Response
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import jwt_required
 from app.utils.auth import is_admin
+from app.utils.conditional import conditional
+from app.utils.representations import JSON, response_mediatype
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -25,21 +28,26 @@ class AmenityList(Resource):
         return {'id': new_amenity.id, 'name': new_amenity.name}, 201
 
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
+    @conditional(facade.get_amenities_version, collection=True)
     def get(self):
         """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
-        return [{'id': a.id, 'name': a.name} for a in amenities], 200
+        if response_mediatype() == JSON:
+            return Response(facade.get_amenities_json(), mimetype=JSON)
+        return facade.get_amenities_list(), 200
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
     @api.response(404, 'Amenity not found')
+    @conditional(facade.get_amenity_version)
     def get(self, amenity_id):
         """Get amenity details by ID"""
-        amenity = facade.get_amenity(amenity_id)
+        amenity = facade.get_amenity_summary(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return {'id': amenity.id, 'name': amenity.name}, 200
+        return amenity, 200
 
     @jwt_required()
     @api.expect(amenity_model)
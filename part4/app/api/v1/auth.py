@@ -1,6 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token, get_jwt
 from app.services import facade
+from app.utils.password_hasher import HasherBusy
 
 api = Namespace('auth', description='Authentication operations')
 
@@ -17,11 +18,12 @@ class Login(Resource):
         """Authenticate user and return a JWT token"""
         credentials = api.payload  # Get the email and password from the request payload
         
-        # Step 1: Retrieve the user based on the provided email
-        user = facade.get_user_by_email(credentials['email'])
-        
-        # Step 2: Check if the user exists and the password is correct
-        if not user or not user.verify_password(credentials['password']):
+        # Step 1 and 2: Retrieve the user and check the password off the request thread
+        try:
+            user = facade.authenticate(credentials['email'], credentials['password'])
+        except HasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': '1'}
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
         # Step 3: Create a JWT token with the user's id and is_admin flag
@@ -1,6 +1,11 @@
+import math
+from flask import current_app, request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.utils.auth import is_admin
+from app.utils.batch import batch_items, batch_response
+from app.utils.conditional import conditional
 
 api = Namespace('places', description='Place operations')
 
@@ -34,6 +39,51 @@ place_model = api.model('Place', {
     'owner': fields.Nested(user_model, description='Owner of the place')
 })
 
+def place_summary(place):
+    stats = place.rating_stats
+    return {
+        'id': place.id,
+        'title': place.title,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'review_count': stats.review_count if stats else 0,
+        'average_rating': stats.average if stats else None
+    }
+
+def price_arg(name):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        price = float(value)
+    except ValueError:
+        price = math.nan
+    if math.isnan(price):
+        raise ValueError(f"{name} must be a number")
+    return price
+
+def float_arg(name, low, high):
+    try:
+        value = float(request.args[name])
+    except KeyError:
+        raise ValueError(f"{name} is required")
+    except ValueError:
+        value = math.nan
+    if not low <= value <= high:
+        raise ValueError(f"{name} must be a number between {low} and {high}")
+    return value
+
+def limit_arg():
+    config = current_app.config
+    try:
+        limit = int(request.args.get('limit', config['PLACES_PAGE_SIZE']))
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, config['PLACES_MAX_PAGE_SIZE'])
+
 @api.route('/')
 class PlaceList(Resource):
     @jwt_required()
@@ -59,25 +109,137 @@ class PlaceList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.doc(params={
+        'limit': 'Maximum number of places per page',
+        'cursor': 'Opaque next_cursor value from the previous page',
+        'min_price': 'Only places priced at or above this value',
+        'max_price': 'Only places priced at or below this value',
+        'sort': 'One of price, -price, created_at (default)'
+    })
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
+    @api.response(400, 'Invalid paging or filter parameters')
+    @conditional(facade.get_places_version, collection=True)
+    def get(self):
+        """Retrieve a list of places, one page at a time"""
+        config = current_app.config
+        try:
+            filters = {
+                'min_price': price_arg('min_price'),
+                'max_price': price_arg('max_price'),
+                'sort': request.args.get('sort', 'created_at')
+            }
+            if 'limit' not in request.args and 'cursor' not in request.args:
+                # Unpaged clients still get a bare list, capped server-side
+                places, next_cursor = facade.get_places_page(config['PLACES_UNPAGED_CAP'], **filters)
+                headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+                return [place_summary(p) for p in places], 200, headers
+
+            places, next_cursor = facade.get_places_page(limit_arg(), request.args.get('cursor'), **filters)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return {
+            'places': [place_summary(p) for p in places],
+            'next_cursor': next_cursor
+        }, 200
+
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @jwt_required()
+    @api.doc(body=api.model('PlaceBatch', {'places': fields.List(fields.Nested(place_model))}))
+    @api.response(201, 'All places created')
+    @api.response(207, 'Some places created; see the per-item results')
+    @api.response(400, 'Invalid payload or no place created')
+    def post(self):
+        """Create up to BATCH_MAX_ITEMS places in one transaction"""
+        current_user_id = get_jwt_identity()
+        try:
+            items = batch_items(api.payload, 'places')
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        admin = is_admin()
+        for item in items:
+            # Admins may import places on behalf of other owners
+            if not admin or 'owner_id' not in item:
+                item['owner_id'] = current_user_id
+        results = facade.create_places(items)
+        return batch_response(results)
+
+def bbox_arg():
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(v) for v in request.args['bbox'].split(','))
+    except KeyError:
+        raise ValueError("bbox is required")
+    except ValueError:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not (-90.0 <= min_lat <= max_lat <= 90.0
+            and -180.0 <= min_lng <= 180.0 and -180.0 <= max_lng <= 180.0):
+        raise ValueError("bbox is out of range")
+    return min_lat, min_lng, max_lat, max_lng
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.doc(params={
+        'lat': 'Latitude of the search centre',
+        'lng': 'Longitude of the search centre',
+        'radius_km': 'Search radius in kilometres',
+        'bbox': 'min_lng,min_lat,max_lng,max_lat (instead of lat/lng/radius_km)',
+        'limit': 'Maximum number of places returned'
+    })
+    @api.response(200, 'Places in the search area retrieved successfully')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Find places within a radius of a point or inside a bounding box"""
+        try:
+            limit = limit_arg()
+            if 'bbox' in request.args:
+                places = facade.search_places_in_bbox(*bbox_arg(), limit)
+                return [place_summary(p) for p in places], 200
+
+            latitude = float_arg('lat', -90.0, 90.0)
+            longitude = float_arg('lng', -180.0, 180.0)
+            radius_km = float_arg('radius_km', 0.0, current_app.config['PLACES_SEARCH_MAX_RADIUS_KM'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        results = facade.search_places_near(latitude, longitude, radius_km, limit)
+        return [dict(place_summary(p), distance_km=round(distance, 3)) for p, distance in results], 200
+
+@api.route('/clusters')
+class PlaceClusterList(Resource):
+    @api.doc(params={
+        'bbox': 'Visible map area: min_lng,min_lat,max_lng,max_lat',
+        'zoom': 'Map zoom level (0-20)'
+    })
+    @api.response(200, 'Place clusters retrieved successfully')
+    @api.response(400, 'Invalid bbox or zoom')
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
-        return [{
-            'id': p.id,
-            'title': p.title,
-            'price': p.price,
-            'latitude': p.latitude,
-            'longitude': p.longitude
-        } for p in places], 200
+        """Get place counts and prices aggregated per map cell"""
+        try:
+            bbox = bbox_arg()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        try:
+            zoom = int(request.args.get('zoom', ''))
+        except ValueError:
+            zoom = -1
+        if not 0 <= zoom <= 20:
+            return {'error': 'zoom must be an integer between 0 and 20'}, 400
+
+        level = zoom + current_app.config['PLACES_CLUSTER_ZOOM_OFFSET']
+        clusters = facade.get_place_clusters(*bbox, level)
+        return [cluster.to_dict() for cluster in clusters], 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
     @api.response(404, 'Place not found')
+    # The detail view is rebuilt only when its version (owner, amenities, rating) moves
+    @conditional(facade.get_place_version, memoize=True)
     def get(self, place_id):
         """Get place details by ID"""
-        place = facade.get_place(place_id)
+        place = facade.get_place_details(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
         return {
@@ -95,7 +257,8 @@ class PlaceResource(Resource):
             },
             'amenities': [
                 {'id': a.id, 'name': a.name} for a in place.amenities
-            ]
+            ],
+            'rating': place.rating_stats.to_dict() if place.rating_stats else None
         }, 200
 
     @jwt_required()
@@ -114,8 +277,35 @@ class PlaceResource(Resource):
             return {'error': 'Place not found'}, 404
 
         # Allow if owner or admin
-        if place.owner.id != current_user_id and not is_admin:
+        if place.owner_id != current_user_id and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
-        updated = facade.update_place(place_id, api.payload)
+        try:
+            facade.update_place(place_id, api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         return {'message': 'Place updated successfully'}, 200
+
+@api.route('/<place_id>/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={'k': 'Number of neighbours to return (default 10)'})
+    @api.response(200, 'Nearest places retrieved successfully')
+    @api.response(400, 'Invalid k')
+    @api.response(404, 'Place not found')
+    def get(self, place_id):
+        """Get the k places closest to a place, nearest first"""
+        try:
+            k = int(request.args.get('k', 10))
+        except ValueError:
+            k = 0
+        max_k = current_app.config['PLACES_NEARBY_MAX_K']
+        if not 1 <= k <= max_k:
+            return {'error': f'k must be an integer between 1 and {max_k}'}, 400
+
+        results = facade.get_nearby_places(place_id, k)
+        if results is None:
+            return {'error': 'Place not found'}, 404
+        return [
+            dict(place_summary(p), distance_km=round(distance, 3))
+            for p, distance in results
+        ], 200
@@ -1,6 +1,10 @@
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.utils.batch import batch_items, batch_response
+from app.utils.conditional import conditional
+from app.utils.streaming import stream_list
 
 api = Namespace('reviews', description='Review operations')
 
@@ -32,10 +36,7 @@ class ReviewList(Resource):
         if place.owner_id == current_user_id:
             return {'error': 'You cannot review your own place.'}, 400
 
-        existing_review = facade.get_user_review_for_place(current_user_id, place_id)
-        if existing_review:
-            return {'error': 'You have already reviewed this place.'}, 400
-
+        # Duplicate reviews are rejected by the database's unique index
         try:
             data['user_id'] = current_user_id
             review = facade.create_review(data)
@@ -46,22 +47,42 @@ class ReviewList(Resource):
                 'id': review.id,
                 'text': review.text,
                 'rating': review.rating,
-                'user_id': review.user.id,
-                'place_id': review.place.id
+                'user_id': review.user_id,
+                'place_id': review.place_id
             }, 201
         except ValueError as e:
             return {'error': str(e)}, 400
 
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
+    @conditional(facade.get_reviews_version, collection=True)
     def get(self):
-        """Retrieve a list of all reviews"""
-        reviews = facade.get_all_reviews()
-        return [{'id': r.id, 'text': r.text, 'rating': r.rating} for r in reviews], 200
+        """Retrieve a list of all reviews, streamed as a JSON array or NDJSON (by Accept)"""
+        reviews = facade.iter_review_summaries(current_app.config['STREAM_BATCH_ROWS'])
+        return stream_list(reviews, facade.count_reviews)
+
+@api.route('/reviews/batch')
+class ReviewBatch(Resource):
+    @jwt_required()
+    @api.doc(body=api.model('ReviewBatch', {'reviews': fields.List(fields.Nested(review_model))}))
+    @api.response(201, 'All reviews created')
+    @api.response(207, 'Some reviews created; see the per-item results')
+    @api.response(400, 'Invalid payload or no review created')
+    def post(self):
+        """Create up to BATCH_MAX_ITEMS reviews by the current user in one transaction"""
+        try:
+            items = batch_items(api.payload, 'reviews')
+            results = facade.create_reviews(get_jwt_identity(), items)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return batch_response(results)
 
 @api.route('/reviews/<review_id>')
 class ReviewResource(Resource):
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
     @api.response(404, 'Review not found')
+    @conditional(facade.get_review_version)
     def get(self, review_id):
         """Get review details by ID"""
         review = facade.get_review(review_id)
@@ -71,8 +92,8 @@ class ReviewResource(Resource):
             'id': review.id,
             'text': review.text,
             'rating': review.rating,
-            'user_id': review.user.id,
-            'place_id': review.place.id
+            'user_id': review.user_id,
+            'place_id': review.place_id
         }, 200
     
     @jwt_required()
@@ -90,10 +111,13 @@ class ReviewResource(Resource):
         if not review:
             return {'error': 'Not found'}, 404
 
-        if review.user.id != current_user_id and not is_admin:
+        if review.user_id != current_user_id and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
-        updated = facade.update_review(review_id, api.payload)
+        try:
+            facade.update_review(review_id, api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
         return {'message': 'Review updated successfully'}, 200
 
     @jwt_required()
@@ -109,7 +133,7 @@ class ReviewResource(Resource):
         if not review:
             return {'error': 'Not found'}, 404
 
-        if review.user.id != current_user_id and not is_admin:
+        if review.user_id != current_user_id and not is_admin:
             return {'error': 'Unauthorized action'}, 403
 
         facade.delete_review(review_id)
@@ -118,7 +142,9 @@ class ReviewResource(Resource):
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
     @api.response(404, 'Place not found')
+    @conditional(facade.get_place_reviews_version, collection=True)
     def get(self, place_id):
         """Get all reviews for a specific place"""
         reviews = facade.get_reviews_by_place(place_id)
@@ -1,7 +1,11 @@
+from flask import current_app
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.utils.auth import is_admin
+from app.utils.conditional import conditional
+from app.utils.streaming import stream_list
+from app.utils.password_hasher import HasherBusy
 
 
 api = Namespace('users', description='User operations')
@@ -14,6 +18,14 @@ user_model = api.model('User', {
     'password': fields.String(required=True, description='User password')
 })
 
+# What user listings show; the password hash is never sent back
+user_public_model = api.model('UserPublic', {
+    'id': fields.String(description='User ID'),
+    'first_name': fields.String(description='First name of the user'),
+    'last_name': fields.String(description='Last name of the user'),
+    'email': fields.String(description='Email of the user')
+})
+
 @api.route('/')
 class UserList(Resource):
     @jwt_required()
@@ -40,17 +52,23 @@ class UserList(Resource):
             }, 201
         except ValueError as e:
             return {'error': str(e)}, 400
+        except HasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': '1'}
 
-    @api.marshal_list_with(user_model)
+    @api.response(200, 'List of users retrieved successfully', [user_public_model])
+    @api.response(304, 'Not modified since the ETag or date given')
+    @conditional(facade.get_users_version, collection=True)
     def get(self):
-        """Get list of all users"""
-        users = facade.get_all_users()
-        return users, 200
+        """Get list of all users, streamed as a JSON array or NDJSON (by Accept)"""
+        users = facade.iter_user_summaries(current_app.config['STREAM_BATCH_ROWS'])
+        return stream_list(users, facade.count_users)
 
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
+    @api.response(304, 'Not modified since the ETag or date given')
     @api.response(404, 'User not found')
+    @conditional(facade.get_user_version)
     def get(self, user_id):
         """Get user details by ID"""
         user = facade.get_user(user_id)
@@ -77,7 +95,10 @@ class UserResource(Resource):
             if existing_user and existing_user.id != user_id:
                 return {'error': 'Email already in use'}, 400
 
-        updated = facade.update_user(user_id, data)
+        try:
+            updated = facade.update_user(user_id, data)
+        except HasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': '1'}
         if not updated:
             return {'error': 'User not found'}, 404
 
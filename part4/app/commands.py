@@ -0,0 +1,44 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+from app.services import facade
+from app.utils.static_assets import asset_dirs, build_assets
+
+hbnb_cli = AppGroup('hbnb', help='HBnB maintenance commands.')
+
+
+@hbnb_cli.command('reconcile-ratings')
+@click.option('--fix', is_flag=True, help='Overwrite drifted aggregates with recomputed values.')
+def reconcile_ratings(fix):
+    """Recompute per-place rating aggregates from reviews and report drift."""
+    drift = facade.reconcile_place_ratings(fix=fix)
+    for place_id, stored, actual in drift:
+        click.echo(f'{place_id}: stored={stored} actual={actual}')
+    action = 'fixed' if fix else 'found'
+    click.echo(f'{len(drift)} drifted place(s) {action}')
+
+
+@hbnb_cli.command('seed')
+@click.option('--users', default=1000, show_default=True, type=click.IntRange(1))
+@click.option('--places', default=5000, show_default=True, type=click.IntRange(0))
+@click.option('--reviews', default=20000, show_default=True, type=click.IntRange(0))
+@click.option('--seed', 'seed_value', default=0, show_default=True, help='Same seed, same data.')
+@click.option('--password', default='password', show_default=True, help='Password of every generated user.')
+def seed(users, places, reviews, seed_value, password):
+    """Bulk-load synthetic users, places and reviews for scale testing."""
+    try:
+        counts = facade.seed_data(users, places, reviews, seed=seed_value, password=password)
+    except IntegrityError:
+        raise click.ClickException(f'Data from seed {seed_value} is already loaded; pick another --seed')
+    click.echo(', '.join(f'{count} {table}' for table, count in counts.items()))
+
+
+@hbnb_cli.command('build-assets')
+@click.option('--target', type=click.Path(file_okay=False), help='Output directory (default: STATIC_BUILD_DIR).')
+def build_assets_command(target):
+    """Write content-hashed, precompressed copies of the frontend's scripts and styles."""
+    source, default_target = asset_dirs(current_app)
+    manifest = build_assets(source, target or default_target)
+    for name, hashed in manifest.items():
+        click.echo(f'{name} -> {hashed}')
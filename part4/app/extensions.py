@@ -1,7 +1,19 @@
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from app.utils.password_hasher import PasswordHasher
+from app.utils.sql_timing import SQLTiming
+from app.utils.metrics import Metrics
+from app.utils.entity_cache import EntityCache
+from app.utils.compression import Compression
+from app.utils.static_assets import StaticAssets
+from app.utils.sqlite_pragmas import SQLitePragmas
 
-bcrypt = Bcrypt()
+hasher = PasswordHasher()
+sqlite_pragmas = SQLitePragmas()
+sql_timing = SQLTiming()
+metrics = Metrics()
+entity_cache = EntityCache()
+compression = Compression()
+static_assets = StaticAssets()
 jwt = JWTManager()
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
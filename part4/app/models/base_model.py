@@ -1,4 +1,5 @@
 from app import db
+from app.persistence.unit_of_work import commit
 import uuid
 from datetime import datetime
 
@@ -12,7 +13,7 @@ class BaseModel(db.Model):
     def save(self):
         """Update timestamp before saving"""
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+        commit()
     
     def update(self, data):
         """Update fields with a dictionary of values"""
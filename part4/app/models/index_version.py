@@ -0,0 +1,9 @@
+from app.extensions import db
+
+
+class IndexVersion(db.Model):
+    """Change counter of one in-memory index, bumped by every write that affects it"""
+    __tablename__ = 'index_versions'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
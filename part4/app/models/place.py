@@ -1,5 +1,7 @@
 from app.extensions import db
 from app.models.base_model import BaseModel
+from app.models.place_location import PlaceLocation
+from app.models.place_rating import PlaceRating
 
 
 place_amenity = db.Table(
@@ -11,6 +13,12 @@ place_amenity = db.Table(
 
 class Place(BaseModel):
     __tablename__ = 'places'
+    __table_args__ = (
+        # Backs the (created_at, id) keyset used to page through places
+        db.Index('ix_places_created_at_id', 'created_at', 'id'),
+        # Serves price range predicates and the (price, id) sort keysets
+        db.Index('ix_places_price_id', 'price', 'id'),
+    )
 
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String, nullable=True)
@@ -25,12 +33,27 @@ class Place(BaseModel):
     # One place can have many reviews
     reviews = db.relationship('Review', back_populates='place', cascade='all, delete-orphan')
 
+    # Spatial index entry, kept in step with latitude/longitude
+    location = db.relationship(
+        'PlaceLocation',
+        back_populates='place',
+        uselist=False,
+        cascade='all, delete-orphan'
+    )
+
+    # Review count, rating sum and histogram, maintained by the facade
+    rating_stats = db.relationship(
+        'PlaceRating',
+        back_populates='place',
+        uselist=False,
+        cascade='all, delete-orphan'
+    )
+
     # Many-to-many relationship with amenities via association table
     amenities = db.relationship(
         'Amenity',
         secondary=place_amenity,
-        back_populates='places',
-        lazy='dynamic'
+        back_populates='places'
     )
 
     def __init__(self, title, description, price, latitude, longitude, owner):
@@ -53,6 +76,15 @@ class Place(BaseModel):
         self.latitude = latitude
         self.longitude = longitude
         self.owner = owner
+        self.rating_stats = PlaceRating()
+        self.locate()
+
+    def locate(self):
+        """Point the spatial index entry at the current coordinates"""
+        if self.location is None:
+            self.location = PlaceLocation(self.latitude, self.longitude)
+        else:
+            self.location.move_to(self.latitude, self.longitude)
 
     def add_review(self, review):
         self.reviews.append(review)
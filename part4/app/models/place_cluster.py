@@ -0,0 +1,23 @@
+from app.extensions import db
+
+
+class PlaceCluster(db.Model):
+    """Running totals of the places inside one grid cell at one level"""
+    __tablename__ = 'place_clusters'
+
+    level = db.Column(db.Integer, primary_key=True)
+    cell = db.Column(db.Integer, primary_key=True)
+    place_count = db.Column(db.Integer, nullable=False, default=0)
+    latitude_sum = db.Column(db.Float, nullable=False, default=0.0)
+    longitude_sum = db.Column(db.Float, nullable=False, default=0.0)
+    price_sum = db.Column(db.Float, nullable=False, default=0.0)
+    min_price = db.Column(db.Float, nullable=True)
+
+    def to_dict(self):
+        return {
+            'latitude': self.latitude_sum / self.place_count,
+            'longitude': self.longitude_sum / self.place_count,
+            'count': self.place_count,
+            'min_price': self.min_price,
+            'avg_price': self.price_sum / self.place_count
+        }
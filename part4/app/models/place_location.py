@@ -0,0 +1,26 @@
+from app.extensions import db
+from app.utils.geo import cell_for
+
+
+class PlaceLocation(db.Model):
+    """Spatial index entry of a place: its grid cell plus a copy of its coordinates"""
+    __tablename__ = 'place_locations'
+    __table_args__ = (
+        # Range scans on cell, with the coordinates available for the box check
+        db.Index('ix_place_locations_cell', 'cell', 'latitude', 'longitude'),
+    )
+
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), primary_key=True)
+    cell = db.Column(db.Integer, nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+
+    place = db.relationship('Place', back_populates='location')
+
+    def __init__(self, latitude, longitude):
+        self.move_to(latitude, longitude)
+
+    def move_to(self, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.cell = cell_for(latitude, longitude)
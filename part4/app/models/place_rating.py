@@ -0,0 +1,38 @@
+from datetime import datetime
+from app.extensions import db
+
+STARS = range(1, 6)
+
+
+class PlaceRating(db.Model):
+    """Review count, rating sum and star histogram of a place, kept in step with its reviews"""
+    __tablename__ = 'place_ratings'
+
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    stars_1 = db.Column(db.Integer, nullable=False, default=0)
+    stars_2 = db.Column(db.Integer, nullable=False, default=0)
+    stars_3 = db.Column(db.Integer, nullable=False, default=0)
+    stars_4 = db.Column(db.Integer, nullable=False, default=0)
+    stars_5 = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    place = db.relationship('Place', back_populates='rating_stats')
+
+    def __init__(self):
+        self.review_count = 0
+        self.rating_sum = 0
+        for stars in STARS:
+            setattr(self, f'stars_{stars}', 0)
+
+    @property
+    def average(self):
+        return round(self.rating_sum / self.review_count, 2) if self.review_count else None
+
+    @property
+    def histogram(self):
+        return {str(stars): getattr(self, f'stars_{stars}') for stars in STARS}
+
+    def to_dict(self):
+        return {'count': self.review_count, 'average': self.average, 'histogram': self.histogram}
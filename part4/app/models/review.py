@@ -3,6 +3,12 @@ from app.models.base_model import BaseModel
 
 class Review(BaseModel):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # One review per user and place, as in scripts/schema.sql
+        db.Index('uq_reviews_user_place', 'user_id', 'place_id', unique=True),
+        # Place review lists and their ETag versions look reviews up by place
+        db.Index('ix_reviews_place_id', 'place_id'),
+    )
 
     text = db.Column(db.String, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
@@ -1,4 +1,4 @@
-from app.extensions import db, bcrypt
+from app.extensions import db, hasher
 from app.models.base_model import BaseModel
 import re
 
@@ -12,6 +12,9 @@ class User(BaseModel):
     password = db.Column(db.String(128), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
 
+    # Kept out of entity cache snapshots, which may live in a shared Redis
+    snapshot_exclude = ('password',)
+
     # One user can own many places
     places = db.relationship('Place', back_populates='owner', cascade='all, delete-orphan')
 
@@ -41,8 +44,8 @@ class User(BaseModel):
 
     def hash_password(self, password):
         """Hashes the password before storing it."""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = hasher.hash(password)
     
     def verify_password(self, password):
         """Verifies if the provided password matches the hashed password."""
-        return bcrypt.check_password_hash(self.password, password)
+        return hasher.verify(self.password, password)
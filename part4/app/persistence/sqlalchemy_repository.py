@@ -1,33 +1,138 @@
+from datetime import datetime
+from sqlalchemy import func, tuple_
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.persistence.repository import Repository
+from app.persistence.unit_of_work import commit
 
 class SQLAlchemyRepository(Repository):
+    # Columns that define the stable order used by keyset pagination
+    keyset = ('created_at', 'id')
+
     def __init__(self, model):
         self.model = model
 
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        try:
+            commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise
+
+    def add_all(self, objs):
+        """Insert many objects in one flush; the ORM batches the INSERTs per table"""
+        db.session.add_all(objs)
+        commit()
 
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+    def get(self, obj_id, options=()):
+        """Fetch by primary key; `options` are loader options such as joinedload()"""
+        return db.session.get(self.model, obj_id, options=options)
 
     def get_all(self):
         return self.model.query.all()
 
+    def count(self):
+        return db.session.scalar(db.select(func.count()).select_from(self.model))
+
+    def iter_columns(self, names, batch_size=1000):
+        """Yield {name: value} for every row, fetching batch_size rows at a time and
+        building no ORM objects"""
+        columns = [getattr(self.model, name) for name in names]
+        result = db.session.execute(db.select(*columns).execution_options(yield_per=batch_size))
+        for row in result:
+            yield dict(zip(names, row))
+
+    def get_version(self, obj_id):
+        """(updated_at,) of one row without loading the object, or None if there is no such row"""
+        row = db.session.execute(db.select(self.model.updated_at).where(self.model.id == obj_id)).first()
+        return tuple(row) if row else None
+
+    def version(self):
+        """(row count, latest updated_at) of the table: inserts and updates move the
+        latest timestamp, deletes the count"""
+        return tuple(db.session.execute(db.select(func.count(), func.max(self.model.updated_at))).one())
+
+    def get_many(self, ids, require_all=False, query=None):
+        """Fetch several objects in one IN query, keyed by id.
+
+        Unknown ids are absent from the result, or raise ValueError naming
+        them when require_all is set. `query` replaces the model's default
+        query, for subclasses loading more with each object.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        query = self.model.query if query is None else query
+        found = {obj.id: obj for obj in query.filter(self.model.id.in_(ids))}
+        if require_all and len(found) < len(ids):
+            unknown = [obj_id for obj_id in ids if obj_id not in found]
+            raise ValueError(f"Unknown {self.model.__name__.lower()} ids: " + ", ".join(unknown))
+        return found
+
+    def get_page(self, limit, after=None):
+        """Return up to `limit` objects in keyset order, starting after the key `after`"""
+        return self._keyset_page(self.model.query, self.keyset, limit, after)
+
+    def iter_pages(self, page_size=500):
+        """Walk the whole table one keyset page at a time"""
+        after = None
+        while True:
+            page = self.get_page(page_size, after)
+            if not page:
+                return
+            yield page
+            after = self.page_key(page[-1])
+
+    def page_key(self, obj, keyset=None):
+        return tuple(getattr(obj, name) for name in keyset or self.keyset)
+
+    def _keyset_page(self, query, keyset, limit, after=None, descending=False):
+        """Order `query` by `keyset` and return the `limit` rows following `after`"""
+        columns = [getattr(self.model, name) for name in keyset]
+        if after is not None:
+            bound = tuple_(*columns)
+            key = tuple_(*self._coerce_key(keyset, after))
+            query = query.filter(bound < key if descending else bound > key)
+        if descending:
+            query = query.order_by(*[column.desc() for column in columns])
+        else:
+            query = query.order_by(*columns)
+        return query.limit(limit).all()
+
+    def _coerce_key(self, keyset, values):
+        """Turn decoded cursor values back into column values"""
+        if len(values) != len(keyset):
+            raise ValueError("Invalid cursor")
+        key = []
+        for name, value in zip(keyset, values):
+            column_type = getattr(self.model, name).type
+            if isinstance(column_type, db.DateTime):
+                if not isinstance(value, str):
+                    raise ValueError("Invalid cursor")
+                value = datetime.fromisoformat(value)
+            elif isinstance(column_type, db.Float):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError("Invalid cursor")
+            elif isinstance(column_type, db.String):
+                if not isinstance(value, str):
+                    raise ValueError("Invalid cursor")
+            key.append(value)
+        return tuple(key)
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            commit()
         return obj
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit()
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter_by(**{attr_name: attr_value}).first()
@@ -0,0 +1,74 @@
+from contextlib import contextmanager
+from functools import wraps
+from app.extensions import db
+
+
+def active():
+    """True while a unit of work is open on the current session"""
+    return db.session.info.get('unit_of_work', 0) > 0
+
+
+def commit():
+    """Commit now, or leave it to the enclosing unit of work"""
+    if not active():
+        db.session.commit()
+
+
+def after_commit(callback):
+    """Run callback once the current writes are committed; dropped on rollback.
+
+    For state kept outside the database, such as in-process indexes.
+    """
+    if active():
+        db.session.info.setdefault('after_commit', []).append(callback)
+    else:
+        callback()
+
+
+def read_snapshot():
+    """Make this session's following reads see one snapshot of the database, until
+    the session ends.
+
+    pysqlite only opens a transaction before writes, so each SELECT otherwise
+    reads whatever was last committed; on SQLite one is begun here. Other
+    databases give the session's transaction their configured isolation.
+    """
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite' and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN')
+
+
+@contextmanager
+def unit_of_work():
+    """Run the enclosed writes as one transaction.
+
+    Repository and model commits inside the block are deferred; the outermost
+    block commits once on success, then runs after_commit callbacks, and
+    rolls back if anything raises.
+    """
+    session = db.session
+    depth = session.info.get('unit_of_work', 0)
+    session.info['unit_of_work'] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except BaseException:
+        if depth == 0:
+            session.info.pop('after_commit', None)
+            session.rollback()
+        raise
+    finally:
+        session.info['unit_of_work'] = depth
+    if depth == 0:
+        for callback in session.info.pop('after_commit', ()):
+            callback()
+
+
+def transactional(method):
+    """Decorator running a facade method in a unit of work"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with unit_of_work():
+            return method(*args, **kwargs)
+    return wrapper
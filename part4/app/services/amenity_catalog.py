@@ -0,0 +1,100 @@
+import threading
+import time
+from types import MappingProxyType
+
+from flask import current_app
+
+from app.utils.representations import dumps_json
+
+
+class AmenitySnapshot:
+    """One version of the whole amenity table; never modified once built"""
+    __slots__ = ('version', 'by_id', 'listing_json')
+
+    def __init__(self, version, rows):
+        self.version = version
+        # id -> (name, updated_at)
+        self.by_id = MappingProxyType({amenity_id: (name, updated_at) for amenity_id, name, updated_at in rows})
+        # GET /api/v1/amenities/ body, serialized once per version
+        self.listing_json = dumps_json(self.listing())
+
+    def listing(self):
+        return [{'id': amenity_id, 'name': name} for amenity_id, (name, _) in self.by_id.items()]
+
+    def unknown(self, amenity_ids):
+        return [amenity_id for amenity_id in dict.fromkeys(amenity_ids) if amenity_id not in self.by_id]
+
+
+class AmenityCatalog:
+    """The amenity table held in memory as an immutable, versioned snapshot.
+
+    Readers take the current snapshot without locking; a rebuild replaces
+    it with one assignment. The version is the table's (count, latest
+    updated_at): this process rebuilds after its own amenity writes commit,
+    and checks the database version at most every AMENITY_CATALOG_CHECK_SECONDS
+    to pick up other processes' writes. An id missing from the snapshot may
+    force an earlier check, but forced checks are limited to one per interval
+    as well, so requests for bogus ids do not each query the database.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._forced_at = float('-inf')
+        self._refresh_lock = threading.Lock()
+
+    def current(self, force=False):
+        """The snapshot, first checked against the database if it is due (or forced)"""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            interval = current_app.config.get('AMENITY_CATALOG_CHECK_SECONDS', 1.0)
+            now = time.monotonic()
+            if force and now - self._forced_at >= interval:
+                self._forced_at = now
+                self._refresh_lock.acquire()
+            elif now - self._checked_at < interval:
+                return snapshot
+            # Due for a check; if another thread is already on it, serve this one meanwhile
+            elif not self._refresh_lock.acquire(blocking=False):
+                return snapshot
+        else:
+            self._refresh_lock.acquire()
+        try:
+            return self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self):
+        # Version before rows: a write in between makes the next check reload again
+        version = self.repo.version()
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != version:
+            snapshot = AmenitySnapshot(version, self.repo.catalog_rows())
+            self._snapshot = snapshot
+        self._checked_at = time.monotonic()
+        return snapshot
+
+    def reload(self):
+        """Rebuild now; run once this process's amenity writes are committed"""
+        with self._refresh_lock:
+            self._refresh()
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def require(self, amenity_ids):
+        """Raise ValueError naming the ids that are not amenities"""
+        unknown = self.current().unknown(amenity_ids)
+        if unknown:
+            # Another process may have just added them
+            unknown = self.current(force=True).unknown(amenity_ids)
+        if unknown:
+            raise ValueError("Unknown amenity ids: " + ", ".join(unknown))
+
+    def get(self, amenity_id):
+        """(name, updated_at) of an amenity, or None"""
+        entry = self.current().by_id.get(amenity_id)
+        if entry is None:
+            entry = self.current(force=True).by_id.get(amenity_id)
+        return entry
@@ -0,0 +1,152 @@
+import threading
+import time
+import numpy as np
+from app.utils.geo import EARTH_RADIUS_KM
+
+
+class CoordinateIndex:
+    """Place coordinates held in contiguous NumPy arrays for vectorised distance scans.
+
+    Slots are packed: removing a place moves the last slot into the hole, so
+    the live data is always arrays[:size].  The index lives in one process;
+    the facade loads it lazily, applies its own writes to it, and reloads it
+    when the database version it was loaded from changes.
+
+    Queries copy the array references under the lock and scan without it.
+    Writers never disturb slots below a size a reader has seen: appends go
+    past it, growing, loading and removing swap in new arrays, and a move
+    rewrites only that place's slot.
+    """
+
+    def __init__(self, capacity=1024):
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.version = None
+        self.checked_at = 0.0
+        self._reset(capacity)
+
+    def _reset(self, capacity):
+        self._ids = [None] * capacity
+        self._slots = {}
+        self._lat = np.empty(capacity, dtype=np.float64)
+        self._lng = np.empty(capacity, dtype=np.float64)
+        self._cos_lat = np.empty(capacity, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def invalidate(self):
+        """Drop everything; the next query reloads from the database"""
+        with self._lock:
+            self.loaded = False
+            self.version = None
+            self._reset(1024)
+
+    def check_due(self, interval):
+        """Whether the index should be compared with the database now; the first
+        caller to see it due claims the check, so threads do not pile up on it"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self.checked_at < interval:
+                return False
+            self.checked_at = now
+            return True
+
+    def load(self, rows, version=None):
+        """Replace the contents with (place_id, latitude, longitude) rows read at `version`"""
+        ids, latitudes, longitudes = [], [], []
+        for place_id, latitude, longitude in rows:
+            ids.append(place_id)
+            latitudes.append(latitude)
+            longitudes.append(longitude)
+        size = len(ids)
+        with self._lock:
+            self._reset(max(1024, size))
+            self._ids[:size] = ids
+            self._slots = {place_id: slot for slot, place_id in enumerate(ids)}
+            self._lat[:size] = np.radians(latitudes)
+            self._lng[:size] = np.radians(longitudes)
+            np.cos(self._lat[:size], out=self._cos_lat[:size])
+            self._size = size
+            self.version = version
+            self.checked_at = time.monotonic()
+            self.loaded = True
+
+    def upsert(self, place_id, latitude, longitude):
+        with self._lock:
+            self._put(place_id, latitude, longitude)
+
+    def apply(self, rows, version):
+        """Upsert (place_id, latitude, longitude) rows committed at `version`.
+
+        The index takes that version only when it directly follows its own;
+        otherwise another writer came in between and the next check reloads.
+        """
+        with self._lock:
+            for place_id, latitude, longitude in rows:
+                self._put(place_id, latitude, longitude)
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+    def remove(self, place_id):
+        with self._lock:
+            slot = self._slots.pop(place_id, None)
+            if slot is None:
+                return
+            last = self._size - 1
+            if slot != last:
+                # Copy first: a scan in progress may still be reading the old arrays
+                self._ids = list(self._ids)
+                self._lat, self._lng, self._cos_lat = self._lat.copy(), self._lng.copy(), self._cos_lat.copy()
+                moved = self._ids[last]
+                self._ids[slot] = moved
+                self._slots[moved] = slot
+                self._lat[slot] = self._lat[last]
+                self._lng[slot] = self._lng[last]
+                self._cos_lat[slot] = self._cos_lat[last]
+            self._ids[last] = None
+            self._size = last
+
+    def nearest(self, latitude, longitude, k, exclude=None):
+        """The k closest places to a point as (place_id, distance_km), nearest first"""
+        lat0, lng0 = np.radians(latitude), np.radians(longitude)
+        with self._lock:
+            size = self._size
+            ids, lat, lng, cos_lat = self._ids, self._lat[:size], self._lng[:size], self._cos_lat[:size]
+            excluded = self._slots.get(exclude)
+        # Haversine term; it grows with distance, so rank on it directly
+        a = np.sin((lat - lat0) * 0.5) ** 2
+        a += np.cos(lat0) * cos_lat * np.sin((lng - lng0) * 0.5) ** 2
+        if excluded is not None:
+            a[excluded] = np.inf
+            size -= 1
+        k = min(k, size)
+        if k <= 0:
+            return []
+        candidates = np.argpartition(a, k - 1)[:k] if k < len(a) else np.arange(len(a))
+        candidates = candidates[np.argsort(a[candidates], kind='stable')]
+        distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a[candidates], 1.0)))
+        return [(ids[slot], float(d)) for slot, d in zip(candidates, distances)]
+
+    def _put(self, place_id, latitude, longitude):
+        slot = self._slots.get(place_id)
+        if slot is None:
+            if self._size == len(self._ids):
+                self._grow()
+            slot = self._size
+            self._size += 1
+            self._ids[slot] = place_id
+            self._slots[place_id] = slot
+        lat = np.radians(latitude)
+        self._lat[slot] = lat
+        self._lng[slot] = np.radians(longitude)
+        self._cos_lat[slot] = np.cos(lat)
+
+    def _grow(self):
+        capacity = 2 * len(self._ids)
+        self._ids.extend([None] * (capacity - len(self._ids)))
+        for name in ('_lat', '_lng', '_cos_lat'):
+            grown = np.empty(capacity, dtype=np.float64)
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
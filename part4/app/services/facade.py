@@ -1,4 +1,8 @@
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db, entity_cache, hasher
 from app.persistence.repository import InMemoryRepository
+from app.persistence.unit_of_work import after_commit, read_snapshot, transactional
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
@@ -7,6 +11,14 @@ from app.services.repositories.user_repository import UserRepository
 from app.services.repositories.place_repository import PlaceRepository
 from app.services.repositories.review_repository import ReviewRepository
 from app.services.repositories.amenity_repository import AmenityRepository
+from app.services.repositories.place_cluster_repository import PlaceClusterRepository
+from app.services.repositories.place_rating_repository import PlaceRatingRepository
+from app.utils.metrics import cache_lookup
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.geo import haversine_km, radius_bbox, split_bbox
+from app.services.amenity_catalog import AmenityCatalog
+from app.services.coordinate_index import CoordinateIndex
+from app.services.seed import Seeder
 
 class HBnBFacade:
     def __init__(self):
@@ -14,61 +26,118 @@ class HBnBFacade:
         self.place_repo = PlaceRepository()
         self.review_repo = ReviewRepository()
         self.amenity_repo = AmenityRepository()
+        self.cluster_repo = PlaceClusterRepository()
+        self.rating_repo = PlaceRatingRepository()
+        self.coordinates = CoordinateIndex()
+        self.amenity_catalog = AmenityCatalog(self.amenity_repo)
 
 
+    @transactional
     def create_user(self, user_data):
         password = user_data.pop("password", None)
         user = User(password=password, **user_data)
         self.user_repo.add(user)
         return user
 
+    @transactional
+    def authenticate(self, email, password):
+        """User matching the credentials, or None; upgrades outdated hashes"""
+        user = self.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if hasher.needs_rehash(user.password):
+            user.hash_password(password)
+            user.save()
+        return user
+
     def get_user(self, user_id):
-        return self.user_repo.get(user_id)
+        return entity_cache.get(db.session, User, user_id, self.user_repo.get)
 
     def get_user_by_email(self, email):
         return self.user_repo.get_by_attribute('email', email)
 
+    def iter_user_summaries(self, batch_size=1000):
+        """Public fields of every user, streamed from the database"""
+        return self.user_repo.iter_columns(('id', 'first_name', 'last_name', 'email'), batch_size)
+
+    def count_users(self):
+        """User count; rows streamed after it are read from the same snapshot"""
+        read_snapshot()
+        return self.user_repo.count()
+
+    def get_user_version(self, user_id):
+        return self.user_repo.get_version(user_id)
+
+    def get_users_version(self):
+        return self.user_repo.version()
+
     def get_all_users(self):
         return self.user_repo.get_all()
 
+    @transactional
     def update_user(self, user_id, data):
         user = self.user_repo.get(user_id)
         if not user:
             return None
+        data = dict(data)
+        password = data.pop('password', None)
+        if password:
+            user.hash_password(password)
         user.update(data)
         return user
 
 
+    @transactional
     def create_amenity(self, amenity_data):
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
+        after_commit(self.amenity_catalog.reload)
         return amenity
 
     def get_amenity(self, amenity_id):
-        return self.amenity_repo.get(amenity_id)
+        return entity_cache.get(db.session, Amenity, amenity_id, self.amenity_repo.get)
+
+    def get_amenity_summary(self, amenity_id):
+        """{'id', 'name'} of an amenity from the in-memory catalog, or None"""
+        entry = self.amenity_catalog.get(amenity_id)
+        return {'id': amenity_id, 'name': entry[0]} if entry else None
+
+    def get_amenities_list(self):
+        return self.amenity_catalog.current().listing()
+
+    def get_amenities_json(self):
+        """The amenity list response body, serialized once per catalog version"""
+        return self.amenity_catalog.current().listing_json
+
+    def get_amenity_version(self, amenity_id):
+        entry = self.amenity_catalog.get(amenity_id)
+        return (entry[1],) if entry else None
+
+    def get_amenities_version(self):
+        return self.amenity_catalog.current().version
 
     def get_all_amenities(self):
         return self.amenity_repo.get_all()
 
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
         amenity = self.amenity_repo.get(amenity_id)
         if not amenity:
             return None
         amenity.update(amenity_data)
+        after_commit(self.amenity_catalog.reload)
         return amenity
 
 
+    @transactional
     def create_place(self, place_data):
         owner = self.user_repo.get(place_data['owner_id'])
         if not owner:
             raise ValueError("Owner not found")
         
-        amenities = []
-        for amenity_id in place_data.get('amenities', []):
-            amenity = self.amenity_repo.get(amenity_id)
-            if amenity:
-                amenities.append(amenity)
-        
+        amenity_ids = _id_list(place_data.get('amenities'))
+        self.amenity_catalog.require(amenity_ids)
+
         place = Place(
             title=place_data['title'],
             description=place_data.get('description', ''),
@@ -78,79 +147,363 @@ class HBnBFacade:
             owner=owner
         )
 
-        for amenity in amenities:
-            place.add_amenity(amenity)
-
+        self.cluster_repo.add_point(place.latitude, place.longitude, place.price)
         self.place_repo.add(place)
+        self.place_repo.add_amenities([(place, amenity_ids)])
+        self._coordinates_changed([place])
         return place
 
+    @transactional
+    def create_places(self, items):
+        """Create many places in one transaction.
+
+        Owners are resolved with one IN query and amenities in the catalog.
+        Returns an (id, error) pair per item, in order; items with an error
+        are skipped.
+        """
+        owners = self.user_repo.get_many(_ids(item.get('owner_id') for item in items))
+        catalog = self.amenity_catalog.current()
+        if catalog.unknown(_ids(
+            amenity_id for item in items if isinstance(item.get('amenities'), list)
+            for amenity_id in item['amenities']
+        )):
+            catalog = self.amenity_catalog.current(force=True)
+        results, places, place_amenities = [], [], []
+        for item in items:
+            try:
+                owner = _lookup(owners, item.get('owner_id'))
+                if not owner:
+                    raise ValueError("Owner not found")
+                amenity_ids = _id_list(item.get('amenities'))
+                unknown = catalog.unknown(amenity_ids)
+                if unknown:
+                    raise ValueError("Unknown amenity ids: " + ", ".join(unknown))
+                for name in ('price', 'latitude', 'longitude'):
+                    _check_number(item, name)
+                if not isinstance(item.get('title'), str):
+                    raise ValueError("Title cannot be empty")
+                place = Place(
+                    title=item['title'],
+                    description=item.get('description', ''),
+                    price=item['price'],
+                    latitude=item['latitude'],
+                    longitude=item['longitude'],
+                    owner=owner
+                )
+            except ValueError as e:
+                results.append((None, str(e)))
+                continue
+            places.append(place)
+            place_amenities.append((place, amenity_ids))
+            results.append((place, None))
+
+        self.cluster_repo.add_points((place.latitude, place.longitude, place.price) for place in places)
+        self.place_repo.add_all(places)
+        self.place_repo.add_amenities(place_amenities)
+        if places:
+            self._coordinates_changed(places)
+        return _created_ids(results)
+
     def get_place(self, place_id):
-        return self.place_repo.get(place_id)
+        return entity_cache.get(db.session, Place, place_id, self.place_repo.get)
+
+    def get_place_details(self, place_id):
+        """Place with its owner, amenities and rating aggregates loaded up front"""
+        return self.place_repo.get(place_id, options=self.place_repo.detail_options)
+
+    def get_place_version(self, place_id):
+        """Version of the place detail view, read without loading the place"""
+        return self.place_repo.detail_version(place_id)
+
+    def get_places_version(self):
+        return self.place_repo.version()
+
+    def get_all_places(self, min_price=None, max_price=None, sort='created_at'):
+        self._check_place_sort(sort)
+        return self.place_repo.get_all(min_price, max_price, sort)
+
+    def get_places_page(self, limit, cursor=None, min_price=None, max_price=None, sort='created_at'):
+        """Return one page of places and the cursor of the next page (or None)"""
+        self._check_place_sort(sort)
+        after = None
+        if cursor:
+            # Cursors carry their sort order so they cannot be replayed under another one
+            values = decode_cursor(cursor)
+            if not values or values[0] != sort:
+                raise ValueError("Invalid cursor")
+            after = values[1:]
+        # Fetch one extra row to learn whether another page follows
+        places = self.place_repo.get_page(limit + 1, after, min_price, max_price, sort)
+        if len(places) <= limit:
+            return places, None
+        places = places[:limit]
+        return places, encode_cursor((sort,) + self.place_repo.page_key(places[-1], sort))
+
+    def search_places_in_bbox(self, min_lat, min_lng, max_lat, max_lng, limit):
+        """Up to limit places inside a box; min_lng > max_lng means the box crosses the antimeridian"""
+        return self.place_repo.get_in_boxes(split_bbox(min_lat, min_lng, max_lat, max_lng), limit)
+
+    def search_places_near(self, latitude, longitude, radius_km, limit):
+        """Up to limit (place, distance_km) pairs within radius_km, nearest first"""
+        # SQL ranks by an approximate distance; the slack absorbs its ordering errors
+        candidates = self.place_repo.get_in_boxes(
+            radius_bbox(latitude, longitude, radius_km), limit=2 * limit, near=(latitude, longitude)
+        )
+        results = []
+        for place in candidates:
+            distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+            if distance <= radius_km:
+                results.append((place, distance))
+        results.sort(key=lambda result: result[1])
+        return results[:limit]
+
+    def get_nearby_places(self, place_id, k):
+        """(place, distance_km) pairs for the k places closest to a place, or None"""
+        place = self.place_repo.get(place_id)
+        if not place:
+            return None
+        nearest = self._coordinate_index().nearest(place.latitude, place.longitude, k, exclude=place.id)
+        places = self.place_repo.get_many(pid for pid, _ in nearest)
+        return [(places[pid], distance) for pid, distance in nearest if pid in places]
+
+    def _coordinate_index(self):
+        """The coordinate index, reloaded when the coordinates version no longer matches it.
+
+        Other processes' writes are picked up by comparing versions at most every
+        COORDINATE_INDEX_CHECK_SECONDS; this process's own writes are applied on
+        commit along with the version they bumped.
+        """
+        index = self.coordinates
+        fresh = index.loaded
+        if not fresh or index.check_due(current_app.config.get('COORDINATE_INDEX_CHECK_SECONDS', 1.0)):
+            # Version before rows: a write in between makes the next check reload again
+            version = self.place_repo.coordinates_version()
+            if not fresh or version != index.version:
+                index.load(self.place_repo.iter_coordinates(), version)
+                fresh = False
+        cache_lookup('coordinates', fresh)
+        return index
+
+    def _coordinates_changed(self, places):
+        """Bump the coordinates version with the write, and update a loaded index once it commits"""
+        version = self.place_repo.bump_coordinates_version()
+        if self.coordinates.loaded:
+            after_commit(lambda: self.coordinates.apply(
+                ((place.id, place.latitude, place.longitude) for place in places), version
+            ))
 
-    def get_all_places(self):
-        return self.place_repo.get_all()
+    def get_place_clusters(self, min_lat, min_lng, max_lat, max_lng, level):
+        """Precomputed clusters of one grid level visible in a box"""
+        level = min(level, self.cluster_repo.max_level)
+        clusters = []
+        for box in split_bbox(min_lat, min_lng, max_lat, max_lng):
+            clusters.extend(self.cluster_repo.get_in_bbox(level, *box))
+        return clusters
 
+    @transactional
+    def sync_place_indexes(self):
+        """Backfill the spatial index and cluster totals for places stored before them"""
+        added = self.place_repo.index_missing_locations()
+        if added or self.cluster_repo.is_empty():
+            self.cluster_repo.rebuild()
+        self.rating_repo.create_missing()
+
+    @transactional
+    def seed_data(self, users, places, reviews, seed=0, password='password'):
+        """Bulk-load synthetic data, then rebuild the derived place indexes"""
+        counts = Seeder(seed).run(users, places, reviews, password)
+        self.cluster_repo.rebuild()
+        self.place_repo.bump_coordinates_version()
+        self.coordinates.invalidate()
+        self.amenity_catalog.invalidate()
+        return counts
+
+    def reconcile_place_ratings(self, fix=False):
+        return self.rating_repo.reconcile(fix)
+
+    def _check_place_sort(self, sort):
+        if sort not in self.place_repo.sorts:
+            raise ValueError("sort must be one of: " + ", ".join(self.place_repo.sorts))
+
+    @transactional
     def update_place(self, place_id, data):
         place = self.place_repo.get(place_id)
         if not place:
             return None
         
         if 'amenities' in data:
-            amenity_ids = data.pop('amenities')
-            amenities = []
-            for amenity_id in amenity_ids:
-                amenity = self.amenity_repo.get(amenity_id)
-                if amenity:
-                    amenities.append(amenity)
-            place.amenities = amenities
+            amenity_ids = _id_list(data.pop('amenities'))
+            self.amenity_catalog.require(amenity_ids)
+            self.place_repo.replace_amenities(place, amenity_ids)
+
+        moved = 'latitude' in data or 'longitude' in data
+        if moved or 'price' in data:
+            # Move the spatial index entry and the cluster totals in the same commit as the place
+            self.cluster_repo.remove_point(place.latitude, place.longitude, place.price, place.id)
+            place.latitude = data.pop('latitude', place.latitude)
+            place.longitude = data.pop('longitude', place.longitude)
+            place.locate()
+            self.cluster_repo.add_point(place.latitude, place.longitude, data.get('price', place.price))
 
         place.update(data)
+        if moved:
+            self._coordinates_changed([place])
         return place
 
+    @transactional
     def create_review(self, review_data):
         place = self.place_repo.get(review_data.get("place_id"))
         user = self.user_repo.get(review_data.get("user_id"))
         if not place or not user:
             return None
+        # Aggregates index their star histogram by the rating, so it must be an int
+        rating = _check_rating(review_data.get("rating"))
         review = Review(
             text=review_data["text"],
-            rating=review_data["rating"],
+            rating=rating,
             user=user,
             place=place
         )
+        # Aggregates are committed together with the review
+        self.rating_repo.adjust(place.id, review.rating, 1)
         self.review_repo.add(review)
-        place.add_review(review)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # uq_reviews_user_place: the check and the insert are one statement
+            raise ValueError("You have already reviewed this place.")
         return review
 
+    @transactional
+    def create_reviews(self, user_id, items):
+        """Create many reviews by one user in one transaction.
+
+        Places and the user's existing reviews of them are looked up with one
+        IN query each. Returns an (id, error) pair per item, in order.
+        """
+        user = self.user_repo.get(user_id)
+        if not user:
+            raise ValueError("User not found")
+        places = self.place_repo.get_many(_ids(item.get('place_id') for item in items))
+        reviewed = self.review_repo.get_reviewed_place_ids(user_id, places)
+        results, rows = [], []
+        for item in items:
+            try:
+                place = _lookup(places, item.get('place_id'))
+                if not place:
+                    raise ValueError("Place not found")
+                if place.owner_id == user_id:
+                    raise ValueError("You cannot review your own place.")
+                if place.id in reviewed:
+                    raise ValueError("You have already reviewed this place.")
+                text = item.get('text')
+                if not isinstance(text, str) or not text.strip():
+                    raise ValueError("Review text cannot be empty")
+                rating = _check_rating(item.get('rating'))
+            except ValueError as e:
+                results.append((None, str(e)))
+                continue
+            reviewed.add(place.id)
+            rows.append({'text': text, 'rating': rating, 'place_id': place.id, 'user_id': user_id})
+            results.append((place.id, None))
+
+        # A review added by another request since the check above is skipped by the
+        # insert itself and reported like the check would have
+        created = self.review_repo.add_new(rows)
+        self.rating_repo.adjust_many((row['place_id'], row['rating'], 1)
+                                     for row in rows if row['place_id'] in created)
+        return [(created[place_id], None) if place_id in created
+                else (None, error or "You have already reviewed this place.")
+                for place_id, error in results]
+
     def get_review(self, review_id):
-        return self.review_repo.get(review_id)
+        return entity_cache.get(db.session, Review, review_id, self.review_repo.get)
 
     def get_all_reviews(self):
         return self.review_repo.get_all()
 
+    def iter_review_summaries(self, batch_size=1000):
+        """id, text and rating of every review, streamed from the database"""
+        return self.review_repo.iter_columns(('id', 'text', 'rating'), batch_size)
+
+    def count_reviews(self):
+        """Review count; rows streamed after it are read from the same snapshot"""
+        read_snapshot()
+        return self.review_repo.count()
+
+    def get_review_version(self, review_id):
+        return self.review_repo.get_version(review_id)
+
+    def get_reviews_version(self):
+        return self.review_repo.version()
+
+    def get_place_reviews_version(self, place_id):
+        return self.review_repo.place_version(place_id)
+
     def get_reviews_by_place(self, place_id):
-        place = self.place_repo.get(place_id)
-        return place.reviews if place else None
+        """Reviews of a place with their authors loaded, or None if the place does not exist"""
+        if not self.place_repo.get(place_id):
+            return None
+        return self.review_repo.get_by_place(place_id, options=self.review_repo.with_author)
 
     def get_user_review_for_place(self, user_id, place_id):
-        place = self.place_repo.get(place_id)
-        if not place:
-            return None
-        for review in place.reviews:
-            if review.user.id == user_id:
-                return review
-        return None
+        return self.review_repo.get_by_user_and_place(user_id, place_id)
 
+    @transactional
     def update_review(self, review_id, data):
         review = self.review_repo.get(review_id)
         if not review:
             return None
+        # A review stays attached to its place and author; only text and rating change
+        data = {key: value for key, value in data.items() if key not in ('place_id', 'user_id')}
+        if 'rating' in data:
+            rating = _check_rating(data['rating'])
+            if rating != review.rating:
+                self.rating_repo.change(review.place_id, review.rating, rating)
         review.update(data)
         return review
 
+    @transactional
     def delete_review(self, review_id):
         review = self.review_repo.get(review_id)
         if review:
+            self.rating_repo.adjust(review.place_id, review.rating, -1)
             self.review_repo.delete(review_id)
             return True
         return False
+
+
+def _ids(values):
+    """The string ids among payload values, for an IN query"""
+    return (value for value in values if isinstance(value, str))
+
+
+def _lookup(objects, obj_id):
+    return objects.get(obj_id) if isinstance(obj_id, str) else None
+
+
+def _created_ids(results):
+    """Flush to assign ids, and report them rather than objects that expire on commit"""
+    db.session.flush()
+    return [(obj.id if obj is not None else None, error) for obj, error in results]
+
+
+def _id_list(value):
+    """Amenity ids of a payload item; anything but a list of strings is rejected"""
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError("amenities must be a list of ids")
+    return value
+
+
+def _check_number(item, name):
+    value = item.get(name)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+
+
+def _check_rating(rating):
+    if isinstance(rating, bool) or not isinstance(rating, int) or not 1 <= rating <= 5:
+        raise ValueError("Rating must be between 1 and 5")
+    return rating
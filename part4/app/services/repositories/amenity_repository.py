@@ -1,6 +1,12 @@
+from app.extensions import db
 from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
 from app.models.amenity import Amenity
 
 class AmenityRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Amenity)
+
+    def catalog_rows(self):
+        """(id, name, updated_at) of every amenity, oldest first"""
+        query = db.select(Amenity.id, Amenity.name, Amenity.updated_at).order_by(Amenity.created_at, Amenity.id)
+        return [tuple(row) for row in db.session.execute(query)]
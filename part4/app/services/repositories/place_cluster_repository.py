@@ -0,0 +1,126 @@
+from sqlalchemy import func, or_, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from app.extensions import db
+from app.persistence.unit_of_work import commit
+from app.models.place import Place
+from app.models.place_cluster import PlaceCluster
+from app.models.place_location import PlaceLocation
+from app.utils.geo import GRID_LEVEL, cell_bounds, cell_for, cell_ranges
+
+class PlaceClusterRepository:
+    """Per-level cell aggregates of places, maintained one point at a time.
+
+    Writes run in the caller's session transaction and are committed with
+    the place change that caused them.
+    """
+    # Coarsest to finest precomputed level; level 14 cells are ~2.4 x 1.2 km
+    max_level = 14
+
+    def _cells(self, latitude, longitude):
+        finest = cell_for(latitude, longitude)
+        return [(level, finest >> 2 * (GRID_LEVEL - level)) for level in range(self.max_level + 1)]
+
+    def add_point(self, latitude, longitude, price):
+        self.add_points([(latitude, longitude, price)])
+
+    def add_points(self, points):
+        """Add (latitude, longitude, price) points, merged per cell into one upsert batch"""
+        totals = {}
+        for latitude, longitude, price in points:
+            for key in self._cells(latitude, longitude):
+                row = totals.get(key)
+                if row is None:
+                    totals[key] = {
+                        'level': key[0], 'cell': key[1], 'place_count': 1,
+                        'latitude_sum': latitude, 'longitude_sum': longitude,
+                        'price_sum': price, 'min_price': price
+                    }
+                else:
+                    row['place_count'] += 1
+                    row['latitude_sum'] += latitude
+                    row['longitude_sum'] += longitude
+                    row['price_sum'] += price
+                    row['min_price'] = min(row['min_price'], price)
+        if not totals:
+            return
+        stmt = insert(PlaceCluster)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['level', 'cell'],
+            set_={
+                'place_count': PlaceCluster.place_count + stmt.excluded.place_count,
+                'latitude_sum': PlaceCluster.latitude_sum + stmt.excluded.latitude_sum,
+                'longitude_sum': PlaceCluster.longitude_sum + stmt.excluded.longitude_sum,
+                'price_sum': PlaceCluster.price_sum + stmt.excluded.price_sum,
+                'min_price': func.min(PlaceCluster.min_price, stmt.excluded.min_price)
+            }
+        )
+        # Nothing is read back, so the place being created need not be flushed first
+        with db.session.no_autoflush:
+            db.session.execute(stmt, list(totals.values()))
+
+    def remove_point(self, latitude, longitude, price, place_id):
+        """Take a place out of its cells; place_id is excluded when re-deriving minimums"""
+        cells = self._cells(latitude, longitude)
+        key = tuple_(PlaceCluster.level, PlaceCluster.cell).in_(cells)
+        db.session.execute(db.update(PlaceCluster).where(key).values(
+            place_count=PlaceCluster.place_count - 1,
+            latitude_sum=PlaceCluster.latitude_sum - latitude,
+            longitude_sum=PlaceCluster.longitude_sum - longitude,
+            price_sum=PlaceCluster.price_sum - price
+        ))
+        db.session.execute(db.delete(PlaceCluster).where(key, PlaceCluster.place_count <= 0))
+
+        # A cell whose cheapest place left needs its minimum looked up again
+        stale = db.session.execute(
+            db.select(PlaceCluster.level, PlaceCluster.cell).where(key, PlaceCluster.min_price >= price)
+        ).all()
+        for level, cell in stale:
+            shift = 2 * (GRID_LEVEL - level)
+            new_min = db.session.execute(
+                db.select(func.min(Place.price))
+                .join(PlaceLocation, PlaceLocation.place_id == Place.id)
+                .where(
+                    PlaceLocation.cell.between(cell << shift, ((cell + 1) << shift) - 1),
+                    Place.id != place_id
+                )
+            ).scalar()
+            db.session.execute(db.update(PlaceCluster).where(
+                PlaceCluster.level == level, PlaceCluster.cell == cell
+            ).values(min_price=new_min))
+
+    def get_in_bbox(self, level, min_lat, min_lng, max_lat, max_lng):
+        """Clusters of one level whose cell intersects a box (not crossing the antimeridian)"""
+        ranges = cell_ranges(min_lat, min_lng, max_lat, max_lng, target_level=level)
+        clusters = PlaceCluster.query.filter(
+            PlaceCluster.level == level,
+            or_(*[PlaceCluster.cell.between(low, high) for low, high in ranges])
+        )
+        results = []
+        for cluster in clusters:
+            south, west, north, east = cell_bounds(cluster.cell, level)
+            if south <= max_lat and north >= min_lat and west <= max_lng and east >= min_lng:
+                results.append(cluster)
+        return results
+
+    def is_empty(self):
+        return db.session.query(PlaceCluster.cell).first() is None
+
+    def rebuild(self):
+        """Recompute every level from place_locations with one GROUP BY per level"""
+        db.session.execute(db.delete(PlaceCluster))
+        for level in range(self.max_level + 1):
+            cell = PlaceLocation.cell.op('>>')(2 * (GRID_LEVEL - level))
+            aggregates = (
+                db.select(
+                    db.literal(level), cell, func.count(),
+                    func.sum(PlaceLocation.latitude), func.sum(PlaceLocation.longitude),
+                    func.sum(Place.price), func.min(Place.price)
+                )
+                .join(Place, Place.id == PlaceLocation.place_id)
+                .group_by(cell)
+            )
+            db.session.execute(db.insert(PlaceCluster).from_select([
+                'level', 'cell', 'place_count', 'latitude_sum',
+                'longitude_sum', 'price_sum', 'min_price'
+            ], aggregates))
+        commit()
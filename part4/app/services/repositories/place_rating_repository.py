@@ -0,0 +1,106 @@
+from datetime import datetime
+from sqlalchemy import case, func
+from sqlalchemy.dialects.sqlite import insert
+from app.extensions import db
+from app.persistence.unit_of_work import commit
+from app.models.place import Place
+from app.models.place_rating import PlaceRating, STARS
+from app.models.review import Review
+
+COUNTERS = ['review_count', 'rating_sum'] + [f'stars_{stars}' for stars in STARS]
+
+
+class PlaceRatingRepository:
+    """Per-place rating aggregates.
+
+    Adjustments run in the caller's session transaction, so they commit
+    together with the review change that caused them.
+    """
+
+    def adjust(self, place_id, rating, delta):
+        """Add (delta=1) or remove (delta=-1) one review with the given rating"""
+        self.adjust_many([(place_id, rating, delta)])
+
+    def adjust_many(self, changes):
+        """Apply (place_id, rating, delta) changes, merged per place into one upsert batch"""
+        now = datetime.utcnow()
+        totals = {}
+        for place_id, rating, delta in changes:
+            row = totals.get(place_id)
+            if row is None:
+                row = totals[place_id] = dict.fromkeys(COUNTERS, 0)
+                row.update(place_id=place_id, updated_at=now)
+            row['review_count'] += delta
+            row['rating_sum'] += delta * rating
+            row[f'stars_{rating}'] += delta
+        if not totals:
+            return
+        stmt = insert(PlaceRating)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['place_id'],
+            set_=dict(
+                {name: getattr(PlaceRating, name) + getattr(stmt.excluded, name) for name in COUNTERS},
+                updated_at=stmt.excluded.updated_at
+            )
+        )
+        # Nothing is read back, so the review being created need not be flushed first
+        with db.session.no_autoflush:
+            db.session.execute(stmt, list(totals.values()))
+
+    def change(self, place_id, old_rating, new_rating):
+        """Move one review from old_rating to new_rating"""
+        old_column, new_column = f'stars_{old_rating}', f'stars_{new_rating}'
+        db.session.execute(db.update(PlaceRating).where(PlaceRating.place_id == place_id).values({
+            'rating_sum': PlaceRating.rating_sum + (new_rating - old_rating),
+            old_column: getattr(PlaceRating, old_column) - 1,
+            new_column: getattr(PlaceRating, new_column) + 1,
+            'updated_at': datetime.utcnow()
+        }))
+
+    def recompute(self):
+        """Aggregates derived from the reviews table: {place_id: {counter: value}}"""
+        query = db.select(
+            Review.place_id, func.count(), func.sum(Review.rating),
+            *[func.sum(case((Review.rating == stars, 1), else_=0)) for stars in STARS]
+        ).group_by(Review.place_id)
+        return {row[0]: dict(zip(COUNTERS, row[1:])) for row in db.session.execute(query)}
+
+    def stored(self):
+        query = db.select(PlaceRating.place_id, *[getattr(PlaceRating, name) for name in COUNTERS])
+        return {row[0]: dict(zip(COUNTERS, row[1:])) for row in db.session.execute(query)}
+
+    def reconcile(self, fix=False):
+        """Compare stored aggregates with the reviews table.
+
+        Returns (place_id, stored, actual) for every place that drifted;
+        with fix=True the stored rows are overwritten in one transaction.
+        """
+        actual = self.recompute()
+        stored = self.stored()
+        zero = dict.fromkeys(COUNTERS, 0)
+        place_ids = db.session.execute(db.select(Place.id)).scalars()
+        drift = []
+        for place_id in place_ids:
+            expected = actual.get(place_id, zero)
+            current = stored.get(place_id)
+            if current != expected:
+                drift.append((place_id, current, expected))
+
+        if fix and drift:
+            now = datetime.utcnow()
+            rows = [dict(expected, place_id=place_id, updated_at=now) for place_id, _, expected in drift]
+            stmt = insert(PlaceRating)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['place_id'],
+                set_={name: getattr(stmt.excluded, name) for name in COUNTERS + ['updated_at']}
+            )
+            db.session.execute(stmt, rows)
+            commit()
+        return drift
+
+    def create_missing(self):
+        """Give places stored before the aggregates existed their row"""
+        missing = db.select(Place.id).outerjoin(PlaceRating).where(PlaceRating.place_id.is_(None))
+        if db.session.execute(missing.limit(1)).first() is None:
+            return 0
+        return len(self.reconcile(fix=True))
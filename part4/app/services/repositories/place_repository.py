@@ -1,6 +1,182 @@
+import math
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import joinedload, selectinload
+from app.extensions import db
+from app.persistence.unit_of_work import commit
 from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
-from app.models.place import Place
+from app.models.index_version import IndexVersion
+from app.models.place import Place, place_amenity
+from app.models.place_location import PlaceLocation
+from app.models.place_rating import PlaceRating
+from app.models.amenity import Amenity
+from app.models.user import User
+from app.utils.geo import cell_ranges
 
 class PlaceRepository(SQLAlchemyRepository):
+    # Supported sort orders: name -> (keyset columns, descending)
+    sorts = {
+        'created_at': (('created_at', 'id'), False),
+        'price': (('price', 'id'), False),
+        '-price': (('price', 'id'), True),
+    }
+
+    # Everything the place detail view renders: one joined SELECT plus one for amenities
+    detail_options = (
+        joinedload(Place.owner),
+        joinedload(Place.rating_stats),
+        selectinload(Place.amenities),
+    )
+
     def __init__(self):
         super().__init__(Place)
+
+    def summaries(self):
+        """Query for list views, with the rating aggregates loaded in the same SELECT"""
+        return self.model.query.options(joinedload(Place.rating_stats))
+
+    def get_many(self, ids, require_all=False):
+        """The base get_many, with what place summaries show loaded up front"""
+        return super().get_many(ids, require_all, query=self.summaries())
+
+    def detail_version(self, place_id):
+        """Timestamps of everything the detail view renders, in one aggregate SELECT, or None"""
+        query = (
+            db.select(Place.updated_at, User.updated_at, PlaceRating.updated_at,
+                      func.count(Amenity.id), func.max(Amenity.updated_at))
+            .join(User, Place.owner_id == User.id)
+            .outerjoin(PlaceRating, PlaceRating.place_id == Place.id)
+            .outerjoin(place_amenity, place_amenity.c.place_id == Place.id)
+            .outerjoin(Amenity, Amenity.id == place_amenity.c.amenity_id)
+            .where(Place.id == place_id)
+            .group_by(Place.id)
+        )
+        row = db.session.execute(query).first()
+        return tuple(row) if row else None
+
+    def version(self):
+        """Place list version; summaries include the rating aggregates, so those count too"""
+        latest_rating = db.select(func.max(PlaceRating.updated_at)).scalar_subquery()
+        return tuple(db.session.execute(
+            db.select(func.count(), func.max(Place.updated_at), latest_rating).select_from(Place)
+        ).one())
+
+    def add_amenities(self, place_amenities):
+        """Insert the association rows of new places from (place, amenity_ids) pairs"""
+        db.session.flush()
+        rows = [
+            {'place_id': place.id, 'amenity_id': amenity_id}
+            for place, amenity_ids in place_amenities for amenity_id in dict.fromkeys(amenity_ids)
+        ]
+        if rows:
+            db.session.execute(place_amenity.insert(), rows)
+
+    def replace_amenities(self, place, amenity_ids):
+        """Make place_amenity rows match amenity_ids, touching only the rows that change"""
+        current = set(db.session.scalars(
+            db.select(place_amenity.c.amenity_id).where(place_amenity.c.place_id == place.id)
+        ))
+        wanted = set(amenity_ids)
+        added, removed = wanted - current, current - wanted
+        if added:
+            db.session.execute(place_amenity.insert(), [
+                {'place_id': place.id, 'amenity_id': amenity_id} for amenity_id in added
+            ])
+        if removed:
+            db.session.execute(place_amenity.delete().where(
+                place_amenity.c.place_id == place.id, place_amenity.c.amenity_id.in_(removed)
+            ))
+        # The collection is reloaded from the new rows on next access
+        db.session.expire(place, ['amenities'])
+
+    def filtered(self, min_price=None, max_price=None):
+        """Base query with the price predicates applied in SQL"""
+        query = self.summaries()
+        if min_price is not None:
+            query = query.filter(Place.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Place.price <= max_price)
+        return query
+
+    def get_all(self, min_price=None, max_price=None, sort='created_at'):
+        keyset, descending = self.sorts[sort]
+        columns = [getattr(Place, name) for name in keyset]
+        if descending:
+            columns = [column.desc() for column in columns]
+        return self.filtered(min_price, max_price).order_by(*columns).all()
+
+    def get_page(self, limit, after=None, min_price=None, max_price=None, sort='created_at'):
+        keyset, descending = self.sorts[sort]
+        query = self.filtered(min_price, max_price)
+        return self._keyset_page(query, keyset, limit, after, descending)
+
+    def page_key(self, obj, sort='created_at'):
+        return super().page_key(obj, self.sorts[sort][0])
+
+    def get_in_boxes(self, boxes, limit=None, near=None):
+        """Up to `limit` places inside any of the (min_lat, min_lng, max_lat, max_lng) boxes.
+
+        Each box is answered from the place_locations cell index: a few range
+        scans on cell, then an exact check of the stored coordinates. With
+        near=(latitude, longitude) the closest places to that point are kept.
+        """
+        conditions = []
+        for min_lat, min_lng, max_lat, max_lng in boxes:
+            cells = [
+                PlaceLocation.cell.between(low, high)
+                for low, high in cell_ranges(min_lat, min_lng, max_lat, max_lng)
+            ]
+            conditions.append(and_(
+                or_(*cells),
+                PlaceLocation.latitude.between(min_lat, max_lat),
+                PlaceLocation.longitude.between(min_lng, max_lng)
+            ))
+        query = self.summaries().join(Place.location).filter(or_(*conditions))
+        if near is not None:
+            query = query.order_by(_flat_distance(*near))
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def coordinates_version(self):
+        """Counter of coordinate changes, read from a single row; 0 before the first"""
+        return db.session.scalar(
+            db.select(IndexVersion.version).where(IndexVersion.name == 'coordinates')
+        ) or 0
+
+    def bump_coordinates_version(self):
+        """Count a place added or moved, in the caller's transaction; returns the new version"""
+        stmt = insert(IndexVersion).values(name='coordinates', version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['name'], set_={'version': IndexVersion.version + 1}
+        )
+        return db.session.execute(stmt.returning(IndexVersion.version)).scalar_one()
+
+    def iter_coordinates(self, batch_size=10000):
+        """(id, latitude, longitude) of every place, streamed without building ORM objects"""
+        query = db.session.query(Place.id, Place.latitude, Place.longitude)
+        return query.execution_options(yield_per=batch_size)
+
+    def index_missing_locations(self):
+        """Create spatial index entries for places stored before the index existed"""
+        missing = self.model.query.outerjoin(Place.location).filter(PlaceLocation.place_id.is_(None)).all()
+        for place in missing:
+            place.locate()
+        if missing:
+            commit()
+        return len(missing)
+
+
+def _flat_distance(latitude, longitude):
+    """SQL expression ranking stored locations by distance from a point.
+
+    Equirectangular distance squared, with the cosine of the mean latitude
+    from its Taylor series, since SQLite may be built without trig functions.
+    """
+    dlat = PlaceLocation.latitude - latitude
+    dlng = func.abs(PlaceLocation.longitude - longitude)
+    dlng = case((dlng > 180.0, 360.0 - dlng), else_=dlng)
+    mean = (PlaceLocation.latitude + latitude) * (math.pi / 360.0)
+    x2 = mean * mean
+    cos = 1.0 - x2 / 2.0 + x2 * x2 / 24.0 - x2 * x2 * x2 / 720.0
+    return dlat * dlat + dlng * dlng * cos * cos
@@ -1,6 +1,53 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import joinedload
+from app.extensions import db
 from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+from app.models.place import Place
 from app.models.review import Review
+from app.models.user import User
 
 class ReviewRepository(SQLAlchemyRepository):
+    # Place review lists show the author's name
+    with_author = (joinedload(Review.user),)
+
     def __init__(self):
         super().__init__(Review)
+
+    def get_by_user_and_place(self, user_id, place_id):
+        """Single lookup on the (user_id, place_id) unique index"""
+        return self.model.query.filter_by(user_id=user_id, place_id=place_id).first()
+
+    def get_reviewed_place_ids(self, user_id, place_ids):
+        """Which of place_ids the user has already reviewed, in one IN query"""
+        place_ids = list(set(place_ids))
+        if not place_ids:
+            return set()
+        query = db.select(Review.place_id).where(Review.user_id == user_id, Review.place_id.in_(place_ids))
+        return set(db.session.scalars(query))
+
+    def add_new(self, rows):
+        """Insert review rows in one statement, skipping any that clash with an existing
+        (user_id, place_id) review. Returns {place_id: id} of the rows inserted."""
+        if not rows:
+            return {}
+        stmt = insert(Review).on_conflict_do_nothing(index_elements=['user_id', 'place_id'])
+        inserted = db.session.execute(stmt.returning(Review.place_id, Review.id), rows)
+        return dict(inserted.all())
+
+    def place_version(self, place_id):
+        """(count, latest review and author updates) of a place's reviews, or None if the
+        place does not exist"""
+        query = (
+            db.select(func.count(Review.id), func.max(Review.updated_at), func.max(User.updated_at))
+            .select_from(Place)
+            .outerjoin(Review, Review.place_id == Place.id)
+            .outerjoin(User, User.id == Review.user_id)
+            .where(Place.id == place_id)
+            .group_by(Place.id)
+        )
+        row = db.session.execute(query).first()
+        return tuple(row) if row else None
+
+    def get_by_place(self, place_id, options=()):
+        return self.model.query.options(*options).filter_by(place_id=place_id).all()
@@ -0,0 +1,175 @@
+"""Deterministic synthetic data for scale testing, loaded with Core executemany inserts.
+
+Places gather around weighted city centres with some rural scatter, prices
+follow a log-normal long tail, hosts and review counts are power-law skewed,
+and every user shares one precomputed password hash.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.extensions import db, hasher
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.place_location import PlaceLocation
+from app.models.place_rating import PlaceRating, STARS
+from app.models.review import Review
+from app.models.user import User
+from app.utils.geo import cell_for
+
+# (latitude, longitude, weight, spread in degrees)
+CITIES = [
+    (40.71, -74.01, 10, 0.15), (34.05, -118.24, 7, 0.25), (51.51, -0.13, 9, 0.15),
+    (48.86, 2.35, 9, 0.10), (41.39, 2.17, 6, 0.08), (52.52, 13.40, 5, 0.12),
+    (35.68, 139.69, 7, 0.20), (-33.87, 151.21, 4, 0.15), (25.20, 55.27, 3, 0.10),
+    (-22.91, -43.17, 4, 0.12), (19.43, -99.13, 4, 0.15), (1.35, 103.82, 3, 0.06),
+    (13.76, 100.50, 4, 0.12), (41.90, 12.50, 5, 0.08), (38.72, -9.14, 4, 0.08),
+    (45.50, -73.57, 3, 0.10), (37.77, -122.42, 5, 0.12), (-34.60, -58.38, 3, 0.12),
+    (43.70, 7.26, 2, 0.05), (64.15, -21.94, 1, 0.05),
+]
+RURAL_SHARE = 0.05
+AMENITY_NAMES = [
+    'WiFi', 'Swimming Pool', 'Air Conditioning', 'Kitchen', 'Free Parking', 'Washer',
+    'Dryer', 'Heating', 'Dedicated Workspace', 'TV', 'Hair Dryer', 'Iron', 'Hot Tub',
+    'EV Charger', 'Crib', 'Gym', 'BBQ Grill', 'Breakfast', 'Fireplace', 'Beachfront',
+]
+FIRST_NAMES = ['Alex', 'Sam', 'Maria', 'Jun', 'Fatima', 'Liam', 'Chloe', 'Ivan', 'Aisha', 'Noah',
+               'Elena', 'Kenji', 'Sofia', 'Omar', 'Lena', 'Diego', 'Priya', 'Tom', 'Zoe', 'Yusuf']
+LAST_NAMES = ['Smith', 'Garcia', 'Tanaka', 'Muller', 'Rossi', 'Silva', 'Khan', 'Novak', 'Dubois',
+              'Kim', 'Nguyen', 'Ivanova', 'Haddad', 'Larsen', 'Costa', 'Okafor', 'Lopez', 'Park']
+KINDS = ['Loft', 'Studio', 'Apartment', 'Cabin', 'Villa', 'Room', 'House', 'Cottage']
+REVIEW_TEXTS = {
+    1: ['Not as described.', 'Would not stay again.'],
+    2: ['Noisy and not very clean.', 'Disappointing for the price.'],
+    3: ['Fine for a short stay.', 'Okay location, basic place.'],
+    4: ['Comfortable and well located.', 'Good stay, responsive host.'],
+    5: ['Wonderful place, highly recommended!', 'Perfect stay, would come back.'],
+}
+HISTORY_DAYS = 3 * 365
+
+
+class Seeder:
+    def __init__(self, seed=0, batch_size=10000, now=None):
+        self.rng = np.random.default_rng(seed)
+        self.ids = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = now or datetime(2025, 1, 1)
+
+    def new_ids(self, n):
+        return [str(uuid.UUID(int=self.ids.getrandbits(128), version=4)) for _ in range(n)]
+
+    def timestamps(self, days_ago):
+        return [self.now - timedelta(days=float(days)) for days in days_ago]
+
+    def insert(self, table, rows):
+        for start in range(0, len(rows), self.batch_size):
+            db.session.execute(table.insert(), rows[start:start + self.batch_size])
+
+    def run(self, users, places, reviews, password='password'):
+        """Load the data in the caller's transaction; returns rows created per table"""
+        user_ids = self.seed_users(users, hasher.hash(password))
+        amenity_ids = self.seed_amenities()
+        counts = {'users': len(user_ids), 'amenities': len(amenity_ids), 'places': 0, 'reviews': 0}
+        if places:
+            counts['places'], counts['reviews'] = self.seed_places(places, reviews, user_ids, amenity_ids)
+        return counts
+
+    def seed_users(self, n, password_hash):
+        ids = self.new_ids(n)
+        first = self.rng.integers(len(FIRST_NAMES), size=n)
+        last = self.rng.integers(len(LAST_NAMES), size=n)
+        joined = self.timestamps(self.rng.uniform(0, HISTORY_DAYS, size=n))
+        self.insert(User.__table__, [{
+            'id': ids[i], 'first_name': FIRST_NAMES[first[i]], 'last_name': LAST_NAMES[last[i]],
+            'email': f'user{i}.{ids[i][:8]}@example.com', 'password': password_hash,
+            'is_admin': False, 'created_at': joined[i], 'updated_at': joined[i]
+        } for i in range(n)])
+        return ids
+
+    def seed_amenities(self):
+        existing = dict(db.session.execute(db.select(Amenity.name, Amenity.id)).all())
+        missing = [name for name in AMENITY_NAMES if name not in existing]
+        ids = self.new_ids(len(missing))
+        self.insert(Amenity.__table__, [{
+            'id': amenity_id, 'name': name, 'description': '',
+            'created_at': self.now, 'updated_at': self.now
+        } for amenity_id, name in zip(ids, missing)])
+        existing.update(zip(missing, ids))
+        return [existing[name] for name in AMENITY_NAMES]
+
+    def coordinates(self, n):
+        weights = np.array([city[2] for city in CITIES], dtype=float)
+        city = self.rng.choice(len(CITIES), size=n, p=weights / weights.sum())
+        centres = np.array([city[:2] for city in CITIES])[city]
+        spread = np.array([city[3] for city in CITIES])[city][:, None]
+        points = centres + self.rng.normal(0, 1, size=(n, 2)) * spread
+        rural = self.rng.random(n) < RURAL_SHARE
+        points[rural, 0] = self.rng.uniform(-55, 70, size=rural.sum())
+        points[rural, 1] = self.rng.uniform(-180, 180, size=rural.sum())
+        points[:, 0] = np.clip(points[:, 0], -90, 90)
+        points[:, 1] = (points[:, 1] + 180) % 360 - 180
+        return points
+
+    def seed_places(self, n, total_reviews, user_ids, amenity_ids):
+        points = self.coordinates(n)
+        prices = np.minimum(np.round(self.rng.lognormal(np.log(90), 0.6, size=n), 2), 10000.0)
+        # A few hosts own many listings
+        host_weights = self.rng.pareto(1.5, size=len(user_ids)) + 1
+        owners = self.rng.choice(len(user_ids), size=n, p=host_weights / host_weights.sum())
+        # Review counts per place follow a heavy tail; a place's quality sets its ratings
+        popularity = self.rng.pareto(1.2, size=n) + 1
+        review_counts = self.rng.multinomial(total_reviews, popularity / popularity.sum())
+        review_counts = np.minimum(review_counts, len(user_ids) - 1)
+        quality = np.clip(self.rng.normal(4.1, 0.5, size=n), 1, 5)
+        listed = self.rng.uniform(0, HISTORY_DAYS, size=n)
+
+        created_reviews = 0
+        for start in range(0, n, self.batch_size):
+            stop = min(n, start + self.batch_size)
+            place_ids = self.new_ids(stop - start)
+            created = self.timestamps(listed[start:stop])
+            place_rows, location_rows, amenity_rows, review_rows, rating_rows = [], [], [], [], []
+            for offset, place_id in enumerate(place_ids):
+                i = start + offset
+                latitude, longitude = float(points[i, 0]), float(points[i, 1])
+                owner = int(owners[i])
+                place_rows.append({
+                    'id': place_id, 'title': f'{KINDS[i % len(KINDS)]} #{i}', 'description': '',
+                    'price': float(prices[i]), 'latitude': latitude, 'longitude': longitude,
+                    'owner_id': user_ids[owner], 'created_at': created[offset], 'updated_at': created[offset]
+                })
+                location_rows.append({
+                    'place_id': place_id, 'cell': cell_for(latitude, longitude),
+                    'latitude': latitude, 'longitude': longitude
+                })
+                for amenity in self.rng.choice(len(amenity_ids), size=self.rng.integers(0, 9), replace=False):
+                    amenity_rows.append({'place_id': place_id, 'amenity_id': amenity_ids[amenity]})
+
+                count = int(review_counts[i])
+                reviewers = self.rng.choice(len(user_ids), size=count + 1, replace=False)
+                reviewers = reviewers[reviewers != owner][:count]
+                ratings = np.clip(np.rint(self.rng.normal(quality[i], 0.9, size=count)), 1, 5).astype(int)
+                posted = self.timestamps(self.rng.uniform(0, listed[i], size=count))
+                for reviewer, rating, when in zip(reviewers, ratings, posted):
+                    rating = int(rating)
+                    review_rows.append({
+                        'id': self.new_ids(1)[0], 'text': REVIEW_TEXTS[rating][int(reviewer) % 2],
+                        'rating': rating, 'user_id': user_ids[reviewer], 'place_id': place_id,
+                        'created_at': when, 'updated_at': when
+                    })
+                histogram = np.bincount(ratings, minlength=6)
+                rating_rows.append(dict(
+                    {f'stars_{stars}': int(histogram[stars]) for stars in STARS},
+                    place_id=place_id, review_count=count, rating_sum=int(ratings.sum()),
+                    updated_at=self.now
+                ))
+                created_reviews += count
+
+            self.insert(Place.__table__, place_rows)
+            self.insert(PlaceLocation.__table__, location_rows)
+            self.insert(place_amenity, amenity_rows)
+            self.insert(Review.__table__, review_rows)
+            self.insert(PlaceRating.__table__, rating_rows)
+        return n, created_reviews
@@ -0,0 +1,28 @@
+from flask import current_app
+
+
+def batch_items(payload, key):
+    """The item list of a batch payload such as {"places": [...]}; raises ValueError"""
+    items = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"{key} must be a non-empty list")
+    limit = current_app.config['BATCH_MAX_ITEMS']
+    if len(items) > limit:
+        raise ValueError(f"At most {limit} {key} per batch")
+    if not all(isinstance(item, dict) for item in items):
+        raise ValueError(f"Each of {key} must be an object")
+    return items
+
+
+def batch_response(results):
+    """Per-item results from (id, error) pairs: 201 if all were created, 207 if some were, 400 if none"""
+    body, created = [], 0
+    for index, (obj_id, error) in enumerate(results):
+        if error is None:
+            created += 1
+            body.append({'index': index, 'status': 201, 'id': obj_id})
+        else:
+            body.append({'index': index, 'status': 400, 'error': error})
+    failed = len(results) - created
+    status = 201 if not failed else 207 if created else 400
+    return {'created': created, 'failed': failed, 'results': body}, status
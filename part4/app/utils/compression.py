@@ -0,0 +1,137 @@
+import gzip
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from app.utils.metrics import cache_lookup
+from app.utils.representations import JSON, MSGPACK, NDJSON
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when the client weighs them equally
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(available=ENCODINGS):
+    """The content coding to answer the current request with, or None for identity"""
+    return request.accept_encodings.best_match(available, default=None)
+
+
+def compress(body, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5 if level is None else level)
+    return gzip.compress(body, 6 if level is None else level, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk; each input chunk is flushed so it reaches the client"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=5)
+        process, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        process, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    try:
+        for chunk in chunks:
+            yield process(chunk) + flush()
+        yield finish()
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+class CompressedLRU:
+    """Compressed bodies by (path, ETag, encoding), bounded by their total size"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._items[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class Compression:
+    """gzip, or brotli when installed, for API responses negotiated by Accept-Encoding.
+
+    Bodies of COMPRESS_MIMETYPES smaller than COMPRESS_MIN_BYTES are sent as
+    they are. Responses carrying an ETag are the same bytes until the ETag
+    changes, so their compressed form is kept in an LRU of up to
+    COMPRESS_CACHE_BYTES and compressed once. Streamed lists are compressed
+    as they are sent.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('COMPRESS_ENABLED', True):
+            return
+        app.extensions['compression'] = CompressedLRU(app.config.get('COMPRESS_CACHE_BYTES', 16 * 1024 * 1024))
+        min_bytes = app.config.get('COMPRESS_MIN_BYTES', 1024)
+        mimetypes = set(app.config.get('COMPRESS_MIMETYPES', (JSON, NDJSON, MSGPACK)))
+
+        def compress_response(response):
+            if response.mimetype not in mimetypes or response.direct_passthrough:
+                return response
+            response.vary.add('Accept-Encoding')
+            if response.status_code != 200 or 'Content-Encoding' in response.headers:
+                return response
+            encoding = negotiate()
+            if encoding is None:
+                return response
+            if response.is_streamed:
+                response.response = compress_stream(response.response, encoding)
+                response.headers.pop('Content-Length', None)
+            else:
+                body = response.get_data()
+                if len(body) < min_bytes:
+                    return response
+                response.set_data(self.compressed(response, body, encoding))
+            response.headers['Content-Encoding'] = encoding
+            etag, weak = response.get_etag()
+            if etag is not None and not weak:
+                # Same content, different bytes; If-None-Match compares weakly
+                response.set_etag(etag, weak=True)
+            return response
+
+        app.after_request(compress_response)
+
+    def compressed(self, response, body, encoding):
+        etag, _ = response.get_etag()
+        if etag is None:
+            return compress(body, encoding)
+        cache = current_app.extensions['compression']
+        key = (request.full_path, etag, encoding)
+        packed = cache.get(key)
+        cache_lookup('compression', packed is not None)
+        if packed is None:
+            packed = compress(body, encoding)
+            cache.put(key, packed)
+        return packed
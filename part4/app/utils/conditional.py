@@ -0,0 +1,78 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, request
+from flask_restx.utils import unpack
+from werkzeug.http import http_date
+
+from app.extensions import entity_cache
+from app.utils.representations import response_mediatype
+
+
+def validators(version):
+    """(etag, last_modified) of a version tuple; its latest timestamp is Last-Modified"""
+    etag = hashlib.blake2b(repr(version).encode(), digest_size=12).hexdigest()
+    stamps = [value for value in version if isinstance(value, datetime)]
+    last_modified = max(stamps).replace(microsecond=0, tzinfo=timezone.utc) if stamps else None
+    return etag, last_modified
+
+
+def not_modified(etag, last_modified):
+    """Whether the client's copy is current; If-None-Match takes precedence over If-Modified-Since"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+def conditional(version, memoize=False, collection=False):
+    """Decorator adding ETag and Last-Modified to a GET handler and answering 304.
+
+    version(**view_args) returns the values the representation is built from,
+    such as updated_at timestamps and row counts, without loading the entities;
+    None means the resource does not exist and the handler answers as usual.
+    The query string is part of the ETag. A collection changes when rows are
+    deleted too, which no updated_at records, so it gets no Last-Modified
+    and If-Modified-Since is ignored: only the ETag, whose version holds the
+    row count, revalidates it.
+    With memoize, 200 results are kept in the entity cache by path and ETag,
+    so the handler only runs again once the version changes.
+    Place it above any marshalling decorator.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(resource, **kwargs):
+            current = version(**kwargs)
+            if current is None:
+                return view(resource, **kwargs)
+            # Each representation and set of query parameters has its own tag, so a tag
+            # never stands in for parameters the handler has not validated
+            query = tuple(sorted(request.args.items(multi=True)))
+            etag, last_modified = validators(current + (response_mediatype(), query))
+            if collection:
+                last_modified = None
+            headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache', 'Vary': 'Accept'}
+            if last_modified is not None:
+                headers['Last-Modified'] = http_date(last_modified)
+            if not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+            key = ('view', request.path, etag)
+            if memoize:
+                cached = entity_cache.get_view(key)
+                if cached is not None:
+                    return cached
+            result = view(resource, **kwargs)
+            if isinstance(result, Response):
+                # Pre-serialized bodies
+                if result.status_code == 200:
+                    result.headers.update(headers)
+                return result
+            data, code, extra = unpack(result)
+            if code == 200:
+                extra = dict(headers, **extra)
+                if memoize:
+                    entity_cache.put_view(key, (data, code, extra))
+            return data, code, extra
+        return wrapper
+    return decorator
@@ -0,0 +1,244 @@
+"""Read-through cache of entity snapshots behind the facade's get_* methods.
+
+A snapshot is the JSON of an entity's column values. Hits are attached to
+the current session with merge(load=False), so callers get an ordinary
+persistent object without a SELECT; relationships still lazy load.
+
+Each app keeps an LRU of snapshots with a TTL. ENTITY_CACHE_BACKEND adds
+a shared second level: a redis:// URL, or any object with get/set/delete
+such as LocalBackend. ORM writes to cached entities are invalidated in
+both levels once they commit. Other processes' LRUs may serve a changed
+or deleted entity until ENTITY_CACHE_TTL expires, so hits are only served
+to GET and HEAD requests: writes, and code outside requests, always load
+the entity they change from the database.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import DateTime, event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.utils.metrics import cache_lookup
+
+
+class LocalBackend:
+    """In-process stand-in for a shared cache such as Redis"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._items.pop(key, None)
+
+
+class RedisBackend:
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("ENTITY_CACHE_BACKEND is a redis:// URL but the redis package is not installed")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, value, ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*keys)
+
+
+class SnapshotLRU:
+    """Bounded map of key -> (snapshot, expiry), least recently used evicted first"""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        # Bumped by every invalidation, so loads that raced a write are not stored
+        self.generation = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[1] < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, snapshot, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._items[key] = (snapshot, time.monotonic() + self.ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def discard(self, keys):
+        with self._lock:
+            self.generation += 1
+            for key in keys:
+                self._items.pop(key, None)
+
+
+def cache_key(model, obj_id):
+    return f'hbnb:{model.__tablename__}:{obj_id}'
+
+
+def dump(obj):
+    """JSON snapshot of an entity's column values, less its snapshot_exclude ones"""
+    values = {}
+    excluded = getattr(obj, 'snapshot_exclude', ())
+    for attr in inspect(obj).mapper.column_attrs:
+        if attr.key in excluded:
+            continue
+        value = getattr(obj, attr.key)
+        values[attr.key] = value.isoformat() if isinstance(value, datetime) else value
+    return json.dumps(values).encode()
+
+
+def restore(model, snapshot):
+    """A detached, unmodified instance of model holding the snapshot's values;
+    columns left out of it load from the database when first read"""
+    values = json.loads(snapshot)
+    mapper = inspect(model)
+    # Built without __init__, which validates input and creates related rows
+    obj = mapper.class_manager.new_instance()
+    for attr in mapper.column_attrs:
+        if attr.key not in values:
+            continue
+        value = values[attr.key]
+        if value is not None and isinstance(attr.columns[0].type, DateTime):
+            value = datetime.fromisoformat(value)
+        set_committed_value(obj, attr.key, value)
+    make_transient_to_detached(obj)
+    return obj
+
+
+def read_only():
+    """Whether the current request only reads, so a slightly stale entity is acceptable"""
+    return has_request_context() and request.method in ('GET', 'HEAD')
+
+
+class EntityCache:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        size = app.config.get('ENTITY_CACHE_SIZE', 10000)
+        if not size:
+            return
+        backend = app.config.get('ENTITY_CACHE_BACKEND')
+        if isinstance(backend, str):
+            backend = RedisBackend(backend)
+        app.extensions['entity_cache'] = (SnapshotLRU(size, app.config.get('ENTITY_CACHE_TTL', 5)), backend)
+        if not event.contains(Session, 'after_flush', collect_stale):
+            event.listen(Session, 'after_flush', collect_stale)
+            event.listen(Session, 'after_commit', invalidate_stale)
+            event.listen(Session, 'after_rollback', forget_stale)
+
+    def get(self, session, model, obj_id, loader):
+        """The entity with this id from the session, the cache or loader(obj_id)"""
+        levels = current_app.extensions.get('entity_cache')
+        if levels is None or not isinstance(obj_id, str) or not read_only():
+            return loader(obj_id)
+        key = identity_key(model, obj_id)
+        current = session.identity_map.get(key)
+        if current is not None and not inspect(current).expired_attributes:
+            return current
+
+        lru, backend = levels
+        name = cache_key(model, obj_id)
+        snapshot = lru.get(name)
+        if snapshot is None and backend is not None:
+            snapshot = backend.get(name)
+            if snapshot is not None:
+                lru.put(name, snapshot)
+        cache_lookup(model.__tablename__, snapshot is not None)
+        if snapshot is not None:
+            return session.merge(restore(model, snapshot), load=False)
+
+        generation = lru.generation
+        obj = loader(obj_id)
+        if obj is not None and not session.is_modified(obj) and lru.generation == generation:
+            snapshot = dump(obj)
+            lru.put(name, snapshot, generation)
+            if backend is not None:
+                backend.set(name, snapshot, lru.ttl)
+        return obj
+
+
+    def get_view(self, key):
+        """A response kept by put_view, or None"""
+        levels = current_app.extensions.get('entity_cache')
+        if levels is None:
+            return None
+        view = levels[0].get(key)
+        cache_lookup('views', view is not None)
+        return view
+
+    def put_view(self, key, view):
+        """Keep a response in this process's LRU; key must change whenever the
+        response would, as an ETag does, since writes do not invalidate it"""
+        levels = current_app.extensions.get('entity_cache')
+        if levels is not None:
+            levels[0].put(key, view)
+
+
+def collect_stale(session, flush_context):
+    """Remember the entities a flush updated or deleted until the transaction ends"""
+    stale = session.info.setdefault('stale_entities', set())
+    for obj in session.dirty | session.deleted:
+        state = inspect(obj)
+        if state.key is not None:
+            stale.add((state.class_, state.key[1][0]))
+
+
+def invalidate_stale(session):
+    stale = session.info.pop('stale_entities', None)
+    if not stale:
+        return
+    levels = current_app.extensions.get('entity_cache')
+    if levels is None:
+        return
+    lru, backend = levels
+    names = [cache_key(model, obj_id) for model, obj_id in stale]
+    lru.discard(names)
+    if backend is not None:
+        backend.delete(*names)
+
+
+def forget_stale(session):
+    session.info.pop('stale_entities', None)
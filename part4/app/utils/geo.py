@@ -0,0 +1,123 @@
+"""Grid cells and great-circle helpers backing the place spatial index.
+
+The globe is split into a 2^GRID_LEVEL x 2^GRID_LEVEL lat/long grid and each
+cell is numbered along a Z-order (Morton) curve.  Dropping the two lowest
+bits of a cell number gives its parent one level up, so every coarser cell
+covers one contiguous run of finest-level numbers and a bounding box turns
+into a handful of B-tree range scans.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+GRID_LEVEL = 16
+# Bounding boxes are covered with at most this many cells per axis
+MAX_COVER_CELLS = 4
+
+
+def _spread(v):
+    """Insert a zero bit between each of the 16 low bits of v"""
+    v &= 0xFFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def _compact(v):
+    """Inverse of _spread: gather every other bit of v"""
+    v &= 0x55555555
+    v = (v | (v >> 1)) & 0x33333333
+    v = (v | (v >> 2)) & 0x0F0F0F0F
+    v = (v | (v >> 4)) & 0x00FF00FF
+    v = (v | (v >> 8)) & 0x0000FFFF
+    return v
+
+
+def grid_xy(latitude, longitude, level=GRID_LEVEL):
+    """Column and row of the level-`level` cell containing a point"""
+    side = 1 << level
+    x = int((longitude + 180.0) / 360.0 * side)
+    y = int((latitude + 90.0) / 180.0 * side)
+    return min(max(x, 0), side - 1), min(max(y, 0), side - 1)
+
+
+def morton(x, y):
+    return _spread(x) | (_spread(y) << 1)
+
+
+def cell_for(latitude, longitude, level=GRID_LEVEL):
+    """Z-order number of the level-`level` cell containing a point"""
+    return morton(*grid_xy(latitude, longitude, level))
+
+
+def cell_bounds(cell, level=GRID_LEVEL):
+    """(min_lat, min_lng, max_lat, max_lng) of a level-`level` cell"""
+    side = 1 << level
+    x, y = _compact(cell), _compact(cell >> 1)
+    width, height = 360.0 / side, 180.0 / side
+    return (y * height - 90.0, x * width - 180.0, (y + 1) * height - 90.0, (x + 1) * width - 180.0)
+
+
+def cell_ranges(min_lat, min_lng, max_lat, max_lng, target_level=GRID_LEVEL):
+    """Level-`target_level` cell number ranges (inclusive) covering a bounding box.
+
+    The box must not cross the antimeridian; see split_bbox.
+    """
+    level = target_level
+    while level > 0:
+        x0, y0 = grid_xy(min_lat, min_lng, level)
+        x1, y1 = grid_xy(max_lat, max_lng, level)
+        if x1 - x0 < MAX_COVER_CELLS and y1 - y0 < MAX_COVER_CELLS:
+            break
+        level -= 1
+    else:
+        x0 = y0 = x1 = y1 = 0
+
+    shift = 2 * (target_level - level)
+    cells = sorted(morton(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1))
+    ranges = []
+    for cell in cells:
+        low, high = cell << shift, ((cell + 1) << shift) - 1
+        if ranges and ranges[-1][1] + 1 == low:
+            ranges[-1][1] = high
+        else:
+            ranges.append([low, high])
+    return [tuple(r) for r in ranges]
+
+
+def split_bbox(min_lat, min_lng, max_lat, max_lng):
+    """Split a box that crosses the antimeridian (min_lng > max_lng) in two"""
+    if min_lng <= max_lng:
+        return [(min_lat, min_lng, max_lat, max_lng)]
+    return [(min_lat, min_lng, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lng)]
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """Boxes that enclose every point within radius_km of (latitude, longitude)"""
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    min_lat, max_lat = latitude - dlat, latitude + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        # The circle reaches a pole, so it spans every longitude
+        return [(max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0)]
+
+    ratio = math.sin(angular) / math.cos(math.radians(latitude))
+    if ratio >= 1.0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    dlng = math.degrees(math.asin(ratio))
+    min_lng, max_lng = longitude - dlng, longitude + dlng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return split_bbox(min_lat, min_lng, max_lat, max_lng)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,113 @@
+"""Prometheus metrics for the API, served at /metrics.
+
+Metric objects live at module level so every app in the process shares
+them. When PROMETHEUS_MULTIPROC_DIR is set (gunicorn and other pre-fork
+servers), each worker writes its values to files in that directory and a
+scrape of any worker aggregates them all.
+"""
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+REQUEST_LATENCY = Histogram(
+    'hbnb_http_request_duration_seconds', 'Time spent serving API requests',
+    ['namespace', 'resource', 'method', 'status'],
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5)
+)
+DB_POOL_CHECKOUTS = Counter('hbnb_db_pool_checkouts_total', 'Connections checked out of the pool')
+DB_POOL_SATURATED = Counter(
+    'hbnb_db_pool_saturated_checkouts_total',
+    'Checkouts made while every pooled connection was busy (waited or overflowed)'
+)
+DB_POOL_IN_USE = Gauge('hbnb_db_pool_checked_out', 'Connections currently checked out',
+                       multiprocess_mode='livesum')
+PASSWORD_HASH_PENDING = Gauge('hbnb_password_hash_pending', 'Password hashes queued or running',
+                              multiprocess_mode='livesum')
+CACHE_REQUESTS = Counter('hbnb_cache_requests_total', 'Cache lookups', ['cache', 'result'])
+
+# Label children bound once and reused, so the hot path is a dict lookup and an observe()
+_latency_children = {}
+_resource_labels = {}
+_cache_children = {}
+
+
+def cache_lookup(cache, hit):
+    """Count a hit or miss of a named cache; the hit ratio is hits / all lookups"""
+    key = (cache, hit)
+    child = _cache_children.get(key)
+    if child is None:
+        child = _cache_children[key] = CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss')
+    child.inc()
+
+
+def resource_labels(app, endpoint):
+    """(namespace, resource) of a flask_restx endpoint, e.g. ('places', 'PlaceResource')"""
+    labels = _resource_labels.get(endpoint)
+    if labels is None:
+        view_class = getattr(app.view_functions.get(endpoint), 'view_class', None)
+        if view_class is None:
+            labels = ('other', endpoint or 'unmatched')
+        else:
+            labels = (view_class.__module__.rsplit('.', 1)[-1], view_class.__name__)
+        _resource_labels[endpoint] = labels
+    return labels
+
+
+class Metrics:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        from app.extensions import db
+        with app.app_context():
+            engine = db.engine
+        pool = engine.pool
+        # QueuePool knows its size; SQLite's single-connection pools do not
+        bounded = callable(getattr(pool, 'size', None)) and callable(getattr(pool, 'checkedout', None))
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            DB_POOL_CHECKOUTS.inc()
+            DB_POOL_IN_USE.inc()
+            if bounded and pool.checkedout() > pool.size():
+                DB_POOL_SATURATED.inc()
+
+        event.listen(engine, 'checkout', on_checkout)
+        event.listen(engine, 'checkin', lambda dbapi_connection, connection_record: DB_POOL_IN_USE.dec())
+
+        @app.before_request
+        def start_timer():
+            g.metrics_start = time.perf_counter()
+
+        @app.after_request
+        def observe(response):
+            start = g.pop('metrics_start', None)
+            if start is None or request.endpoint == 'metrics':
+                return response
+            key = (request.endpoint, request.method, response.status_code)
+            child = _latency_children.get(key)
+            if child is None:
+                namespace, resource = resource_labels(app, request.endpoint)
+                child = REQUEST_LATENCY.labels(namespace, resource, request.method, str(response.status_code))
+                _latency_children[key] = child
+            child.observe(time.perf_counter() - start)
+            return response
+
+        app.add_url_rule('/metrics', 'metrics', self.scrape)
+
+    @staticmethod
+    def scrape():
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
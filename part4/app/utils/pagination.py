@@ -0,0 +1,26 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+def encode_cursor(key):
+    """Pack the sort key of the last row of a page into an opaque token."""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in key]
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Unpack a token built by encode_cursor into its list of key values."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    # Key values are strings and numbers; anything else was not built by encode_cursor
+    if not isinstance(values, list) or not all(
+        isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in values
+    ):
+        raise ValueError("Invalid cursor")
+    return values
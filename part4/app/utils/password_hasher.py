@@ -0,0 +1,112 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import bcrypt
+
+from app.utils.metrics import PASSWORD_HASH_PENDING
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full; the API answers 503"""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(hashed, password):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def rounds_of(hashed):
+    """Work factor stored in a bcrypt hash such as $2b$12$..."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """bcrypt in a bounded process pool so request threads are not pinned by it.
+
+    At most PASSWORD_HASH_MAX_PENDING hashes are queued or running; a caller
+    that cannot get a slot within PASSWORD_HASH_QUEUE_TIMEOUT seconds gets
+    HasherBusy instead of holding its thread. PASSWORD_HASH_WORKERS = 0 hashes
+    inline, which is what the tests use.
+    """
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.workers = 0
+        self.timeout = 10
+        self.queue_timeout = 2
+        self._executor = None
+        self._slots = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.shutdown()
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        workers = app.config.get('PASSWORD_HASH_WORKERS')
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 2)
+        max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING') or 4 * max(self.workers, 1)
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def hash(self, password):
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, hashed, password):
+        if not hashed:
+            return False
+        return self._run(_check, hashed, password)
+
+    def needs_rehash(self, hashed):
+        return rounds_of(hashed) != self.rounds
+
+    def pending(self):
+        """Number of hashes queued or running"""
+        return self._pending
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        PASSWORD_HASH_PENDING.dec()
+        self._slots.release()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusy("Too many password operations in progress, try again shortly")
+        with self._lock:
+            self._pending += 1
+        PASSWORD_HASH_PENDING.inc()
+        try:
+            future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise HasherBusy("Password operation timed out, try again shortly")
@@ -0,0 +1,82 @@
+"""Response encoders for the API, picked by the request's Accept header.
+
+JSON goes through orjson when it is installed and the standard library
+otherwise. application/x-ndjson writes a list one item per line, and
+application/msgpack is offered when msgpack is installed. Every encoder
+writes datetimes as ISO 8601 strings and UUIDs as their canonical
+string, so the formats carry the same values.
+"""
+import json
+import uuid
+from datetime import date, datetime
+
+from flask import make_response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
+MSGPACK = 'application/msgpack'
+
+
+def default(value):
+    """Encoding of values the encoders do not handle themselves"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+if orjson is not None:
+    def dumps_json(data, newline=True):
+        return orjson.dumps(data, default=default, option=orjson.OPT_APPEND_NEWLINE if newline else None)
+else:
+    def dumps_json(data, newline=True):
+        return (json.dumps(data, default=default) + ('\n' if newline else '')).encode()
+
+
+def dumps_msgpack(data):
+    # datetime=False leaves datetimes to default(), matching the JSON output
+    return msgpack.packb(data, default=default, datetime=False)
+
+
+def output_json(data, code, headers=None):
+    response = make_response(dumps_json(data), code)
+    response.headers.extend(headers or {})
+    response.mimetype = JSON
+    return response
+
+
+def output_ndjson(data, code, headers=None):
+    lines = data if isinstance(data, list) else [data]
+    response = make_response(b''.join(dumps_json(line) for line in lines), code)
+    response.headers.extend(headers or {})
+    response.mimetype = NDJSON
+    return response
+
+
+def output_msgpack(data, code, headers=None):
+    response = make_response(dumps_msgpack(data), code)
+    response.headers.extend(headers or {})
+    response.mimetype = MSGPACK
+    return response
+
+
+# Media type -> output function, registered on the Api in create_app
+representations = {JSON: output_json, NDJSON: output_ndjson}
+if msgpack is not None:
+    representations[MSGPACK] = output_msgpack
+
+
+def response_mediatype():
+    """The representation the current request will be answered with"""
+    return request.accept_mimetypes.best_match(representations, default=JSON)
@@ -0,0 +1,132 @@
+import json
+import logging
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+log = logging.getLogger('app.sql')
+slow_log = logging.getLogger('app.sql.slow')
+
+
+class RequestStats:
+    __slots__ = ('queries', 'seconds', 'rows', 'started')
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.started = time.perf_counter()
+
+
+def current_stats():
+    """Statistics of the request being served, or None outside requests"""
+    return g.get('sql_stats') if has_request_context() else None
+
+
+class SQLTiming:
+    """Per-request SQL statement count, DB time and row count.
+
+    They are reported in a Server-Timing header and one JSON log line per
+    request on the app.sql logger; for a streamed body, the log line is
+    written when it has been sent and the header covers what ran before
+    it. Rows are those written by INSERT, UPDATE and DELETE plus the ORM
+    objects loaded. With SQL_SLOW_QUERY_MS set, slower statements are
+    logged on app.sql.slow with their query plan.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('SQL_TIMING', True):
+            return
+        from app.extensions import db
+        with app.app_context():
+            engine = db.engine
+        slow_ms = app.config.get('SQL_SLOW_QUERY_MS')
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['query_start'].pop()
+            stats = current_stats()
+            if stats is not None:
+                stats.queries += 1
+                stats.seconds += elapsed
+                if cursor.rowcount > 0:
+                    stats.rows += cursor.rowcount
+            if slow_ms is not None and elapsed * 1000 >= slow_ms:
+                log_slow_query(conn, statement, parameters, executemany, elapsed)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+        if not event.contains(Session, 'loaded_as_persistent', count_loaded):
+            event.listen(Session, 'loaded_as_persistent', count_loaded)
+        app.before_request(start_request)
+        app.after_request(report_request)
+
+
+def count_loaded(session, instance):
+    stats = current_stats()
+    if stats is not None:
+        stats.rows += 1
+
+
+def start_request():
+    g.sql_stats = RequestStats()
+
+
+def report_request(response):
+    stats = g.get('sql_stats')
+    if stats is None:
+        return response
+    entry = {'method': request.method, 'path': request.path, 'endpoint': request.endpoint,
+             'status': response.status_code}
+    db_ms = stats.seconds * 1000
+    total_ms = (time.perf_counter() - stats.started) * 1000
+    desc = f'{stats.queries} queries, {stats.rows} rows'
+    if response.is_streamed:
+        # The body's queries run as it is sent, after the headers are out: the header
+        # only covers what came before, and the log line is written once it is done
+        desc += ' before the body'
+        response.call_on_close(lambda: log_request(entry, stats, streamed=True))
+    else:
+        g.pop('sql_stats')
+        log_request(entry, stats)
+    response.headers.add('Server-Timing', f'db;dur={db_ms:.2f};desc="{desc}", app;dur={total_ms:.2f}')
+    return response
+
+
+def log_request(entry, stats, streamed=False):
+    entry = dict(entry, queries=stats.queries, db_ms=round(stats.seconds * 1000, 2), rows=stats.rows,
+                 total_ms=round((time.perf_counter() - stats.started) * 1000, 2))
+    if streamed:
+        entry['streamed'] = True
+    log.info(json.dumps(entry))
+
+
+def log_slow_query(conn, statement, parameters, executemany, elapsed):
+    plan = None
+    if not executemany and statement.lstrip().upper().startswith('SELECT'):
+        sqlite = conn.dialect.name == 'sqlite'
+        explain = 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '
+        # Straight on the DBAPI connection, so these events do not see it
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(explain + statement, parameters)
+            # SQLite rows are (id, parent, notused, detail)
+            plan = [row[-1] if sqlite else ' '.join(map(str, row)) for row in cursor.fetchall()]
+        except Exception as e:
+            plan = [f'unavailable: {e}']
+        finally:
+            cursor.close()
+    slow_log.warning(json.dumps({
+        'duration_ms': round(elapsed * 1000, 2),
+        'path': request.path if has_request_context() else None,
+        'statement': ' '.join(statement.split()),
+        'plan': plan
+    }))
@@ -0,0 +1,43 @@
+import logging
+
+from sqlalchemy import event
+
+log = logging.getLogger('app.sql')
+
+
+class SQLitePragmas:
+    """Runs SQLITE_PRAGMAS ({name: value}, in order) on every new SQLite connection.
+
+    Most pragmas only last as long as the connection, so they are set from the
+    engine's connect event rather than once. Other databases are left alone.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        pragmas = app.config.get('SQLITE_PRAGMAS')
+        if not pragmas:
+            return
+        from app.extensions import db
+        with app.app_context():
+            engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+        statements = [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for statement in statements:
+                    cursor.execute(statement)
+                # In-memory databases cannot use WAL and report 'memory' instead
+                mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+            finally:
+                cursor.close()
+            wanted = str(pragmas.get('journal_mode', mode)).lower()
+            if mode.lower() != wanted:
+                log.warning('SQLite journal_mode is %s, not %s', mode, wanted)
+
+        event.listen(engine, 'connect', set_pragmas)
@@ -0,0 +1,113 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+from flask import current_app, send_from_directory
+
+from app.utils.compression import brotli, negotiate
+
+# Files given a content hash in their name; everything else keeps its name
+FINGERPRINTED = ('.js', '.css')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def fingerprint(name, content):
+    stem, ext = os.path.splitext(name)
+    return f'{stem}.{hashlib.blake2b(content, digest_size=6).hexdigest()}{ext}'
+
+
+def write(path, data):
+    # Renamed into place, so a worker never serves a half-written file
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def build_assets(source, target):
+    """Write content-hashed copies of source's scripts and styles to target, with .gz
+    (and .br when brotli is installed) next to them, and its pages rewritten to
+    point at them. Returns {name: hashed name}."""
+    os.makedirs(target, exist_ok=True)
+    names = sorted(os.listdir(source))
+    manifest = {}
+    for name in names:
+        path = os.path.join(source, name)
+        if not name.endswith(FINGERPRINTED) or not os.path.isfile(path):
+            continue
+        with open(path, 'rb') as f:
+            content = f.read()
+        hashed = manifest[name] = fingerprint(name, content)
+        variants = {hashed: lambda: content, hashed + '.gz': lambda: gzip.compress(content, 9, mtime=0)}
+        if brotli is not None:
+            variants[hashed + '.br'] = lambda: brotli.compress(content, quality=11)
+        for variant, make in variants.items():
+            # A new content gets a new name, so a file that exists is current
+            if not os.path.exists(os.path.join(target, variant)):
+                write(os.path.join(target, variant), make())
+
+    references = re.compile(r'\b(href|src)="(%s)"' % '|'.join(map(re.escape, manifest)))
+    for name in names:
+        if name.endswith('.html'):
+            with open(os.path.join(source, name), encoding='utf-8') as f:
+                page = f.read()
+            if manifest:
+                page = references.sub(lambda match: f'{match[1]}="{manifest[match[2]]}"', page)
+            write(os.path.join(target, name), page.encode('utf-8'))
+    write(os.path.join(target, 'manifest.json'), json.dumps(manifest, indent=2).encode())
+    return manifest
+
+
+def asset_dirs(app):
+    """(source, target) directories of the frontend build"""
+    source = app.config.get('STATIC_SOURCE_DIR') or os.path.join(os.path.dirname(app.root_path), 'static')
+    target = app.config.get('STATIC_BUILD_DIR') or os.path.join(app.instance_path, 'static')
+    return source, target
+
+
+def serve_asset(filename):
+    source, target, hashed = current_app.extensions['static_assets']
+    if filename in hashed:
+        available = [encoding for encoding in SUFFIXES
+                     if os.path.exists(os.path.join(target, filename + SUFFIXES[encoding]))]
+        encoding = negotiate(available) if available else None
+        response = send_from_directory(target, filename + SUFFIXES.get(encoding, ''),
+                                       mimetype=mimetypes.guess_type(filename)[0])
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE
+        return response
+    if filename.endswith('.html') and os.path.isfile(os.path.join(target, filename)):
+        # Pages name the current hashes, so they are revalidated every time
+        response = send_from_directory(target, filename)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return send_from_directory(source, filename)
+
+
+class StaticAssets:
+    """Serves the frontend in static/ at STATIC_ASSETS_URL.
+
+    At startup its scripts and styles are copied under content-hashed names
+    with precompressed .gz/.br variants, and the pages are rewritten to use
+    them. Hashed files never change, so they are sent with a far-future
+    immutable Cache-Control and the variant matching Accept-Encoding.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('STATIC_ASSETS', True):
+            return
+        source, target = asset_dirs(app)
+        manifest = build_assets(source, target)
+        app.extensions['static_assets'] = (source, target, frozenset(manifest.values()))
+        url = app.config.get('STATIC_ASSETS_URL', '/static').rstrip('/')
+        app.add_url_rule(url + '/<path:filename>', 'static_assets', serve_asset)
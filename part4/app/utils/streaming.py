@@ -0,0 +1,62 @@
+import itertools
+
+from flask import Response, current_app, stream_with_context
+
+from app.utils import representations
+from app.utils.representations import JSON, MSGPACK, NDJSON, dumps_json, response_mediatype
+
+
+def exactly(rows, length):
+    """The first length rows, then None until there are length items"""
+    sent = 0
+    for row in itertools.islice(rows, length):
+        sent += 1
+        yield row
+    for _ in range(length - sent):
+        yield None
+
+
+def stream_list(rows, count=None):
+    """Stream an iterable of dicts as a list in the negotiated representation.
+
+    Items are encoded one at a time and sent in chunks of about
+    STREAM_CHUNK_BYTES, so memory does not grow with the number of rows.
+    JSON is a chunked array, NDJSON one item per line; a MessagePack array
+    needs its length up front, which count() provides. count() is called
+    as the body starts, in the session rows is then read in, and both must
+    come from one snapshot; should they still disagree, the array is cut or
+    padded with nils to the announced length rather than corrupted.
+
+    The rows' SELECT stays open until the client has the whole body. Without
+    WAL journaling, SQLite writers wait for it to finish.
+    """
+    mediatype = response_mediatype()
+    if mediatype == MSGPACK:
+        packer = representations.msgpack.Packer(default=representations.default, datetime=False)
+        opening, separator, closing, encode = None, b'', b'', packer.pack
+    elif mediatype == NDJSON:
+        opening, separator, closing, encode = b'', b'', b'', dumps_json
+    else:
+        mediatype = JSON
+        opening, separator, closing, encode = b'[', b',', b']\n', lambda row: dumps_json(row, newline=False)
+    chunk_size = current_app.config.get('STREAM_CHUNK_BYTES', 64 * 1024)
+
+    def generate():
+        items, start = rows, opening
+        if start is None:
+            length = count()
+            items, start = exactly(rows, length), packer.pack_array_header(length)
+        buffer, size = [start], len(start)
+        for i, row in enumerate(items):
+            piece = encode(row)
+            if i and separator:
+                buffer.append(separator)
+            buffer.append(piece)
+            size += len(piece) + 1
+            if size >= chunk_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        buffer.append(closing)
+        yield b''.join(buffer)
+
+    return Response(stream_with_context(generate()), mimetype=mediatype)
@@ -0,0 +1,281 @@
+"""Latency, throughput and SQL statements per request of every /api/v1 endpoint.
+
+Each dataset size is seeded with `hbnb seed` data (users = places / 5,
+reviews = places * 10) in a temporary SQLite file. Requests go through the
+Flask test client, or with --server through a real threaded WSGI server.
+Run from part4/:
+
+    python -m benchmarks.endpoints --sizes 1000,10000 --output results.json
+    python -m benchmarks.endpoints --baseline benchmarks/baselines/endpoints.json
+
+A comparison fails (exit status 1) when an endpoint runs more SQL statements
+than in the baseline, or its p95 latency grows beyond --tolerance.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.place_rating import PlaceRating
+from app.models.review import Review
+from app.services import facade
+from config import TestingConfig
+
+# (name, method, path template, body template); {place}, {user}, {review}, {amenity} are filled in,
+# and {n}, {unreviewed} (a place the admin has not reviewed) and {spare_review} differ per request
+ENDPOINTS = [
+    ('places.list_unpaged', 'GET', '/api/v1/places/', None),
+    ('places.list_page', 'GET', '/api/v1/places/?limit=50&sort=-price', None),
+    ('places.detail', 'GET', '/api/v1/places/{place}', None),
+    ('places.reviews', 'GET', '/api/v1/places/{place}/reviews', None),
+    ('places.search_radius', 'GET', '/api/v1/places/search?lat=48.86&lng=2.35&radius_km=5', None),
+    ('places.search_bbox', 'GET', '/api/v1/places/search?bbox=-0.5,51.3,0.3,51.7', None),
+    ('places.nearby', 'GET', '/api/v1/places/{place}/nearby?k=10', None),
+    ('places.clusters', 'GET', '/api/v1/places/clusters?bbox=-180,-85,180,85&zoom=2', None),
+    ('places.create', 'POST', '/api/v1/places/', {
+        'title': 'Bench place', 'price': 80.0, 'latitude': 45.76, 'longitude': 4.83,
+        'amenities': ['{amenity}']
+    }),
+    ('places.update', 'PUT', '/api/v1/places/{place}', {'price': 95.0}),
+    ('places.batch', 'POST', '/api/v1/places/batch', {'places': [
+        {'title': f'Bench place {i}', 'price': 80.0 + i, 'latitude': 45.76, 'longitude': 4.83,
+         'amenities': ['{amenity}']} for i in range(10)
+    ]}),
+    ('amenities.list', 'GET', '/api/v1/amenities/', None),
+    ('amenities.detail', 'GET', '/api/v1/amenities/{amenity}', None),
+    ('amenities.create', 'POST', '/api/v1/amenities/', {'name': 'Bench amenity {n}'}),
+    ('amenities.update', 'PUT', '/api/v1/amenities/{amenity}', {'name': 'Bench amenity'}),
+    ('users.list', 'GET', '/api/v1/users/', None),
+    ('users.detail', 'GET', '/api/v1/users/{user}', None),
+    ('users.create', 'POST', '/api/v1/users/', {
+        'first_name': 'Bench', 'last_name': 'User', 'email': 'bench{n}@example.com', 'password': 'bench123'
+    }),
+    ('users.update', 'PUT', '/api/v1/users/{user}', {'first_name': 'Benched'}),
+    ('reviews.list', 'GET', '/api/v1/reviews/', None),
+    ('reviews.detail', 'GET', '/api/v1/reviews/{review}', None),
+    ('reviews.create', 'POST', '/api/v1/reviews/', {'text': 'Lovely', 'rating': 5, 'place_id': '{unreviewed}'}),
+    ('reviews.update', 'PUT', '/api/v1/reviews/{review}', {'text': 'Still great', 'rating': 4}),
+    ('reviews.delete', 'DELETE', '/api/v1/reviews/{spare_review}', None),
+    ('reviews.batch', 'POST', '/api/v1/reviews/batch', {'reviews': [
+        {'text': 'Lovely', 'rating': 1 + i, 'place_id': '{unreviewed}'} for i in range(5)
+    ]}),
+    ('auth.login', 'POST', '/api/v1/auth/login', {'email': 'admin@example.com', 'password': 'admin123'}),
+]
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self.record)
+
+    def record(self, *args):
+        self.count += 1
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body, headers):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class ServerTransport:
+    """A threaded werkzeug server on a free port, spoken to over one keep-alive connection"""
+
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.connection = http.client.HTTPConnection('127.0.0.1', self.server.server_port)
+
+    def request(self, method, path, body, headers):
+        headers = dict(headers, **{'Content-Type': 'application/json'})
+        self.connection.request(method, path, body=json.dumps(body) if body is not None else None,
+                                headers=headers)
+        response = self.connection.getresponse()
+        response.read()
+        return response.status
+
+    def close(self):
+        self.connection.close()
+        self.server.shutdown()
+
+
+class Take:
+    """Formats as the next of its values each time it is used"""
+
+    def __init__(self, values):
+        self.values = iter(values)
+
+    def __format__(self, spec):
+        return format(next(self.values), spec)
+
+
+def fill(template, ids):
+    if isinstance(template, str):
+        return template.format(**ids)
+    if isinstance(template, dict):
+        return {key: fill(value, ids) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(value, ids) for value in template]
+    return template
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def sample_ids():
+    """The most reviewed place, its first review and that review's author, plus the
+    places and reviews write endpoints use up one per request"""
+    place_id = db.session.scalar(db.select(PlaceRating.place_id).order_by(PlaceRating.review_count.desc()))
+    review = db.session.scalars(db.select(Review).where(Review.place_id == place_id)).first()
+    admin = facade.get_user_by_email('admin@example.com')
+    reviewed = db.select(Review.place_id).where(Review.user_id == admin.id)
+    unreviewed = db.select(Place.id).where(Place.owner_id != admin.id, Place.id.not_in(reviewed))
+    spare_reviews = db.select(Review.id).where(Review.place_id != place_id)
+    return {
+        'place': place_id, 'review': review.id, 'user': review.user_id,
+        'amenity': facade.get_all_amenities()[0].id,
+        'n': Take(itertools.count()),
+        'unreviewed': Take(db.session.scalars(unreviewed).all()),
+        'spare_review': Take(db.session.scalars(spare_reviews).all()),
+    }
+
+
+def run_size(size, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        })
+        app = create_app(config)
+        with app.app_context():
+            facade.seed_data(max(size // 5, 2), size, size * 10, seed=size)
+            ids = sample_ids()
+            counter = StatementCounter(db.engine)
+        transport = ServerTransport(app) if args.server else TestClientTransport(app)
+        admin = app.test_client().post('/api/v1/auth/login', json={
+            'email': 'admin@example.com', 'password': 'admin123'
+        }).get_json()['access_token']
+        headers = {'Authorization': f'Bearer {admin}'}
+
+        results = []
+        for name, method, path, body in ENDPOINTS:
+            if args.only and not any(name.startswith(prefix) for prefix in args.only.split(',')):
+                continue
+            for _ in range(args.warmup):
+                transport.request(method, fill(path, ids), fill(body, ids), headers)
+            latencies, statuses = [], set()
+            counter.count = 0
+            for _ in range(args.requests):
+                # Filled in first, so each write gets fresh values without being timed
+                request = fill(path, ids), fill(body, ids)
+                start = time.perf_counter()
+                statuses.add(transport.request(method, *request, headers))
+                latencies.append(time.perf_counter() - start)
+            elapsed = sum(latencies)
+            latencies.sort()
+            results.append({
+                'endpoint': name, 'size': size, 'requests': args.requests,
+                'status': sorted(statuses),
+                'p50_ms': round(statistics.median(latencies) * 1000, 3),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+                'throughput_rps': round(args.requests / elapsed, 1),
+                'statements_per_request': round(counter.count / args.requests, 2),
+            })
+            print('{endpoint:<22} {size:>8} {p50_ms:>9.2f} {p95_ms:>9.2f} {p99_ms:>9.2f} '
+                  '{throughput_rps:>9.1f} {statements_per_request:>6}'.format(**results[-1]), flush=True)
+        transport.close()
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Regressions of results against a baseline, as printable lines"""
+    expected = {(r['endpoint'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        before = expected.get((result['endpoint'], result['size']))
+        if before is None:
+            continue
+        label = f"{result['endpoint']} @ {result['size']}"
+        if result['status'] != before['status']:
+            regressions.append(f"{label}: status {result['status']}, baseline {before['status']}")
+        if result['statements_per_request'] > before['statements_per_request']:
+            regressions.append(f"{label}: {result['statements_per_request']} SQL statements per request, "
+                               f"baseline {before['statements_per_request']}")
+        limit = max(before['p95_ms'] * (1 + tolerance), before['p95_ms'] + min_delta_ms)
+        if result['p95_ms'] > limit:
+            regressions.append(f"{label}: p95 {result['p95_ms']} ms, baseline {before['p95_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000', help='places per dataset, comma separated')
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help='comma separated endpoint name prefixes, e.g. places.,auth.')
+    parser.add_argument('--server', action='store_true', help='go through a real threaded WSGI server')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed relative p95 growth')
+    parser.add_argument('--min-delta-ms', type=float, default=2.0, help='ignore smaller p95 growth')
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<22} {'places':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'SQL':>6}")
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        results.extend(run_size(size, args))
+
+    report = {
+        'meta': {
+            'python': platform.python_version(), 'machine': platform.machine(),
+            'transport': 'wsgi-server' if args.server else 'test-client',
+            'requests': args.requests, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) against {args.baseline}:', file=sys.stderr)
+            for line in regressions:
+                print('  ' + line, file=sys.stderr)
+            sys.exit(1)
+        print(f'\nNo regressions against {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Place reads under a login storm, with bcrypt inline or in the hashing pool.
+
+A fixed number of server threads serves closed-loop clients: some keep
+logging in, the others keep listing places. Run from part4/:
+
+    python -m benchmarks.login_mix --rounds 12 --server-threads 8
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from app.extensions import hasher
+from app.services import facade
+from config import TestingConfig
+
+
+def client_loop(server, client, request, deadline, results):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        status = server.submit(request, client).result()
+        results.append((status, time.perf_counter() - start))
+
+
+def login(client):
+    return client.post('/api/v1/auth/login', json={
+        'email': 'admin@example.com', 'password': 'admin123'
+    }).status_code
+
+
+def read_places(client):
+    return client.get('/api/v1/places/?limit=20').status_code
+
+
+def run(workers, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db'),
+            'BCRYPT_LOG_ROUNDS': args.rounds,
+            'PASSWORD_HASH_WORKERS': workers,
+            'PASSWORD_HASH_MAX_PENDING': args.max_pending,
+            'PASSWORD_HASH_QUEUE_TIMEOUT': args.queue_timeout,
+        })
+        app = create_app(config)
+        with app.app_context():
+            owner = facade.get_user_by_email('admin@example.com')
+            for i in range(100):
+                facade.create_place({
+                    'title': f'Place {i}', 'price': 50.0 + i,
+                    'latitude': 48.0 + i / 100, 'longitude': 2.0, 'owner_id': owner.id
+                })
+        client = app.test_client()
+        login(client)  # start the pool outside the measurement
+
+        logins, reads = [], []
+        deadline = time.perf_counter() + args.seconds
+        with ThreadPoolExecutor(args.server_threads) as server:
+            clients = [
+                threading.Thread(target=client_loop, args=(server, app.test_client(), login, deadline, logins))
+                for _ in range(args.login_clients)
+            ] + [
+                threading.Thread(target=client_loop, args=(server, app.test_client(), read_places, deadline, reads))
+                for _ in range(args.read_clients)
+            ]
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+        hasher.shutdown()
+    return logins, reads
+
+
+def summary(results, seconds):
+    latencies = sorted(latency for _, latency in results) or [0.0]
+    p95 = latencies[int(0.95 * (len(latencies) - 1))]
+    return len(results) / seconds, statistics.median(latencies) * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--server-threads', type=int, default=8)
+    parser.add_argument('--login-clients', type=int, default=16)
+    parser.add_argument('--read-clients', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-pending', type=int, default=None)
+    parser.add_argument('--queue-timeout', type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'hashing':>10} {'logins/s':>9} {'503s':>6} {'reads/s':>8} {'read p50 ms':>12} {'read p95 ms':>12}")
+    for label, workers in (('inline', 0), (f'pool x{args.workers}', args.workers)):
+        logins, reads = run(workers, args)
+        ok_logins = [r for r in logins if r[0] == 200]
+        busy = sum(1 for status, _ in logins if status == 503)
+        read_rate, read_p50, read_p95 = summary(reads, args.seconds)
+        print(f'{label:>10} {len(ok_logins) / args.seconds:9.1f} {busy:6d} '
+              f'{read_rate:8.1f} {read_p50:12.1f} {read_p95:12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Compare the NumPy k-nearest-neighbour scan with a naive ORM loop.
+
+Run from part4/:
+
+    python -m benchmarks.nearby --sizes 10000,100000,1000000
+"""
+import argparse
+import heapq
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.place_location import PlaceLocation
+from app.services import facade
+from app.utils.geo import cell_for, haversine_km
+from config import TestingConfig
+
+
+def populate(size, owner_id, rng):
+    now = datetime.utcnow()
+    for start in range(0, size, 50000):
+        places, locations = [], []
+        for _ in range(start, min(size, start + 50000)):
+            place_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+            latitude, longitude = rng.uniform(-60, 70), rng.uniform(-180, 180)
+            places.append({
+                'id': place_id, 'title': 'Bench place', 'description': '',
+                'price': 100.0, 'latitude': latitude, 'longitude': longitude,
+                'owner_id': owner_id, 'created_at': now, 'updated_at': now
+            })
+            locations.append({
+                'place_id': place_id, 'cell': cell_for(latitude, longitude),
+                'latitude': latitude, 'longitude': longitude
+            })
+        db.session.execute(Place.__table__.insert(), places)
+        db.session.execute(PlaceLocation.__table__.insert(), locations)
+    db.session.commit()
+
+
+def naive_nearest(place, k):
+    """What the endpoint would do without the index: load every place and loop"""
+    distances = (
+        (haversine_km(place.latitude, place.longitude, other.latitude, other.longitude), other.id)
+        for other in Place.query.all() if other.id != place.id
+    )
+    return heapq.nsmallest(k, distances)
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(size, k, repeat, skip_naive_above):
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        })
+        app = create_app(config)
+        with app.app_context():
+            owner = facade.get_user_by_email('admin@example.com')
+            populate(size, owner.id, random.Random(size))
+            probe = Place.query.first()
+
+            start = time.perf_counter()
+            facade.coordinates.load(facade.place_repo.iter_coordinates())
+            load_ms = (time.perf_counter() - start) * 1000
+            vector_ms = timed(lambda: facade.coordinates.nearest(
+                probe.latitude, probe.longitude, k, exclude=probe.id), repeat)
+            endpoint_ms = timed(lambda: facade.get_nearby_places(probe.id, k), repeat)
+
+            naive_ms = None
+            if size <= skip_naive_above:
+                naive_ms = timed(lambda: naive_nearest(probe, k), 1)
+                db.session.expunge_all()
+            db.session.remove()
+            db.engine.dispose()
+    return load_ms, vector_ms, endpoint_ms, naive_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--skip-naive-above', type=int, default=1000000,
+                        help='skip the ORM loop for larger datasets')
+    args = parser.parse_args()
+
+    print(f"{'places':>9} {'load ms':>9} {'numpy ms':>9} {'facade ms':>10} {'orm loop ms':>12} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        load_ms, vector_ms, endpoint_ms, naive_ms = run(size, args.k, args.repeat, args.skip_naive_above)
+        naive = f'{naive_ms:12.1f}' if naive_ms is not None else f"{'skipped':>12}"
+        speedup = f'{naive_ms / endpoint_ms:7.0f}x' if naive_ms is not None else f"{'-':>8}"
+        print(f'{size:>9} {load_ms:9.1f} {vector_ms:9.2f} {endpoint_ms:10.2f} {naive} {speedup}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Bytes and microseconds per response for each API representation.
+
+Seeds `hbnb seed` data in a temporary SQLite file, then for the list
+endpoints measures the encoders alone on the endpoint's payload (stdlib
+json as flask_restx used it, orjson, msgpack) and whole requests through
+the test client with each Accept header. Run from part4/:
+
+    python -m benchmarks.representations --places 2000 --repeat 30
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from app import create_app
+from app.models.place_rating import PlaceRating
+from app.extensions import db
+from app.services import facade
+from app.utils import representations
+from config import TestingConfig
+
+ENDPOINTS = [
+    ('places.list_unpaged', '/api/v1/places/'),
+    ('reviews.list', '/api/v1/reviews/'),
+    ('places.reviews', '/api/v1/places/{place}/reviews'),
+]
+
+
+def encoders():
+    found = {'json (stdlib)': lambda data: (json.dumps(data) + '\n').encode()}
+    if representations.orjson is not None:
+        found['orjson'] = representations.dumps_json
+    if representations.msgpack is not None:
+        found['msgpack'] = representations.dumps_msgpack
+    return found
+
+
+def timed(fn, repeat):
+    """Median microseconds of fn() over repeat runs"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = type('BenchConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'bench.db')
+        })
+        app = create_app(config)
+        with app.app_context():
+            facade.seed_data(max(args.places // 5, 2), args.places, args.places * 10, seed=args.places)
+            place_id = db.session.scalar(db.select(PlaceRating.place_id).order_by(PlaceRating.review_count.desc()))
+        client = app.test_client()
+
+        print(f"{'endpoint':<22} {'encoding':<16} {'bytes':>10} {'encode us':>11} {'request us':>11}")
+        for name, path in ENDPOINTS:
+            path = path.format(place=place_id)
+            payload = client.get(path).get_json()
+            for label, encode in encoders().items():
+                size = len(encode(payload))
+                encode_us = timed(lambda: encode(payload), args.repeat)
+                accept = 'application/msgpack' if label == 'msgpack' else 'application/json'
+                # The app itself no longer encodes with stdlib json when orjson is installed
+                request_us = '-'
+                if label != 'json (stdlib)':
+                    request_us = f"{timed(lambda: client.get(path, headers={'Accept': accept}), args.repeat):.0f}"
+                print(f'{name:<22} {label:<16} {size:>10} {encode_us:>11.0f} {request_us:>11}')
+
+
+if __name__ == '__main__':
+    main()
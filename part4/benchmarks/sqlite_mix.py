@@ -0,0 +1,154 @@
+"""Mixed reads and writes on one SQLite file, default settings against ProductionConfig.
+
+Seeds `hbnb seed` data into a fresh database per configuration, then
+starts one process per client, each with its own app, the way pre-fork
+workers share the database: most keep reading places and their reviews,
+the others keep updating review ratings. --layer http goes through the
+API; --layer sql runs comparable statements on the app's engine, leaving
+out the Python request work that otherwise dominates on few cores. Run
+from part4/:
+
+    python -m benchmarks.sqlite_mix --seconds 10 --readers 6 --writers 2 --layer sql
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from app.extensions import db
+from app.models.review import Review
+from app.services import facade
+from config import Config, ProductionConfig
+
+
+def bench_config(base, path):
+    return type('BenchConfig', (base,), {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + path,
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'BCRYPT_LOG_ROUNDS': 4,
+        'PASSWORD_HASH_WORKERS': 0,
+        'STATIC_ASSETS': False,
+        'METRICS_ENABLED': False,
+    })
+
+
+PLACE_REVIEWS = text(
+    'SELECT r.id, r.text, r.rating, u.first_name FROM reviews r JOIN users u ON u.id = r.user_id '
+    'WHERE r.place_id = :place_id'
+)
+PLACE = text(
+    'SELECT p.*, pr.review_count FROM places p JOIN place_ratings pr ON pr.place_id = p.id WHERE p.id = :place_id'
+)
+UPDATE_REVIEW = text('UPDATE reviews SET rating = :rating, updated_at = CURRENT_TIMESTAMP WHERE id = :review_id')
+
+
+def http_requests(app, token, rng):
+    http = app.test_client()
+    auth = {'Authorization': f'Bearer {token}'}
+
+    def read(review_id, place_id):
+        path = f'/api/v1/places/{place_id}/reviews' if rng.random() < 0.5 else f'/api/v1/places/{place_id}'
+        return http.get(path).status_code
+
+    def write(review_id, place_id):
+        return http.put(f'/api/v1/reviews/{review_id}', headers=auth,
+                        json={'text': 'Updated', 'rating': rng.randint(1, 5)}).status_code
+    return read, write
+
+
+def sql_requests(app, token, rng):
+    with app.app_context():
+        engine = db.engine
+
+    def read(review_id, place_id):
+        with engine.connect() as connection:
+            connection.execute(PLACE_REVIEWS if rng.random() < 0.5 else PLACE, {'place_id': place_id}).all()
+        return 200
+
+    def write(review_id, place_id):
+        with engine.begin() as connection:
+            connection.execute(UPDATE_REVIEW, {'rating': rng.randint(1, 5), 'review_id': review_id})
+        return 200
+    return read, write
+
+
+def client(base, path, layer, kind, reviews, token, start_at, deadline):
+    """One worker process: requests of one kind back to back until the deadline"""
+    app = create_app(bench_config(base, path))
+    rng = random.Random(os.getpid())
+    read, write = (sql_requests if layer == 'sql' else http_requests)(app, token, rng)
+    request = write if kind == 'write' else read
+    results = []
+    while time.time() < start_at:
+        time.sleep(0.01)
+    while time.time() < deadline:
+        start = time.perf_counter()
+        try:
+            status = request(*rng.choice(reviews))
+        except OperationalError:
+            # database is locked: busy_timeout ran out
+            status = 503
+        results.append((status, time.perf_counter() - start))
+    return kind, results
+
+
+def run(base, args):
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        app = create_app(bench_config(base, path))
+        with app.app_context():
+            facade.seed_data(max(args.places // 5, 2), args.places, args.places * 5, seed=1)
+            reviews = db.session.execute(db.select(Review.id, Review.place_id)).all()
+            reviews = [tuple(row) for row in reviews]
+            db.engine.dispose()
+        token = app.test_client().post('/api/v1/auth/login', json={
+            'email': 'admin@example.com', 'password': 'admin123'
+        }).get_json()['access_token']
+
+        # Every process starts at the same moment, after its app is built
+        start_at = time.time() + 3
+        deadline = start_at + args.seconds
+        kinds = ['read'] * args.readers + ['write'] * args.writers
+        with multiprocessing.get_context('spawn').Pool(len(kinds)) as pool:
+            done = pool.starmap(client, [(base, path, args.layer, kind, reviews, token, start_at, deadline)
+                                        for kind in kinds])
+    found = {'read': [], 'write': []}
+    for kind, results in done:
+        found[kind].extend(results)
+    return found
+
+
+def summary(results, seconds):
+    ok = sorted(latency for status, latency in results if status == 200) or [0.0]
+    p95 = ok[int(0.95 * (len(ok) - 1))]
+    failed = sum(1 for status, _ in results if status != 200)
+    return len(ok) / seconds, failed, statistics.median(ok) * 1000, p95 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=2000)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=6)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--layer', choices=('http', 'sql'), default='http')
+    parser.add_argument('--dir', default=None, help='Where to put the database (default: the temp dir)')
+    args = parser.parse_args()
+
+    print(f"{'config':>10} {'kind':>6} {'ok/s':>8} {'failed':>7} {'p50 ms':>8} {'p95 ms':>8}")
+    for label, base in (('default', Config), ('production', ProductionConfig)):
+        found = run(base, args)
+        for kind in ('read', 'write'):
+            rate, failed, p50, p95 = summary(found[kind], args.seconds)
+            print(f'{label:>10} {kind:>6} {rate:8.1f} {failed:7d} {p50:8.1f} {p95:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,13 @@
 #!/usr/bin/python3
 
+import os
+
 from app import create_app
+from config import config
 
-app = create_app()
+# HBNB_CONFIG=production picks ProductionConfig
+app = create_app(config[os.getenv('HBNB_CONFIG', 'default')])
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # The debugger runs arbitrary code, so only configs that ask for it get it
+    app.run(debug=app.config.get('DEBUG', False))
@@ -77,7 +77,7 @@ document.addEventListener('DOMContentLoaded', () => {
         });
 
         priceFilter.addEventListener('change', () => {
-            filterPlaces(priceFilter.value);
+            filterPlaces(token, priceFilter.value);
         });
     }
 
@@ -196,9 +196,14 @@ function getCookie(name) {
 }
 
 // Fetch places from API and display them
-async function fetchPlaces(token) {
+async function fetchPlaces(token, maxPrice = 'All') {
+    const url = new URL('http://localhost:5000/api/v1/places/');
+    if (maxPrice !== 'All') {
+        url.searchParams.set('max_price', maxPrice);
+    }
+
     try {
-        const response = await fetch('http://localhost:5000/api/v1/places/', {
+        const response = await fetch(url, {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
@@ -244,18 +249,11 @@ function displayPlaces(places) {
     
 }
 
-// Filter displayed places by price
-function filterPlaces(maxPrice) {
-    const cards = document.querySelectorAll('.place-card');
-
-    cards.forEach(card => {
-        const price = parseFloat(card.dataset.price);
-        if (maxPrice === 'All' || price <= parseFloat(maxPrice)) {
-            card.style.display = 'block';
-        } else {
-            card.style.display = 'none';
-        }
-    });
+// Filter places by price on the server and redisplay them
+function filterPlaces(token, maxPrice) {
+    if (token) {
+        fetchPlaces(token, maxPrice);
+    }
 }
 
 function getPlaceIdFromURL() {
@@ -0,0 +1,94 @@
+import unittest
+import uuid
+from datetime import datetime
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.models.amenity import Amenity
+from app.services import facade
+from config import TestingConfig
+
+
+class TestAmenityCatalog(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.owner_id = facade.get_user_by_email("admin@example.com").id
+            self.wifi = facade.create_amenity({"name": "Wifi"}).id
+        response = self.client.post('/api/v1/auth/login', json={"email": "admin@example.com", "password": "admin123"})
+        self.admin = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+        self.statements = []
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self.record)
+        self.addCleanup(self.stop_recording)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def stop_recording(self):
+        with self.app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', self.record)
+
+    def insert_elsewhere(self, name):
+        """Add an amenity the way another worker process would: not through this facade"""
+        amenity_id = str(uuid.uuid4())
+        with self.app.app_context():
+            now = datetime.utcnow()
+            db.session.execute(Amenity.__table__.insert(), [{
+                'id': amenity_id, 'name': name, 'description': '', 'created_at': now, 'updated_at': now
+            }])
+            db.session.commit()
+        return amenity_id
+
+    def names(self):
+        return [a['name'] for a in self.client.get('/api/v1/amenities/').get_json()]
+
+    def test_reads_from_memory(self):
+        self.statements.clear()
+        listing = self.client.get('/api/v1/amenities/')
+        detail = self.client.get(f'/api/v1/amenities/{self.wifi}')
+        self.assertEqual(listing.get_json(), [{'id': self.wifi, 'name': "Wifi"}])
+        self.assertEqual(detail.get_json(), {'id': self.wifi, 'name': "Wifi"})
+        self.assertIn('ETag', listing.headers)
+        self.assertEqual(self.statements, [])
+
+    def test_own_writes_swap_the_snapshot(self):
+        before = facade.amenity_catalog._snapshot
+        created = self.client.post('/api/v1/amenities/', json={"name": "Pool"}, headers=self.admin).get_json()
+        self.assertEqual(self.names(), ["Wifi", "Pool"])
+        self.client.put(f"/api/v1/amenities/{created['id']}", json={"name": "Spa"}, headers=self.admin)
+        self.assertEqual(self.names(), ["Wifi", "Spa"])
+        # Earlier snapshots are replaced, never changed in place
+        self.assertEqual(list(before.by_id), [self.wifi])
+        with self.assertRaises(TypeError):
+            before.by_id['x'] = ("X", None)
+
+    def test_other_processes_writes(self):
+        self.names()
+        garden = self.insert_elsewhere("Garden")
+        self.assertEqual(self.names(), ["Wifi"])
+        # Unknown ids trigger a check right away, at most once per interval
+        self.assertEqual(self.client.get(f'/api/v1/amenities/{garden}').get_json()['name'], "Garden")
+        self.statements.clear()
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/v1/amenities/missing').status_code, 404)
+        self.assertEqual(self.statements, [])
+
+        gym = self.insert_elsewhere("Gym")
+        # An interval after the last forced check
+        facade.amenity_catalog._forced_at -= self.app.config['AMENITY_CATALOG_CHECK_SECONDS']
+        with self.app.app_context():
+            place = facade.create_place({
+                "title": "Fit flat", "price": 60.0, "latitude": 10.0, "longitude": 10.0,
+                "owner_id": self.owner_id, "amenities": [gym, self.wifi]
+            })
+            self.assertEqual({a.name for a in place.amenities}, {"Gym", "Wifi"})
+
+        self.insert_elsewhere("Sauna")
+        self.app.config['AMENITY_CATALOG_CHECK_SECONDS'] = 0
+        self.assertEqual(self.names(), ["Wifi", "Garden", "Gym", "Sauna"])
+
+
+if __name__ == '__main__':
+    unittest.main()
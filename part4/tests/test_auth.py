@@ -0,0 +1,73 @@
+import threading
+import unittest
+from app import create_app
+from app.extensions import hasher
+from app.services import facade
+from app.utils.password_hasher import rounds_of
+from config import TestingConfig
+
+
+class TestPasswordHashing(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.user_id = facade.create_user({
+                "first_name": "Alice", "last_name": "Guest",
+                "email": "alice@example.com", "password": "secret"
+            }).id
+
+    def configure(self, **settings):
+        """Re-initialise the hasher from changed settings, restored after the test"""
+        saved = {name: self.app.config.get(name) for name in settings}
+        self.addCleanup(hasher.init_app, self.app)
+        self.addCleanup(self.app.config.update, saved)
+        self.app.config.update(settings)
+        hasher.init_app(self.app)
+
+    def login(self, password="secret"):
+        return self.client.post('/api/v1/auth/login', json={"email": "alice@example.com", "password": password})
+
+    def stored_hash(self):
+        with self.app.app_context():
+            return facade.get_user(self.user_id).password
+
+    def test_login(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login("wrong").status_code, 401)
+
+    def test_rehash_on_login_when_work_factor_changes(self):
+        self.assertEqual(rounds_of(self.stored_hash()), 4)
+        self.configure(BCRYPT_LOG_ROUNDS=5)
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(rounds_of(self.stored_hash()), 5)
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_password_update_is_hashed(self):
+        with self.app.app_context():
+            facade.update_user(self.user_id, {"password": "changed"})
+        self.assertNotEqual(self.stored_hash(), "changed")
+        self.assertEqual(self.login("changed").status_code, 200)
+
+    def test_process_pool(self):
+        self.configure(PASSWORD_HASH_WORKERS=1)
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login("wrong").status_code, 401)
+        self.assertEqual(hasher.pending(), 0)
+
+    def test_full_queue_returns_503(self):
+        # One slot, taken by a slow hash; the login may not wait for it
+        self.configure(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_QUEUE_TIMEOUT=0,
+                       BCRYPT_LOG_ROUNDS=13)
+        slow = threading.Thread(target=hasher.hash, args=("slow",))
+        slow.start()
+        self.addCleanup(slow.join)
+        while hasher.pending() == 0 and slow.is_alive():
+            slow.join(0.001)
+        response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+
+if __name__ == '__main__':
+    unittest.main()
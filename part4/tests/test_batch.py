@@ -0,0 +1,139 @@
+import unittest
+from unittest import mock
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from config import TestingConfig
+
+
+class TestBatchEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            self.amenities = [facade.create_amenity({"name": name}).id for name in ("Wifi", "Pool")]
+            for name in ("alice", "bob"):
+                facade.create_user({
+                    "first_name": name.title(), "last_name": "Host",
+                    "email": f"{name}@example.com", "password": "secret"
+                })
+        self.headers = {name: self.login(f"{name}@example.com", "secret") for name in ("alice", "bob")}
+
+    def login(self, email, password):
+        response = self.client.post('/api/v1/auth/login', json={"email": email, "password": password})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    def place(self, i, **fields):
+        return dict({
+            "title": f"Flat {i}", "price": 50.0 + i, "latitude": 43.3 + i / 1000,
+            "longitude": 5.37, "amenities": self.amenities
+        }, **fields)
+
+    def post_places(self, user, places):
+        return self.client.post('/api/v1/places/batch', json={"places": places}, headers=self.headers[user])
+
+    def test_places_batch_partial_failure(self):
+        response = self.post_places("alice", [
+            self.place(0),
+            self.place(1, price=-5.0),
+            self.place(2, amenities=["missing"]),
+            self.place(3, latitude="north"),
+            self.place(4, owner_id="someone-else"),
+        ])
+        self.assertEqual(response.status_code, 207)
+        body = response.get_json()
+        self.assertEqual((body['created'], body['failed']), (2, 3))
+        self.assertEqual([r['status'] for r in body['results']], [201, 400, 400, 400, 201])
+        self.assertEqual(body['results'][2]['error'], "Unknown amenity ids: missing")
+
+        # Non-admins cannot pick another owner; derived indexes follow the new places
+        place_id = body['results'][4]['id']
+        detail = self.client.get(f'/api/v1/places/{place_id}').get_json()
+        self.assertEqual(detail['owner']['email'], "alice@example.com")
+        self.assertEqual(len(detail['amenities']), 2)
+        self.assertEqual(detail['rating']['count'], 0)
+        clusters = self.client.get('/api/v1/places/clusters?bbox=5,43,6,44&zoom=2').get_json()
+        self.assertEqual(sum(c['count'] for c in clusters), 2)
+        nearby = self.client.get(f"/api/v1/places/{body['results'][0]['id']}/nearby").get_json()
+        self.assertEqual([p['id'] for p in nearby], [place_id])
+
+    def test_places_batch_all_invalid(self):
+        response = self.post_places("alice", [self.place(0, title="  ")])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['failed'], 1)
+        self.assertEqual(self.client.get('/api/v1/places/').get_json(), [])
+
+    def test_invalid_payload(self):
+        for payload in ({}, {"places": []}, {"places": "x"}, {"places": [1]}):
+            response = self.client.post('/api/v1/places/batch', json=payload, headers=self.headers["alice"])
+            self.assertEqual(response.status_code, 400, payload)
+        self.app.config['BATCH_MAX_ITEMS'] = 2
+        self.assertEqual(self.post_places("alice", [self.place(i) for i in range(3)]).status_code, 400)
+
+    def test_places_batch_statement_count(self):
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', record)
+        counts = []
+        for size in (3, 30):
+            statements.clear()
+            response = self.post_places("alice", [self.place(i) for i in range(size)])
+            self.assertEqual(response.status_code, 201)
+            counts.append(len(statements))
+        with self.app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(counts[0], counts[1])
+
+    def test_reviews_batch(self):
+        created = self.post_places("alice", [self.place(0), self.place(1)]).get_json()['results']
+        place_ids = [r['id'] for r in created]
+        own = self.post_places("bob", [self.place(2)]).get_json()['results'][0]['id']
+
+        response = self.client.post('/api/v1/reviews/batch', json={"reviews": [
+            {"text": "Great", "rating": 5, "place_id": place_ids[0]},
+            {"text": "Again", "rating": 1, "place_id": place_ids[0]},
+            {"text": "Mine", "rating": 5, "place_id": own},
+            {"text": "Lost", "rating": 3, "place_id": "missing"},
+            {"text": "Half", "rating": 3.5, "place_id": place_ids[1]},
+            {"text": "Fine", "rating": 3, "place_id": place_ids[1]},
+        ]}, headers=self.headers["bob"])
+        self.assertEqual(response.status_code, 207)
+        errors = [r.get('error') for r in response.get_json()['results']]
+        self.assertEqual(errors, [
+            None, "You have already reviewed this place.", "You cannot review your own place.",
+            "Place not found", "Rating must be between 1 and 5", None
+        ])
+        ratings = [self.client.get(f'/api/v1/places/{pid}').get_json()['rating'] for pid in place_ids]
+        self.assertEqual([(r['count'], r['average']) for r in ratings], [(1, 5.0), (1, 3.0)])
+
+        again = self.client.post('/api/v1/reviews/batch', json={"reviews": [
+            {"text": "Twice", "rating": 2, "place_id": place_ids[1]}
+        ]}, headers=self.headers["bob"])
+        self.assertEqual(again.status_code, 400)
+
+    def test_reviews_batch_concurrent_duplicate(self):
+        place_ids = [r['id'] for r in self.post_places("alice", [self.place(0), self.place(1)]).get_json()['results']]
+        self.client.post('/api/v1/reviews/batch', json={"reviews": [
+            {"text": "First", "rating": 4, "place_id": place_ids[0]}
+        ]}, headers=self.headers["bob"])
+
+        # As if the first review was written after the batch looked for existing ones
+        with mock.patch.object(facade.review_repo, 'get_reviewed_place_ids', return_value=set()):
+            response = self.client.post('/api/v1/reviews/batch', json={"reviews": [
+                {"text": "Second", "rating": 1, "place_id": place_ids[0]},
+                {"text": ["not", "text"], "rating": 2, "place_id": place_ids[1]},
+                {"text": "Other", "rating": 2, "place_id": place_ids[1]},
+            ]}, headers=self.headers["bob"])
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()['results']
+        self.assertEqual([r['status'] for r in results], [400, 400, 201])
+        self.assertEqual(results[0]['error'], "You have already reviewed this place.")
+        self.assertEqual(results[1]['error'], "Review text cannot be empty")
+        ratings = [self.client.get(f'/api/v1/places/{pid}').get_json()['rating'] for pid in place_ids]
+        self.assertEqual([(r['count'], r['average']) for r in ratings], [(1, 4.0), (1, 2.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app
+from app.services import facade
+from app.utils import compression
+from app.utils.static_assets import IMMUTABLE
+from config import TestingConfig
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class TestResponseCompression(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            for i in range(40):
+                place = facade.create_place({
+                    "title": f"Place {i}", "description": "A quiet room near the station " * 3, "price": 50.0,
+                    "latitude": 10.0, "longitude": 20.0, "owner_id": owner.id, "amenities": []
+                })
+            self.place_id = place.id
+
+    def test_gzip_above_threshold(self):
+        plain = self.client.get('/api/v1/places/')
+        packed = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(packed.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', packed.vary)
+        self.assertLess(len(packed.data), len(plain.data))
+        self.assertEqual(json.loads(gzip.decompress(packed.data)), plain.get_json())
+        self.assertEqual(packed.headers['Content-Length'], str(len(packed.data)))
+
+    def test_small_bodies_and_errors_are_sent_as_is(self):
+        small = self.client.get(f'/api/v1/places/{self.place_id}', headers={'Accept-Encoding': 'gzip'})
+        missing = self.client.get('/api/v1/places/missing', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', small.headers)
+        self.assertNotIn('Content-Encoding', missing.headers)
+        self.assertIn('Accept-Encoding', small.vary)
+
+    @unittest.skipUnless(brotli, "brotli is not installed")
+    def test_brotli_preferred_when_accepted(self):
+        both = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip, deflate, br'})
+        self.assertEqual(both.headers['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(both.data)), self.client.get('/api/v1/places/').get_json())
+        weighted = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip, br;q=0.5'})
+        self.assertEqual(weighted.headers['Content-Encoding'], 'gzip')
+
+    def test_etagged_bodies_compressed_once(self):
+        headers = {'Accept-Encoding': 'gzip'}
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.client.get('/api/v1/places/', headers=headers)
+            second = self.client.get('/api/v1/places/', headers=headers)
+            self.assertEqual(compress.call_count, 1)
+            self.assertEqual(first.data, second.data)
+            with self.app.app_context():
+                facade.update_place(self.place_id, {"title": "Renamed"})
+            self.client.get('/api/v1/places/', headers=headers)
+            self.assertEqual(compress.call_count, 2)
+
+    def test_compressed_etag_is_weak_and_revalidates(self):
+        packed = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip'})
+        self.assertTrue(packed.headers['ETag'].startswith('W/'))
+        again = self.client.get('/api/v1/places/', headers={'Accept-Encoding': 'gzip',
+                                                            'If-None-Match': packed.headers['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    def test_streamed_lists_are_compressed_as_sent(self):
+        with self.app.app_context():
+            owner_email = facade.get_user_by_email("admin@example.com").email
+            for i in range(30):
+                facade.create_user({"first_name": "Guest", "last_name": f"Number {i}",
+                                    "email": f"guest{i}@example.com", "password": "secret123"})
+        packed = self.client.get('/api/v1/users/', headers={'Accept-Encoding': 'gzip'})
+        self.assertTrue(packed.is_streamed)
+        self.assertEqual(packed.headers['Content-Encoding'], 'gzip')
+        users = json.loads(gzip.decompress(packed.data))
+        self.assertEqual(len(users), 31)
+        self.assertIn(owner_email, {user['email'] for user in users})
+
+
+class TestStaticAssets(unittest.TestCase):
+    def setUp(self):
+        self.build = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.build)
+        config = type('AssetsConfig', (TestingConfig,), {'STATIC_ASSETS': True, 'STATIC_BUILD_DIR': self.build})
+        self.app = create_app(config)
+        self.client = self.app.test_client()
+        with open(os.path.join(self.build, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+
+    def test_pages_point_at_hashed_assets(self):
+        self.assertEqual(set(self.manifest), {'scripts.js', 'styles.css'})
+        page = self.client.get('/static/index.html')
+        self.assertEqual(page.headers['Cache-Control'], 'no-cache')
+        html = page.get_data(as_text=True)
+        self.assertIn(f'href="{self.manifest["styles.css"]}"', html)
+        self.assertIn(f'src="{self.manifest["scripts.js"]}"', html)
+        page.close()
+
+    def test_hashed_assets_are_immutable_and_precompressed(self):
+        name = self.manifest['scripts.js']
+        plain = self.client.get(f'/static/{name}')
+        packed = self.client.get(f'/static/{name}', headers={'Accept-Encoding': 'gzip'})
+        for response in (plain, packed):
+            self.assertEqual(response.headers['Cache-Control'], IMMUTABLE)
+            self.assertEqual(response.mimetype, 'text/javascript')
+            self.assertIn('Accept-Encoding', response.vary)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(packed.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(packed.data), plain.data)
+        plain.close()
+        packed.close()
+
+    def test_rebuild_keeps_names_and_other_files_are_served(self):
+        with self.app.app_context():
+            from app.utils.static_assets import asset_dirs, build_assets
+            self.assertEqual(build_assets(*asset_dirs(self.app)), self.manifest)
+        image = self.client.get('/static/images/logo.png')
+        self.assertEqual(image.status_code, 200)
+        image.close()
+        self.assertEqual(self.client.get('/static/missing.js').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from werkzeug.http import http_date
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from config import TestingConfig
+
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            self.owner_id = owner.id
+            self.amenity_id = facade.create_amenity({"name": "Wifi"}).id
+            self.place_id = facade.create_place({
+                "title": "Cached place", "price": 70.0, "latitude": 50.0, "longitude": 4.0,
+                "owner_id": owner.id, "amenities": [self.amenity_id]
+            }).id
+            guest = facade.create_user({
+                "first_name": "Guest", "last_name": "One", "email": "guest@example.com", "password": "secret"
+            })
+            self.review_id = facade.create_review({
+                "text": "Nice", "rating": 4, "place_id": self.place_id, "user_id": guest.id
+            }).id
+        response = self.client.post('/api/v1/auth/login', json={"email": "admin@example.com", "password": "admin123"})
+        self.admin = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, headers={'If-None-Match': etag})
+
+    def test_etag_round_trip(self):
+        urls = [
+            f'/api/v1/places/{self.place_id}', '/api/v1/places/', '/api/v1/places/?limit=5',
+            f'/api/v1/amenities/{self.amenity_id}', '/api/v1/amenities/',
+            f'/api/v1/users/{self.owner_id}', '/api/v1/users/',
+            f'/api/v1/reviews/{self.review_id}', '/api/v1/reviews/', f'/api/v1/places/{self.place_id}/reviews',
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            # Lists only revalidate by ETag
+            is_list = url.endswith('/') or '?' in url or url.endswith('/reviews')
+            self.assertEqual('Last-Modified' in response.headers, not is_list, url)
+            etag = response.headers['ETag']
+            self.assertRegex(etag, r'^"[0-9a-f]+"$')
+            cached = self.revalidate(url, etag)
+            self.assertEqual(cached.status_code, 304, url)
+            self.assertEqual(cached.data, b'')
+            self.assertEqual(cached.headers['ETag'], etag)
+            self.assertEqual(self.revalidate(url, '"stale"').status_code, 200, url)
+
+    def test_not_modified_skips_loading(self):
+        etag = self.client.get(f'/api/v1/places/{self.place_id}').headers['ETag']
+        statements = []
+        record = lambda *args: statements.append(args[2])
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(self.revalidate(f'/api/v1/places/{self.place_id}', etag).status_code, 304)
+        with self.app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(len(statements), 1)
+
+    def test_place_etag_follows_related_rows(self):
+        url = f'/api/v1/places/{self.place_id}'
+        seen = {self.client.get(url).headers['ETag']}
+        changes = [
+            lambda: self.client.put(f'/api/v1/amenities/{self.amenity_id}', json={"name": "Fibre"},
+                                    headers=self.admin),
+            lambda: self.client.put(f'/api/v1/users/{self.owner_id}', json={"first_name": "Ada"},
+                                    headers=self.admin),
+            lambda: self.client.put(f'/api/v1/reviews/{self.review_id}', json={"rating": 2},
+                                    headers=self.admin),
+            lambda: self.client.put(url, json={"amenities": []}, headers=self.admin),
+        ]
+        for change in changes:
+            self.assertEqual(change().status_code, 200)
+            response = self.client.get(url)
+            self.assertNotIn(response.headers['ETag'], seen)
+            seen.add(response.headers['ETag'])
+        self.assertEqual(response.get_json()['amenities'], [])
+        self.assertEqual(response.get_json()['rating']['average'], 2.0)
+
+    def test_list_etag_changes_on_delete(self):
+        etag = self.client.get('/api/v1/reviews/').headers['ETag']
+        place_reviews = self.client.get(f'/api/v1/places/{self.place_id}/reviews').headers['ETag']
+        self.assertEqual(self.client.delete(f'/api/v1/reviews/{self.review_id}', headers=self.admin).status_code, 200)
+        response = self.revalidate('/api/v1/reviews/', etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), [])
+        self.assertEqual(self.revalidate(f'/api/v1/places/{self.place_id}/reviews', place_reviews).status_code, 200)
+
+    def test_if_modified_since(self):
+        url = f'/api/v1/amenities/{self.amenity_id}'
+        last_modified = self.client.get(url).headers['Last-Modified']
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': last_modified}).status_code, 304)
+        earlier = http_date(datetime.now(timezone.utc) - timedelta(days=1))
+        self.assertEqual(self.client.get(url, headers={'If-Modified-Since': earlier}).status_code, 200)
+        # If-None-Match wins when both are sent
+        response = self.client.get(url, headers={'If-Modified-Since': last_modified, 'If-None-Match': '"x"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_ignores_if_modified_since(self):
+        # A delete moves no updated_at, so a date would call the list unchanged
+        since = http_date(datetime.now(timezone.utc) + timedelta(minutes=1))
+        self.assertEqual(self.client.get('/api/v1/reviews/', headers={'If-Modified-Since': since}).status_code, 200)
+        self.client.delete(f'/api/v1/reviews/{self.review_id}', headers=self.admin)
+        for url in ('/api/v1/reviews/', f'/api/v1/places/{self.place_id}/reviews'):
+            response = self.client.get(url, headers={'If-Modified-Since': since})
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response.get_json(), [], url)
+
+    def test_query_parameters_are_part_of_the_etag(self):
+        etag = self.client.get('/api/v1/places/').headers['ETag']
+        self.assertNotEqual(self.client.get('/api/v1/places/?limit=5').headers['ETag'], etag)
+        response = self.revalidate('/api/v1/places/?limit=abc', etag)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json(), {'error': "limit must be a positive integer"})
+
+    def test_missing_resources(self):
+        for url in ('/api/v1/places/missing', '/api/v1/users/missing', '/api/v1/places/missing/reviews'):
+            response = self.client.get(url, headers={'If-None-Match': '*'})
+            self.assertEqual(response.status_code, 404, url)
+            self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
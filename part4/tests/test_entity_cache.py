@@ -0,0 +1,202 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from prometheus_client import REGISTRY
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.services import facade
+from app.utils.entity_cache import LocalBackend, SnapshotLRU
+from config import TestingConfig
+
+
+class TestEntityCache(unittest.TestCase):
+    def setUp(self):
+        self.backend = LocalBackend()
+        self.app = create_app(type('SharedCacheConfig', (TestingConfig,), {'ENTITY_CACHE_BACKEND': self.backend}))
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            self.owner_id = owner.id
+            self.place_id = facade.create_place({
+                "title": "Cached place", "price": 70.0, "latitude": 50.0, "longitude": 4.0, "owner_id": owner.id
+            }).id
+        response = self.client.post('/api/v1/auth/login', json={"email": "admin@example.com", "password": "admin123"})
+        self.admin = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+        self.statements = []
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self.record)
+        self.addCleanup(self.stop_recording)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def stop_recording(self):
+        with self.app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', self.record)
+
+    def fetch_place(self):
+        """Look the place up in a fresh GET request; returns (title, statements run)"""
+        self.statements.clear()
+        with self.app.test_request_context():
+            place = facade.get_place(self.place_id)
+            return place.title, len(self.statements)
+
+    def lookups(self, result):
+        return REGISTRY.get_sample_value('hbnb_cache_requests_total', {'cache': 'places', 'result': result}) or 0
+
+    def test_read_through(self):
+        hits, misses = self.lookups('hit'), self.lookups('miss')
+        self.assertEqual(self.fetch_place(), ("Cached place", 1))
+        self.assertEqual(self.fetch_place(), ("Cached place", 0))
+        self.assertEqual((self.lookups('hit') - hits, self.lookups('miss') - misses), (1, 1))
+        with self.app.test_request_context():
+            place = facade.get_place(self.place_id)
+            # A hit is an ordinary persistent object: relationships load and writes go through
+            self.assertEqual(place.owner.email, "admin@example.com")
+            self.assertIs(facade.get_place(self.place_id), place)
+            self.assertIsNone(facade.get_place("missing"))
+
+    def test_writes_invalidate(self):
+        self.fetch_place()
+        response = self.client.put(f'/api/v1/places/{self.place_id}', json={"title": "Renamed"}, headers=self.admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.fetch_place(), ("Renamed", 1))
+        self.assertEqual(self.fetch_place(), ("Renamed", 0))
+
+        # A failed write leaves the cached snapshot alone
+        with self.app.app_context():
+            with self.assertRaises(ValueError):
+                facade.update_place(self.place_id, {"amenities": ["missing"], "title": "Lost"})
+        self.assertEqual(self.fetch_place(), ("Renamed", 0))
+
+    def test_review_delete_invalidates(self):
+        with self.app.app_context():
+            guest = facade.create_user({
+                "first_name": "Guest", "last_name": "One", "email": "guest@example.com", "password": "secret"
+            })
+            review_id = facade.create_review({
+                "text": "Nice", "rating": 4, "place_id": self.place_id, "user_id": guest.id
+            }).id
+        self.assertEqual(self.client.get(f'/api/v1/reviews/{review_id}').status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/v1/reviews/{review_id}', headers=self.admin).status_code, 200)
+        self.assertEqual(self.client.get(f'/api/v1/reviews/{review_id}').status_code, 404)
+
+    def test_shared_backend(self):
+        self.fetch_place()
+        # Another worker process starts with an empty LRU but shares the backend
+        lru, backend = self.app.extensions['entity_cache']
+        self.app.extensions['entity_cache'] = (SnapshotLRU(lru.size, lru.ttl), backend)
+        self.assertEqual(self.fetch_place(), ("Cached place", 0))
+        self.client.put(f'/api/v1/places/{self.place_id}', json={"price": 90.0}, headers=self.admin)
+        self.assertEqual(self.backend.get(f'hbnb:places:{self.place_id}'), None)
+
+    def test_passwords_stay_out_of_snapshots(self):
+        self.assertEqual(self.client.get(f'/api/v1/users/{self.owner_id}').status_code, 200)
+        snapshot = self.backend.get(f'hbnb:users:{self.owner_id}')
+        self.assertIsNotNone(snapshot)
+        self.assertNotIn('password', json.loads(snapshot))
+        with self.app.test_request_context():
+            user = facade.get_user(self.owner_id)
+            # A hit loads the hash from the database when it is needed
+            self.assertTrue(user.verify_password("admin123"))
+        for key in list(self.backend._items):
+            self.assertNotIn('password', json.loads(self.backend.get(key)), key)
+
+    def test_place_detail_built_once_per_version(self):
+        url = f'/api/v1/places/{self.place_id}'
+        first = self.client.get(url).get_json()
+        self.statements.clear()
+        self.assertEqual(self.client.get(url).get_json(), first)
+        # Only the version query runs
+        self.assertEqual(len(self.statements), 1)
+
+        with self.app.app_context():
+            facade.update_user(self.owner_id, {"first_name": "Renamed"})
+        self.assertEqual(self.client.get(url).get_json()['owner']['first_name'], "Renamed")
+
+    def test_writes_load_from_the_database(self):
+        self.fetch_place()
+        with self.app.app_context():
+            self.assertEqual(facade.get_place(self.place_id).title, "Cached place")
+            # As another worker would: the row changes without this process knowing
+            db.session.execute(db.update(Place).where(Place.id == self.place_id).values(title="Elsewhere"))
+            db.session.commit()
+        self.assertEqual(self.fetch_place(), ("Cached place", 0))
+        with self.app.app_context():
+            self.assertEqual(facade.get_place(self.place_id).title, "Elsewhere")
+        with self.app.test_request_context(method='PUT'):
+            self.assertEqual(facade.get_place(self.place_id).title, "Elsewhere")
+
+    def test_other_process_delete(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = type('FileConfig', (TestingConfig,), {
+                'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'shared.db')
+            })
+            first, second = create_app(config), create_app(config)
+            with first.app_context():
+                owner = facade.get_user_by_email("admin@example.com").id
+                place_id = facade.create_place({
+                    "title": "Shared", "price": 70.0, "latitude": 50.0, "longitude": 4.0, "owner_id": owner
+                }).id
+                guest = facade.create_user({
+                    "first_name": "Guest", "last_name": "One", "email": "guest@example.com", "password": "secret"
+                })
+                review_id = facade.create_review({
+                    "text": "Nice", "rating": 4, "place_id": place_id, "user_id": guest.id
+                }).id
+            token = first.test_client().post('/api/v1/auth/login', json={
+                "email": "admin@example.com", "password": "admin123"
+            }).get_json()['access_token']
+            admin = {'Authorization': f'Bearer {token}'}
+            clients = first.test_client(), second.test_client()
+
+            self.assertEqual(clients[0].get(f'/api/v1/reviews/{review_id}').status_code, 200)
+            self.assertEqual(clients[1].delete(f'/api/v1/reviews/{review_id}', headers=admin).status_code, 200)
+            # The first app's cached copy is never used to change or delete the review
+            update = clients[0].put(f'/api/v1/reviews/{review_id}', json={"text": "Edited", "rating": 2},
+                                    headers=admin)
+            self.assertEqual(update.status_code, 404)
+            self.assertEqual(clients[0].delete(f'/api/v1/reviews/{review_id}', headers=admin).status_code, 404)
+            rating = clients[0].get(f'/api/v1/places/{place_id}').get_json()['rating']
+            self.assertEqual(rating['count'], 0)
+            for app in (first, second):
+                with app.app_context():
+                    db.engine.dispose()
+
+    def test_disabled(self):
+        app = create_app(type('NoCacheConfig', (TestingConfig,), {'ENTITY_CACHE_SIZE': 0}))
+        self.assertNotIn('entity_cache', app.extensions)
+        with app.app_context():
+            user_id = facade.get_user_by_email("admin@example.com").id
+        with app.app_context():
+            self.assertEqual(facade.get_user(user_id).first_name, "Admin")
+
+
+class TestSnapshotLRU(unittest.TestCase):
+    def test_eviction_and_expiry(self):
+        lru = SnapshotLRU(size=2, ttl=60)
+        lru.put('a', b'1')
+        lru.put('b', b'2')
+        lru.get('a')
+        lru.put('c', b'3')
+        self.assertEqual((lru.get('a'), lru.get('b'), lru.get('c')), (b'1', None, b'3'))
+
+        lru.ttl = 0.01
+        lru.put('d', b'4')
+        time.sleep(0.02)
+        self.assertIsNone(lru.get('d'))
+
+    def test_stale_load_not_stored(self):
+        lru = SnapshotLRU(size=2, ttl=60)
+        generation = lru.generation
+        lru.discard(['a'])
+        lru.put('a', b'old', generation)
+        self.assertIsNone(lru.get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import re
+import unittest
+from app import create_app
+from app.services import facade
+from config import TestingConfig
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            self.place_id = facade.create_place({
+                "title": "Measured place", "price": 70.0, "latitude": 50.0, "longitude": 4.0,
+                "owner_id": owner.id
+            }).id
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        return response.get_data(as_text=True)
+
+    def sample(self, text, name, labels=''):
+        match = re.search(rf'^{re.escape(name + labels)} ([\d.e+-]+)$', text, re.MULTILINE)
+        return float(match.group(1)) if match else 0.0
+
+    def test_request_latency_by_resource(self):
+        name = 'hbnb_http_request_duration_seconds_count'
+        labels = '{method="GET",namespace="places",resource="PlaceResource",status="200"}'
+        missing = '{method="GET",namespace="places",resource="PlaceResource",status="404"}'
+        before = self.scrape()
+        for _ in range(3):
+            self.client.get(f'/api/v1/places/{self.place_id}')
+        self.client.get('/api/v1/places/unknown')
+        after = self.scrape()
+        self.assertEqual(self.sample(after, name, labels) - self.sample(before, name, labels), 3)
+        self.assertEqual(self.sample(after, name, missing) - self.sample(before, name, missing), 1)
+        # Scrapes are not measured themselves
+        self.assertNotIn('resource="metrics"', after)
+
+    def test_pool_hasher_and_cache_metrics(self):
+        before = self.scrape()
+        self.client.get(f'/api/v1/places/{self.place_id}/nearby')
+        self.client.get(f'/api/v1/places/{self.place_id}/nearby')
+        after = self.scrape()
+        checkouts = 'hbnb_db_pool_checkouts_total'
+        self.assertGreater(self.sample(after, checkouts), self.sample(before, checkouts))
+        self.assertEqual(self.sample(after, 'hbnb_db_pool_checked_out'), 0)
+        self.assertEqual(self.sample(after, 'hbnb_password_hash_pending'), 0)
+        self.assertIn('hbnb_db_pool_saturated_checkouts_total', after)
+        hits = 'hbnb_cache_requests_total'
+        self.assertGreaterEqual(
+            self.sample(after, hits, '{cache="coordinates",result="hit"}')
+            - self.sample(before, hits, '{cache="coordinates",result="hit"}'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
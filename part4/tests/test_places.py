@@ -0,0 +1,231 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+import numpy as np
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from app.services.coordinate_index import CoordinateIndex
+from app.services.facade import HBnBFacade
+from app.utils.pagination import encode_cursor
+from config import TestingConfig
+
+
+class TestPlaceEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            self.place_ids = [
+                facade.create_place({
+                    "title": f"Place {i}",
+                    "price": 10.0 * (i + 1),
+                    "latitude": 40.0 + i / 100,
+                    "longitude": -74.0,
+                    "owner_id": owner.id
+                }).id
+                for i in range(5)
+            ]
+
+    def admin_headers(self):
+        response = self.client.post('/api/v1/auth/login', json={"email": "admin@example.com", "password": "admin123"})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    def test_unknown_amenities_rejected(self):
+        headers = self.admin_headers()
+        response = self.client.post('/api/v1/places/', json={
+            "title": "Flat", "price": 10.0, "latitude": 1.0, "longitude": 1.0, "amenities": ["nope"]
+        }, headers=headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], "Unknown amenity ids: nope")
+        response = self.client.put(f'/api/v1/places/{self.place_ids[0]}', json={"amenities": ["nope"]}, headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_many_keeps_the_repository_signature(self):
+        with self.app.app_context():
+            found = facade.place_repo.get_many(self.place_ids[:2] + ["missing"])
+            self.assertEqual(set(found), set(self.place_ids[:2]))
+            with self.assertRaises(ValueError) as raised:
+                facade.place_repo.get_many(self.place_ids[:2] + ["missing"], require_all=True)
+            self.assertEqual(str(raised.exception), "Unknown place ids: missing")
+
+    def test_list_places_unpaged(self):
+        """GET /api/v1/places/ without paging parameters returns a bare list"""
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in response.get_json()], self.place_ids)
+
+    def test_list_places_unpaged_is_capped(self):
+        self.app.config['PLACES_UNPAGED_CAP'] = 3
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(len(response.get_json()), 3)
+        self.assertIn('X-Next-Cursor', response.headers)
+
+    def test_list_places_cursor_walk(self):
+        """Following next_cursor visits every place exactly once"""
+        seen = []
+        url = '/api/v1/places/?limit=2'
+        while url:
+            body = self.client.get(url).get_json()
+            self.assertLessEqual(len(body['places']), 2)
+            seen.extend(p['id'] for p in body['places'])
+            cursor = body['next_cursor']
+            url = f'/api/v1/places/?limit=2&cursor={cursor}' if cursor else None
+        self.assertEqual(seen, self.place_ids)
+
+    def test_list_places_invalid_paging(self):
+        self.assertEqual(self.client.get('/api/v1/places/?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/?limit=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/?cursor=garbage').status_code, 400)
+        created_at = datetime.now().isoformat()
+        for bad_id in (5, {'x': 1}, None, ['a']):
+            cursor = encode_cursor(['created_at', created_at, bad_id])
+            self.assertEqual(self.client.get(f'/api/v1/places/?cursor={cursor}').status_code, 400, bad_id)
+
+    def test_list_places_price_filter(self):
+        """Prices are 10..50; min_price/max_price are inclusive"""
+        response = self.client.get('/api/v1/places/?min_price=20&max_price=40')
+        self.assertEqual([p['price'] for p in response.get_json()], [20.0, 30.0, 40.0])
+
+    def test_list_places_sorted_by_price_desc_paged(self):
+        seen = []
+        url = '/api/v1/places/?limit=2&sort=-price&max_price=40'
+        while url:
+            body = self.client.get(url).get_json()
+            seen.extend(p['price'] for p in body['places'])
+            cursor = body['next_cursor']
+            url = f'/api/v1/places/?limit=2&sort=-price&max_price=40&cursor={cursor}' if cursor else None
+        self.assertEqual(seen, [40.0, 30.0, 20.0, 10.0])
+
+    def test_list_places_invalid_filters(self):
+        self.assertEqual(self.client.get('/api/v1/places/?sort=title').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/?min_price=cheap').status_code, 400)
+        cursor = self.client.get('/api/v1/places/?limit=1').get_json()['next_cursor']
+        response = self.client.get(f'/api/v1/places/?limit=1&sort=price&cursor={cursor}')
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_places_by_radius(self):
+        """Places sit ~1.1 km apart along a meridian from (40.0, -74.0)"""
+        response = self.client.get('/api/v1/places/search?lat=40.0&lng=-74.0&radius_km=2.5')
+        body = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in body], self.place_ids[:3])
+        self.assertEqual(body[0]['distance_km'], 0.0)
+
+    def test_search_places_by_bbox(self):
+        response = self.client.get('/api/v1/places/search?bbox=-74.1,40.015,-73.9,40.035')
+        self.assertEqual({p['id'] for p in response.get_json()}, set(self.place_ids[2:4]))
+
+    def test_search_limit_is_applied_in_sql(self):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            world = self.client.get('/api/v1/places/search?bbox=-180,-90,180,90&limit=2').get_json()
+            near = self.client.get('/api/v1/places/search?lat=40.0&lng=-74.0&radius_km=500&limit=2').get_json()
+        finally:
+            with self.app.app_context():
+                event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(len(world), 2)
+        self.assertEqual([p['id'] for p in near], self.place_ids[:2])
+        searches = [s for s in statements if 'place_locations' in s]
+        self.assertEqual(len(searches), 2)
+        self.assertTrue(all('LIMIT' in s for s in searches))
+
+    def test_search_follows_update_place(self):
+        with self.app.app_context():
+            facade.update_place(self.place_ids[0], {'latitude': -33.86, 'longitude': 151.21})
+        near_sydney = self.client.get('/api/v1/places/search?lat=-33.86&lng=151.2&radius_km=5').get_json()
+        self.assertEqual([p['id'] for p in near_sydney], self.place_ids[:1])
+        near_origin = self.client.get('/api/v1/places/search?lat=40.0&lng=-74.0&radius_km=0.5').get_json()
+        self.assertEqual(near_origin, [])
+
+    def test_search_invalid_parameters(self):
+        self.assertEqual(self.client.get('/api/v1/places/search?lat=40').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/search?lat=95&lng=0&radius_km=1').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/search?lat=0&lng=0&radius_km=50000').status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/places/search?bbox=1,2,3').status_code, 400)
+
+    def test_nearby_places(self):
+        response = self.client.get(f'/api/v1/places/{self.place_ids[0]}/nearby?k=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['id'] for p in response.get_json()], self.place_ids[1:3])
+
+    def test_nearby_follows_create_and_update(self):
+        self.client.get(f'/api/v1/places/{self.place_ids[0]}/nearby')  # load the arrays
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            new_id = facade.create_place({
+                "title": "Next door", "price": 5.0,
+                "latitude": 40.0, "longitude": -74.0001, "owner_id": owner.id
+            }).id
+            facade.update_place(self.place_ids[1], {'latitude': 10.0})
+        body = self.client.get(f'/api/v1/places/{self.place_ids[0]}/nearby?k=10').get_json()
+        ids = [p['id'] for p in body]
+        self.assertEqual(ids[0], new_id)
+        self.assertEqual(ids[-1], self.place_ids[1])
+
+    def test_nearby_follows_other_processes(self):
+        """Writes made through another process's facade are picked up by the version check"""
+        self.app.config['COORDINATE_INDEX_CHECK_SECONDS'] = 0
+        self.client.get(f'/api/v1/places/{self.place_ids[0]}/nearby')  # load the arrays
+        with self.app.app_context():
+            HBnBFacade().update_place(self.place_ids[4], {'latitude': 40.0, 'longitude': -74.0001})
+        body = self.client.get(f'/api/v1/places/{self.place_ids[0]}/nearby?k=1').get_json()
+        self.assertEqual([p['id'] for p in body], self.place_ids[4:5])
+
+    def test_own_writes_keep_the_index_version(self):
+        self.client.get(f'/api/v1/places/{self.place_ids[0]}/nearby')  # load the arrays
+        with self.app.app_context():
+            facade.update_place(self.place_ids[4], {'latitude': 41.0})
+            self.assertEqual(facade.coordinates.version, facade.place_repo.coordinates_version())
+
+    def test_nearby_scans_outside_the_lock(self):
+        index = CoordinateIndex()
+        index.load([('a', 0.0, 0.0), ('b', 0.0, 1.0), ('c', 0.0, 2.0)])
+        sin = np.sin
+        held = []
+        with mock.patch.object(np, 'sin', lambda x: held.append(index._lock.locked()) or sin(x)):
+            nearest = index.nearest(0.0, 0.1, 2, exclude='a')
+        self.assertEqual([place_id for place_id, _ in nearest], ['b', 'c'])
+        self.assertTrue(held)
+        self.assertNotIn(True, held)
+
+    def test_nearby_invalid(self):
+        self.assertEqual(self.client.get('/api/v1/places/invalid-id/nearby').status_code, 404)
+        response = self.client.get(f'/api/v1/places/{self.place_ids[0]}/nearby?k=0')
+        self.assertEqual(response.status_code, 400)
+
+    def test_place_clusters(self):
+        """At zoom 5 all five places share one cell; totals follow update_place"""
+        url = '/api/v1/places/clusters?bbox=-80,35,-70,45&zoom=5'
+        clusters = self.client.get(url).get_json()
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['count'], 5)
+        self.assertEqual(clusters[0]['min_price'], 10.0)
+        self.assertEqual(clusters[0]['avg_price'], 30.0)
+
+        with self.app.app_context():
+            facade.update_place(self.place_ids[0], {'latitude': -33.86, 'longitude': 151.21, 'price': 70.0})
+        clusters = self.client.get(url).get_json()
+        self.assertEqual(clusters[0]['count'], 4)
+        self.assertEqual(clusters[0]['min_price'], 20.0)
+        self.assertEqual(clusters[0]['avg_price'], 35.0)
+
+    def test_place_clusters_invalid(self):
+        self.assertEqual(self.client.get('/api/v1/places/clusters?zoom=3').status_code, 400)
+        response = self.client.get('/api/v1/places/clusters?bbox=-80,35,-70,45&zoom=x')
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_nonexistent_place(self):
+        response = self.client.get('/api/v1/places/invalid-id')
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
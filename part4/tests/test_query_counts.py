@@ -0,0 +1,182 @@
+import unittest
+from sqlalchemy import event
+from app import create_app
+from app.extensions import db
+from app.persistence.unit_of_work import unit_of_work
+from app.services import facade
+from config import TestingConfig
+
+
+class TestQueryCounts(unittest.TestCase):
+    """Read endpoints issue a fixed number of SQL statements, however much data they return"""
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        self.statements = []
+        with self.app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self.record)
+        self.addCleanup(self.stop_recording)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def stop_recording(self):
+        with self.app.app_context():
+            event.remove(db.engine, 'before_cursor_execute', self.record)
+
+    def seed(self, n):
+        """A place with n amenities and n reviews by n different users"""
+        with self.app.app_context():
+            batch = len(facade.get_all_places())
+            owner = facade.get_user_by_email("admin@example.com")
+            amenities = [facade.create_amenity({"name": f"Amenity {i}"}).id for i in range(n)]
+            place = facade.create_place({
+                "title": "Busy place", "price": 120.0, "latitude": 51.5, "longitude": -0.12,
+                "owner_id": owner.id, "amenities": amenities
+            })
+            for i in range(n):
+                user = facade.create_user({
+                    "first_name": "Guest", "last_name": str(i),
+                    "email": f"guest{batch}.{i}@example.com", "password": "secret"
+                })
+                facade.create_review({"text": "Nice", "rating": 4, "place_id": place.id, "user_id": user.id})
+            return place.id
+
+    def count(self, url):
+        self.statements.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(self.statements)
+
+    def test_place_detail_statement_count(self):
+        counts = []
+        for n in (1, 8):
+            place_id = self.seed(n)
+            counts.append(self.count(f'/api/v1/places/{place_id}'))
+            self.assertEqual(len(self.client.get(f'/api/v1/places/{place_id}').get_json()['amenities']), n)
+        # The ETag version lookup, the place with owner and ratings, then its amenities
+        self.assertEqual(counts, [3, 3])
+
+    def test_place_reviews_statement_count(self):
+        counts = []
+        for n in (1, 8):
+            place_id = self.seed(n)
+            counts.append(self.count(f'/api/v1/places/{place_id}/reviews'))
+        self.assertEqual(counts, [3, 3])
+
+    def test_place_list_statement_count(self):
+        self.seed(3)
+        self.seed(2)
+        self.assertEqual(self.count('/api/v1/places/'), 2)
+
+    def test_place_amenities_statement_count(self):
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            amenities = [facade.create_amenity({"name": f"Amenity {i}"}).id for i in range(40)]
+            self.statements.clear()
+            place = facade.create_place({
+                "title": "Well equipped", "price": 80.0, "latitude": 48.1, "longitude": 11.6,
+                "owner_id": owner.id, "amenities": amenities
+            })
+            # Only the owner is read; amenity ids are checked against the in-memory catalog
+            selects = [s for s in self.statements if s.startswith('SELECT')]
+            self.assertEqual(len(selects), 1)
+
+            # Swap five amenities: only those association rows are written
+            self.statements.clear()
+            facade.update_place(place.id, {"amenities": amenities[5:] + [
+                facade.create_amenity({"name": f"New {i}"}).id for i in range(5)
+            ]})
+            writes = [s for s in self.statements if s.startswith(('INSERT INTO place_amenity', 'DELETE FROM place_amenity'))]
+            self.assertEqual(len(writes), 2)
+            self.assertEqual(len(facade.get_place(place.id).amenities), 40)
+
+            with self.assertRaises(ValueError):
+                facade.update_place(place.id, {"amenities": ["missing"]})
+            self.assertEqual(len(facade.get_place(place.id).amenities), 40)
+
+
+class TestCommitCounts(unittest.TestCase):
+    """Each write endpoint commits once, however many rows it touches"""
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        self.commits = 0
+        with self.app.app_context():
+            event.listen(db.engine, 'commit', self.record)
+            self.amenities = [facade.create_amenity({"name": f"Amenity {i}"}).id for i in range(3)]
+            facade.create_user({
+                "first_name": "Alice", "last_name": "Guest",
+                "email": "alice@example.com", "password": "secret"
+            })
+        self.addCleanup(self.stop_recording)
+        self.admin = self.login("admin@example.com", "admin123")
+        self.alice = self.login("alice@example.com", "secret")
+
+    def record(self, conn):
+        self.commits += 1
+
+    def stop_recording(self):
+        with self.app.app_context():
+            event.remove(db.engine, 'commit', self.record)
+
+    def login(self, email, password):
+        response = self.client.post('/api/v1/auth/login', json={"email": email, "password": password})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    def count(self, method, url, headers, body=None):
+        self.commits = 0
+        response = getattr(self.client, method)(url, json=body, headers=headers)
+        self.assertLess(response.status_code, 300, response.get_json())
+        return self.commits, response.get_json()
+
+    def test_write_endpoint_commit_counts(self):
+        place = {
+            "title": "Loft", "price": 90.0, "latitude": 45.76, "longitude": 4.83,
+            "amenities": self.amenities
+        }
+        counts = {}
+        counts['create user'], user = self.count('post', '/api/v1/users/', self.admin, {
+            "first_name": "Bob", "last_name": "Guest", "email": "bob@example.com", "password": "secret"
+        })
+        counts['update user'], _ = self.count('put', f"/api/v1/users/{user['id']}", self.admin, {
+            "first_name": "Robert", "password": "changed"
+        })
+        counts['create amenity'], amenity = self.count('post', '/api/v1/amenities/', self.admin, {"name": "Sauna"})
+        counts['update amenity'], _ = self.count('put', f"/api/v1/amenities/{amenity['id']}", self.admin, {"name": "Spa"})
+        counts['create place'], created = self.count('post', '/api/v1/places/', self.admin, place)
+        counts['update place'], _ = self.count('put', f"/api/v1/places/{created['id']}", self.admin, {
+            "price": 110.0, "latitude": 45.75, "amenities": self.amenities[:1]
+        })
+        counts['create review'], review = self.count('post', '/api/v1/reviews/', self.alice, {
+            "text": "Great", "rating": 5, "place_id": created['id']
+        })
+        counts['update review'], _ = self.count('put', f"/api/v1/reviews/{review['id']}", self.alice, {
+            "text": "Good", "rating": 4
+        })
+        counts['delete review'], _ = self.count('delete', f"/api/v1/reviews/{review['id']}", self.alice)
+        self.assertEqual(counts, dict.fromkeys(counts, 1))
+
+    def test_unit_of_work_groups_facade_calls(self):
+        with self.app.app_context():
+            self.commits = 0
+            with unit_of_work():
+                for name in ("Sauna", "Gym", "Pool"):
+                    facade.create_amenity({"name": name})
+            self.assertEqual(self.commits, 1)
+
+            with self.assertRaises(ValueError):
+                with unit_of_work():
+                    facade.create_amenity({"name": "Garden"})
+                    facade.create_place({"title": "Orphan", "price": 1.0, "latitude": 0.0,
+                                         "longitude": 0.0, "owner_id": "missing"})
+            self.assertEqual(self.commits, 1)
+            names = {amenity.name for amenity in facade.get_all_amenities()}
+            self.assertIn("Pool", names)
+            self.assertNotIn("Garden", names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import unittest
+import uuid
+from datetime import datetime, timezone
+from app import create_app
+from app.services import facade
+from app.utils import representations
+from app.utils.representations import default, dumps_json
+from config import TestingConfig
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class TestEncoders(unittest.TestCase):
+    sample = {
+        'when': datetime(2025, 3, 1, 12, 30, 5, 120000), 'aware': datetime(2025, 3, 1, tzinfo=timezone.utc),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'), 'n': [1, 2.5, None, "é"]
+    }
+    expected = {
+        'when': '2025-03-01T12:30:05.120000', 'aware': '2025-03-01T00:00:00+00:00',
+        'id': '12345678-1234-5678-1234-567812345678', 'n': [1, 2.5, None, "é"]
+    }
+
+    def test_json_matches_stdlib_encoding(self):
+        self.assertEqual(json.loads(dumps_json(self.sample)), self.expected)
+        self.assertEqual(json.loads(json.dumps(self.sample, default=default)), self.expected)
+        self.assertTrue(dumps_json([]).endswith(b'\n'))
+        with self.assertRaises(TypeError):
+            dumps_json({'x': object()})
+
+    @unittest.skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_carries_the_same_values(self):
+        self.assertEqual(msgpack.unpackb(representations.dumps_msgpack(self.sample)), self.expected)
+
+
+@unittest.skipUnless(msgpack, "msgpack is not installed")
+class TestContentNegotiation(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            wifi = facade.create_amenity({"name": "Wifi"}).id
+            self.place_id = facade.create_place({
+                "title": "Packed place", "price": 70.0, "latitude": 50.0, "longitude": 4.0,
+                "owner_id": owner.id, "amenities": [wifi]
+            }).id
+
+    def test_msgpack_on_request(self):
+        for url in ('/api/v1/places/', f'/api/v1/places/{self.place_id}', '/api/v1/amenities/',
+                    '/api/v1/reviews/', '/api/v1/places/missing'):
+            as_json = self.client.get(url)
+            packed = self.client.get(url, headers={'Accept': 'application/msgpack'})
+            self.assertEqual(as_json.mimetype, 'application/json', url)
+            self.assertEqual(packed.mimetype, 'application/msgpack', url)
+            self.assertEqual(packed.status_code, as_json.status_code, url)
+            self.assertEqual(msgpack.unpackb(packed.data), as_json.get_json(), url)
+
+    def test_representations_have_their_own_etags(self):
+        url = f'/api/v1/places/{self.place_id}'
+        as_json = self.client.get(url)
+        packed = self.client.get(url, headers={'Accept': 'application/msgpack'})
+        self.assertNotEqual(as_json.headers['ETag'], packed.headers['ETag'])
+        self.assertEqual(packed.headers['Vary'], 'Accept, Accept-Encoding')
+        revalidated = self.client.get(url, headers={'Accept': 'application/msgpack', 'If-None-Match': as_json.headers['ETag']})
+        self.assertEqual(revalidated.status_code, 200)
+        # Browsers' catch-all Accept still gets JSON
+        browser = self.client.get(url, headers={'Accept': 'text/html,application/xhtml+xml,*/*;q=0.8'})
+        self.assertEqual(browser.mimetype, 'application/json')
+
+
+if __name__ == '__main__':
+    unittest.main()
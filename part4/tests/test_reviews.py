@@ -0,0 +1,94 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.place_rating import PlaceRating
+from app.services import facade
+from config import TestingConfig
+
+
+class TestReviewEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            self.place_id = facade.create_place({
+                "title": "Reviewed place", "price": 80.0,
+                "latitude": 48.85, "longitude": 2.35, "owner_id": owner.id
+            }).id
+            for name in ("alice", "bob"):
+                facade.create_user({
+                    "first_name": name.title(), "last_name": "Guest",
+                    "email": f"{name}@example.com", "password": "secret"
+                })
+        self.tokens = {name: self.login(f"{name}@example.com", "secret") for name in ("alice", "bob")}
+
+    def login(self, email, password):
+        response = self.client.post('/api/v1/auth/login', json={"email": email, "password": password})
+        return response.get_json()['access_token']
+
+    def post_review(self, user, rating):
+        return self.client.post('/api/v1/reviews/', json={
+            "text": "Lovely", "rating": rating, "place_id": self.place_id
+        }, headers={'Authorization': f'Bearer {self.tokens[user]}'})
+
+    def rating(self):
+        return self.client.get(f'/api/v1/places/{self.place_id}').get_json()['rating']
+
+    def test_rating_aggregates_follow_reviews(self):
+        review_id = self.post_review("alice", 5).get_json()['id']
+        self.post_review("bob", 2)
+        self.assertEqual(self.rating(), {
+            'count': 2, 'average': 3.5,
+            'histogram': {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1}
+        })
+
+        headers = {'Authorization': f'Bearer {self.tokens["alice"]}'}
+        self.client.put(f'/api/v1/reviews/{review_id}', json={"text": "Fine", "rating": 3}, headers=headers)
+        self.assertEqual(self.rating()['histogram'], {'1': 0, '2': 1, '3': 1, '4': 0, '5': 0})
+
+        self.client.delete(f'/api/v1/reviews/{review_id}', headers=headers)
+        self.assertEqual(self.rating()['count'], 1)
+        self.assertEqual(self.rating()['average'], 2.0)
+
+        places = self.client.get('/api/v1/places/').get_json()
+        self.assertEqual((places[0]['review_count'], places[0]['average_rating']), (1, 2.0))
+
+    def test_duplicate_review_rejected(self):
+        self.assertEqual(self.post_review("alice", 5).status_code, 201)
+        response = self.post_review("alice", 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['error'], 'You have already reviewed this place.')
+        self.assertEqual(self.rating()['count'], 1)
+        self.assertEqual(self.rating()['average'], 5.0)
+
+    def test_non_integer_rating_rejected(self):
+        for rating in (3.5, 4.0, True):
+            response = self.post_review("alice", rating)
+            self.assertEqual(response.status_code, 400, rating)
+            self.assertEqual(response.get_json()['error'], "Rating must be between 1 and 5")
+        self.assertEqual(self.rating()['count'], 0)
+        self.assertEqual(self.post_review("alice", 4).status_code, 201)
+
+    def test_invalid_rating_update_rejected(self):
+        review_id = self.post_review("alice", 4).get_json()['id']
+        headers = {'Authorization': f'Bearer {self.tokens["alice"]}'}
+        response = self.client.put(f'/api/v1/reviews/{review_id}', json={"text": "x", "rating": 9}, headers=headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.rating()['count'], 1)
+
+    def test_reconcile_ratings_command(self):
+        self.post_review("alice", 4)
+        runner = self.app.test_cli_runner()
+        self.assertIn('0 drifted', runner.invoke(args=['hbnb', 'reconcile-ratings']).output)
+
+        with self.app.app_context():
+            db.session.execute(db.update(PlaceRating).values(review_count=7))
+            db.session.commit()
+        result = runner.invoke(args=['hbnb', 'reconcile-ratings', '--fix'])
+        self.assertIn('1 drifted place(s) fixed', result.output)
+        self.assertEqual(self.rating()['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models.place import Place
+from app.models.review import Review
+from app.services import facade
+from config import TestingConfig
+
+
+class TestSeedCommand(unittest.TestCase):
+    def seed(self, *args):
+        app = create_app(TestingConfig)
+        result = app.test_cli_runner().invoke(args=['hbnb', 'seed', *args])
+        return app, result
+
+    def test_seed_loads_consistent_data(self):
+        app, result = self.seed('--users', '30', '--places', '60', '--reviews', '400', '--seed', '7')
+        self.assertEqual(result.exit_code, 0, result.output)
+        with app.app_context():
+            self.assertEqual(Place.query.count(), 60)
+            reviews = Review.query.count()
+            self.assertIn(f'{reviews} reviews', result.output)
+            self.assertGreater(reviews, 300)
+            # Stored ratings and clusters agree with what was inserted
+            self.assertEqual(facade.reconcile_place_ratings(), [])
+            clusters = facade.get_place_clusters(-90, -180, 90, 180, 0)
+            self.assertEqual(sum(c.place_count for c in clusters), 60)
+            self.assertTrue(facade.authenticate(Place.query.first().owner.email, 'password'))
+            self.assertFalse(any(r.user_id == r.place.owner_id for r in Review.query))
+
+        again = app.test_cli_runner().invoke(args=['hbnb', 'seed', '--users', '5', '--seed', '7'])
+        self.assertNotEqual(again.exit_code, 0)
+        self.assertIn('already loaded', again.output)
+
+    def test_seed_is_deterministic(self):
+        snapshots = []
+        for _ in range(2):
+            app, result = self.seed('--users', '10', '--places', '20', '--reviews', '50', '--seed', '3')
+            self.assertEqual(result.exit_code, 0, result.output)
+            with app.app_context():
+                rows = db.session.execute(db.select(
+                    Place.id, Place.price, Place.latitude, Place.owner_id
+                ).order_by(Place.id)).all()
+                ratings = db.session.execute(db.select(
+                    Review.place_id, Review.user_id, Review.rating
+                ).order_by(Review.id)).all()
+                snapshots.append((rows, ratings))
+        self.assertEqual(snapshots[0], snapshots[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import re
+import unittest
+from app import create_app
+from app.services import facade
+from config import TestingConfig
+
+
+class TestSQLTiming(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(type('SlowLogConfig', (TestingConfig,), {'SQL_SLOW_QUERY_MS': 0}))
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            self.place_id = facade.create_place({
+                "title": "Timed place", "price": 70.0, "latitude": 50.0, "longitude": 4.0,
+                "owner_id": owner.id
+            }).id
+
+    def test_server_timing_header_and_log(self):
+        with self.assertLogs('app.sql', level='INFO') as logs:
+            response = self.client.get(f'/api/v1/places/{self.place_id}')
+        header = response.headers['Server-Timing']
+        match = re.match(r'db;dur=[\d.]+;desc="(\d+) queries, (\d+) rows", app;dur=[\d.]+$', header)
+        self.assertIsNotNone(match, header)
+        # Place detail: its ETag version, the place with owner and ratings, then its amenities
+        self.assertEqual(match.group(1), '3')
+        self.assertEqual(match.group(2), '3')
+
+        lines = [json.loads(r.getMessage()) for r in logs.records if r.name == 'app.sql']
+        self.assertEqual(lines[-1]['queries'], 3)
+        self.assertEqual(lines[-1]['status'], 200)
+        self.assertEqual(lines[-1]['endpoint'], 'places_place_resource')
+
+    def test_streamed_list_logged_when_sent(self):
+        with self.assertLogs('app.sql', level='INFO') as logs:
+            response = self.client.get('/api/v1/users/')
+            self.assertTrue(response.is_streamed)
+            header = response.headers['Server-Timing']
+            before = int(re.search(r'desc="(\d+) queries, 0 rows before the body"', header).group(1))
+            self.assertFalse([r for r in logs.records if r.name == 'app.sql'])
+            self.assertEqual(len(response.get_json()), 1)
+            response.close()
+        lines = [json.loads(r.getMessage()) for r in logs.records if r.name == 'app.sql']
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0]['streamed'])
+        # The user rows are selected while the body is sent
+        self.assertGreater(lines[0]['queries'], before)
+        self.assertEqual(lines[0]['endpoint'], 'users_user_list')
+
+    def test_slow_query_log_has_plan(self):
+        with self.assertLogs('app.sql.slow', level='WARNING') as logs:
+            self.client.get(f'/api/v1/places/{self.place_id}')
+        entries = [json.loads(r.getMessage()) for r in logs.records]
+        self.assertTrue(entries[0]['statement'].startswith('SELECT'))
+        self.assertTrue(any('places' in step for step in entries[0]['plan']), entries[0]['plan'])
+        self.assertTrue(all(e['path'] == f'/api/v1/places/{self.place_id}' for e in entries))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import unittest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app import create_app
+from app.extensions import db
+from config import ProductionConfig, TestingConfig
+
+
+class TestProductionEngine(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        config = type('FileConfig', (ProductionConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'hbnb.db'),
+            'SQLALCHEMY_ENGINE_OPTIONS': dict(ProductionConfig.SQLALCHEMY_ENGINE_OPTIONS, pool_size=3),
+            'BCRYPT_LOG_ROUNDS': 4, 'PASSWORD_HASH_WORKERS': 0, 'STATIC_ASSETS': False,
+        })
+        self.app = create_app(config)
+
+    def pragma(self, name):
+        return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+    def test_every_connection_gets_the_pragmas(self):
+        with self.app.app_context():
+            self.assertEqual(db.engine.pool.size(), 3)
+            # Several connections at once, so new ones are opened
+            connections = [db.engine.connect() for _ in range(3)]
+            try:
+                for connection in connections:
+                    values = [connection.execute(text(f'PRAGMA {name}')).scalar()
+                              for name in ('journal_mode', 'synchronous', 'foreign_keys', 'busy_timeout')]
+                    # synchronous NORMAL is 1
+                    self.assertEqual(values, ['wal', 1, 1, 5000])
+                    self.assertEqual(connection.execute(text('PRAGMA cache_size')).scalar(), -64 * 1024)
+            finally:
+                for connection in connections:
+                    connection.close()
+
+    def test_foreign_keys_are_enforced(self):
+        with self.app.app_context():
+            with self.assertRaisesRegex(IntegrityError, "FOREIGN KEY"):
+                db.session.execute(text(
+                    "INSERT INTO reviews (id, text, rating, user_id, place_id, created_at, updated_at) "
+                    "VALUES ('r1', 'Orphan', 3, 'nobody', 'nowhere', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+                ))
+                db.session.flush()
+            db.session.rollback()
+
+    def test_other_configs_keep_sqlite_defaults(self):
+        app = create_app(TestingConfig)
+        with app.app_context():
+            self.assertEqual(self.pragma('foreign_keys'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from app import create_app
+from app.extensions import db
+from app.services import facade
+from app.utils.streaming import exactly
+from config import TestingConfig
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class TestStreamedLists(unittest.TestCase):
+    def setUp(self):
+        config = type('StreamConfig', (TestingConfig,), {'STREAM_BATCH_ROWS': 2, 'STREAM_CHUNK_BYTES': 64})
+        self.app = create_app(config)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            owner = facade.get_user_by_email("admin@example.com")
+            self.users = [owner.id]
+            for i in range(5):
+                guest = facade.create_user({
+                    "first_name": f"Guest{i}", "last_name": "Stream", "email": f"guest{i}@example.com",
+                    "password": "secret123"
+                })
+                self.users.append(guest.id)
+                place = facade.create_place({
+                    "title": f"Place {i}", "price": 50.0, "latitude": 10.0, "longitude": 20.0,
+                    "owner_id": owner.id, "amenities": []
+                })
+                facade.create_review({"text": f"Review {i}", "rating": 1 + i % 5,
+                                      "user_id": guest.id, "place_id": place.id})
+
+    def test_reviews_as_chunked_json_array(self):
+        response = self.client.get('/api/v1/reviews/')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.mimetype, 'application/json')
+        chunks = list(response.response)
+        self.assertGreater(len(chunks), 1)
+        reviews = json.loads(b''.join(chunks))
+        self.assertEqual(sorted(r['text'] for r in reviews), [f"Review {i}" for i in range(5)])
+        self.assertEqual(set(reviews[0]), {'id', 'text', 'rating'})
+
+    def test_ndjson_is_one_item_per_line(self):
+        response = self.client.get('/api/v1/reviews/', headers={'Accept': 'application/x-ndjson'})
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.data.decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual([json.loads(line) for line in lines], self.client.get('/api/v1/reviews/').get_json())
+
+    def test_empty_list(self):
+        with self.app.app_context():
+            for review in facade.get_all_reviews():
+                facade.delete_review(review.id)
+        self.assertEqual(self.client.get('/api/v1/reviews/').get_json(), [])
+        self.assertEqual(self.client.get('/api/v1/reviews/', headers={'Accept': 'application/x-ndjson'}).data, b'')
+
+    def test_user_list_leaves_out_passwords(self):
+        response = self.client.get('/api/v1/users/')
+        self.assertTrue(response.is_streamed)
+        users = response.get_json()
+        self.assertEqual(sorted(u['id'] for u in users), sorted(self.users))
+        for user in users:
+            self.assertEqual(set(user), {'id', 'first_name', 'last_name', 'email'})
+
+    def test_streamed_lists_stay_conditional(self):
+        first = self.client.get('/api/v1/users/')
+        again = self.client.get('/api/v1/users/', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    @unittest.skipUnless(msgpack, "msgpack is not installed")
+    def test_msgpack_array(self):
+        response = self.client.get('/api/v1/reviews/', headers={'Accept': 'application/msgpack'})
+        self.assertEqual(response.mimetype, 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.data), self.client.get('/api/v1/reviews/').get_json())
+
+
+    def test_exactly_cuts_and_pads(self):
+        self.assertEqual(list(exactly(iter([1, 2, 3]), 2)), [1, 2])
+        self.assertEqual(list(exactly(iter([1]), 3)), [1, None, None])
+
+
+class TestStreamSnapshot(unittest.TestCase):
+    @unittest.skipUnless(msgpack, "msgpack is not installed")
+    def test_write_between_count_and_rows(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        config = type('WALConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmp, 'stream.db'),
+            'SQLITE_PRAGMAS': {'journal_mode': 'WAL'},
+        })
+        app, other = create_app(config), create_app(config)
+        count_users = facade.count_users
+
+        def count_then_other_write():
+            count = count_users()
+            # Another worker registers a user and renames one before the rows are read
+            with other.app_context():
+                facade.create_user({"first_name": "Late", "last_name": "Comer", "email": "late@example.com",
+                                    "password": "secret123"})
+                facade.update_user(facade.get_user_by_email("admin@example.com").id, {"last_name": "Renamed"})
+            return count
+
+        with mock.patch.object(facade, 'count_users', count_then_other_write):
+            response = app.test_client().get('/api/v1/users/', headers={'Accept': 'application/msgpack'})
+            users = msgpack.unpackb(response.data)
+        self.assertEqual([(u['email'], u['last_name']) for u in users], [("admin@example.com", "User")])
+        self.assertEqual(len(app.test_client().get('/api/v1/users/').get_json()), 2)
+        for each in (app, other):
+            with each.app_context():
+                db.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()